@@ -0,0 +1,134 @@
+"""Admission control in front of the DB pool: bounded concurrency per route class, then fail fast.
+
+Requests are split into "read" (GET/HEAD, plus the POST routes in READ_ROUTES)
+and "write" (everything else). Each
+class runs at most ADMISSION_{READ,WRITE}_LIMIT requests at once: by default 4
+per CPU, capped at the pool size plus overflow, since SQLite queries are CPU
+work in this process and more of them at once only stretch each one's latency.
+Up to ADMISSION_{READ,WRITE}_QUEUE more wait, in
+arrival order, for at most ADMISSION_QUEUE_TIMEOUT seconds. Past that, the
+request gets an immediate 503 with Retry-After instead of piling up in the
+threadpool waiting for a connection. /health, /metrics and /system/* bypass the
+limits, so the health check and monitoring keep answering during a spike.
+
+State is per event loop, i.e. per uvicorn worker.
+"""
+import asyncio
+import os
+import time
+from collections import deque
+from typing import Deque, Dict
+from starlette.responses import JSONResponse
+from . import metrics
+from .database import MAX_OVERFLOW, POOL_SIZE
+
+ADMISSION_ENABLED = os.getenv("ADMISSION_CONTROL", "1") == "1"
+DEFAULT_LIMIT = min(POOL_SIZE + MAX_OVERFLOW, 4 * (os.cpu_count() or 1))
+ADMISSION_READ_LIMIT = int(os.getenv("ADMISSION_READ_LIMIT", str(DEFAULT_LIMIT)))
+ADMISSION_WRITE_LIMIT = int(os.getenv("ADMISSION_WRITE_LIMIT", str(DEFAULT_LIMIT)))
+ADMISSION_READ_QUEUE = int(os.getenv("ADMISSION_READ_QUEUE", str(2 * ADMISSION_READ_LIMIT)))
+ADMISSION_WRITE_QUEUE = int(os.getenv("ADMISSION_WRITE_QUEUE", str(2 * ADMISSION_WRITE_LIMIT)))
+ADMISSION_QUEUE_TIMEOUT = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", "0.5"))
+ADMISSION_RETRY_AFTER = int(os.getenv("ADMISSION_RETRY_AFTER", "1"))
+
+# Never limited: the health check and the monitoring endpoints.
+PRIORITY_PREFIXES = ("/health", "/metrics", "/system/")
+# POST routes that only read, e.g. because their input does not fit in a URL.
+READ_ROUTES = frozenset({"/catalog:batch"})
+
+class Limiter:
+    """At most `limit` holders; up to `queue` callers wait in FIFO order for up to `timeout` seconds."""
+
+    def __init__(self, name: str, limit: int, queue: int, timeout: float):
+        self.name, self.limit, self.queue, self.timeout = name, limit, queue, timeout
+        self.active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self.admitted = 0
+        self.rejected = {"queue_full": 0, "timeout": 0}
+
+    async def acquire(self) -> bool:
+        """Take a slot, waiting if needed; False when the request should be shed."""
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            self._admit(0.0)
+            return True
+        if len(self._waiters) >= self.queue:
+            return self._reject("queue_full")
+        started = time.perf_counter()
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._gauges()
+        try:
+            await asyncio.wait_for(waiter, self.timeout)
+        except asyncio.TimeoutError:
+            return self._reject("timeout")
+        except BaseException:
+            # Cancelled (e.g. the client went away) after release() had handed over the slot.
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            raise
+        finally:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            self._gauges()
+        self._admit(time.perf_counter() - started)
+        return True
+
+    def release(self) -> None:
+        # The slot passes straight to the oldest live waiter, so `active` stays the same.
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                self._gauges()
+                return
+        self.active -= 1
+        self._gauges()
+
+    def _admit(self, waited: float) -> None:
+        self.admitted += 1
+        metrics.ADMISSION_WAIT.observe(waited, self.name)
+        self._gauges()
+
+    def _reject(self, reason: str) -> bool:
+        self.rejected[reason] += 1
+        metrics.REJECTED.inc(self.name, reason)
+        return False
+
+    def _gauges(self) -> None:
+        metrics.ADMITTED.set(self.active, self.name)
+        metrics.QUEUED.set(len(self._waiters), self.name)
+
+    def stats(self) -> dict:
+        return {"limit": self.limit, "queue": self.queue, "timeout_s": self.timeout,
+                "in_flight": self.active, "queued": len(self._waiters),
+                "admitted": self.admitted, "rejected": dict(self.rejected)}
+
+limiters: Dict[str, Limiter] = {
+    "read": Limiter("read", ADMISSION_READ_LIMIT, ADMISSION_READ_QUEUE, ADMISSION_QUEUE_TIMEOUT),
+    "write": Limiter("write", ADMISSION_WRITE_LIMIT, ADMISSION_WRITE_QUEUE, ADMISSION_QUEUE_TIMEOUT),
+}
+
+def stats() -> dict:
+    return {"enabled": ADMISSION_ENABLED, "retry_after_s": ADMISSION_RETRY_AFTER,
+            **{name: limiter.stats() for name, limiter in limiters.items()}}
+
+class AdmissionMiddleware:
+    """Pure ASGI middleware: holds a slot of the request's class for the whole response, body included."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"].startswith(PRIORITY_PREFIXES):
+            return await self.app(scope, receive, send)
+        reads = scope["method"] in ("GET", "HEAD") or scope["path"] in READ_ROUTES
+        limiter = limiters["read" if reads else "write"]
+        if not await limiter.acquire():
+            busy = JSONResponse({"detail": f"Too many concurrent {limiter.name} requests, retry later"}, status_code=503,
+                                headers={"Retry-After": str(ADMISSION_RETRY_AFTER)})
+            return await busy(scope, receive, send)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release()
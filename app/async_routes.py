@@ -0,0 +1,120 @@
+"""Read routes served from AsyncSession, installed over the sync ones when DB_MODE=async.
+
+Writes keep using the sync handlers in main; only the GET paths below are replaced.
+Requests with ?fields= run the projected fastread selects through AsyncSession.run_sync.
+"""
+from typing import List, Optional
+from fastapi import APIRouter, Depends, FastAPI, Query, Request
+from fastapi.routing import APIRoute
+from sqlalchemy.ext.asyncio import AsyncSession
+from .database import AsyncSessionLocal
+from . import autocomplete, crud_async, fastread, response_cache, schemas
+from .crud import SeriesDepth
+from .pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from .response_cache import found, paged
+
+router = APIRouter()
+
+FIELDS_QUERY = Query(None, description="Comma-separated top-level fields to return, e.g. id,title")
+IDS_QUERY = Query(None, description="Comma-separated ids to fetch in one query, e.g. 3,1,2")
+
+def _adapter(projection: fastread.Fields, adapter):
+    # Projected rows are already plain dicts in output shape.
+    return adapter if projection is None else response_cache.PLAIN
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+@router.get("/countries", response_model=List[schemas.CountryOut], tags=["meta"])
+async def get_countries(request: Request, prefix: Optional[str] = None, limit: int = Query(autocomplete.DEFAULT_LIMIT, ge=1, le=autocomplete.MAX_LIMIT), db: AsyncSession = Depends(get_async_db)):
+    if prefix is not None:
+        return await db.run_sync(lambda s: autocomplete.index.search(s, "countries", prefix, limit))
+    async def load(): return await crud_async.list_countries(db), {}
+    return await response_cache.respond_async(request, ("countries",), schemas.COUNTRY_LIST, load)
+
+@router.get("/directors", response_model=List[schemas.DirectorOut], tags=["meta"])
+async def get_directors(request: Request, prefix: Optional[str] = None, limit: int = Query(autocomplete.DEFAULT_LIMIT, ge=1, le=autocomplete.MAX_LIMIT), db: AsyncSession = Depends(get_async_db)):
+    if prefix is not None:
+        return await db.run_sync(lambda s: autocomplete.index.search(s, "directors", prefix, limit))
+    async def load(): return await crud_async.list_directors(db), {}
+    return await response_cache.respond_async(request, ("directors",), schemas.DIRECTOR_LIST, load)
+
+@router.get("/publishers", response_model=List[schemas.PublisherOut], tags=["meta"])
+async def get_publishers(request: Request, prefix: Optional[str] = None, limit: int = Query(autocomplete.DEFAULT_LIMIT, ge=1, le=autocomplete.MAX_LIMIT), db: AsyncSession = Depends(get_async_db)):
+    if prefix is not None:
+        return await db.run_sync(lambda s: autocomplete.index.search(s, "publishers", prefix, limit))
+    async def load(): return await crud_async.list_publishers(db), {}
+    return await response_cache.respond_async(request, ("publishers",), schemas.PUBLISHER_LIST, load)
+
+@router.get("/movies", response_model=List[schemas.MovieOut], tags=["movies"])
+async def get_movies(request: Request, year: Optional[int] = Query(None, ge=1888, le=2100), country: Optional[str] = None, director: Optional[str] = None, limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), cursor: Optional[str] = None, fields: Optional[str] = FIELDS_QUERY, ids: Optional[str] = IDS_QUERY, db: AsyncSession = Depends(get_async_db)):
+    projection = fastread.parse_fields("movies", fields)
+    wanted = fastread.parse_ids(ids)
+    async def load():
+        if wanted is not None:
+            return list((await db.run_sync(lambda s: fastread.movies_by_ids(s, wanted, fields=projection))).values()), {}
+        if projection:
+            return paged(await db.run_sync(lambda s: fastread.list_movies(s, year=year, country=country, director=director, limit=limit, cursor=cursor, fields=projection)))
+        return paged(await crud_async.list_movies(db, year=year, country=country, director=director, limit=limit, cursor=cursor))
+    return await response_cache.respond_async(request, response_cache.WRITES["movies"], _adapter(projection, schemas.MOVIE_LIST), load)
+
+@router.get("/movies/{movie_id}", response_model=schemas.MovieOut, tags=["movies"])
+async def get_movie_by_id(movie_id: int, request: Request, fields: Optional[str] = FIELDS_QUERY, db: AsyncSession = Depends(get_async_db)):
+    projection = fastread.parse_fields("movies", fields)
+    async def load():
+        if projection:
+            return found(await db.run_sync(lambda s: fastread.get_movie(s, movie_id, fields=projection)), "Movie not found")
+        return found(await crud_async.get_movie(db, movie_id), "Movie not found")
+    return await response_cache.respond_async(request, response_cache.WRITES["movies"], _adapter(projection, schemas.MOVIE), load)
+
+@router.get("/series", response_model=List[schemas.SeriesOut], tags=["series"])
+async def get_series_list(request: Request, year: Optional[int] = Query(None, ge=1888, le=2100), country: Optional[str] = None, director: Optional[str] = None, limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), cursor: Optional[str] = None, depth: SeriesDepth = "episodes", fields: Optional[str] = FIELDS_QUERY, ids: Optional[str] = IDS_QUERY, db: AsyncSession = Depends(get_async_db)):
+    projection = fastread.parse_fields("series", fields)
+    wanted = fastread.parse_ids(ids)
+    async def load():
+        if wanted is not None:
+            return list((await db.run_sync(lambda s: fastread.series_by_ids(s, wanted, depth=depth, fields=projection))).values()), {}
+        if projection:
+            return paged(await db.run_sync(lambda s: fastread.list_series(s, year=year, country=country, director=director, limit=limit, cursor=cursor, depth=depth, fields=projection)))
+        return paged(await crud_async.list_series(db, year=year, country=country, director=director, limit=limit, cursor=cursor, depth=depth))
+    return await response_cache.respond_async(request, response_cache.WRITES["series"], _adapter(projection, schemas.SERIES_LIST), load)
+
+@router.get("/series/{series_id}", response_model=schemas.SeriesOut, tags=["series"])
+async def get_series_by_id(series_id: int, request: Request, depth: SeriesDepth = "episodes", fields: Optional[str] = FIELDS_QUERY, db: AsyncSession = Depends(get_async_db)):
+    projection = fastread.parse_fields("series", fields)
+    async def load():
+        if projection:
+            return found(await db.run_sync(lambda s: fastread.get_series(s, series_id, depth=depth, fields=projection)), "Series not found")
+        return found(await crud_async.get_series(db, series_id, depth=depth), "Series not found")
+    return await response_cache.respond_async(request, response_cache.WRITES["series"], _adapter(projection, schemas.SERIES), load)
+
+@router.get("/games", response_model=List[schemas.GameOut], tags=["games"])
+async def get_games(request: Request, year: Optional[int] = Query(None, ge=1950, le=2100), country: Optional[str] = None, publisher: Optional[str] = None, limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), cursor: Optional[str] = None, fields: Optional[str] = FIELDS_QUERY, ids: Optional[str] = IDS_QUERY, db: AsyncSession = Depends(get_async_db)):
+    projection = fastread.parse_fields("games", fields)
+    wanted = fastread.parse_ids(ids)
+    async def load():
+        if wanted is not None:
+            return list((await db.run_sync(lambda s: fastread.games_by_ids(s, wanted, fields=projection))).values()), {}
+        if projection:
+            return paged(await db.run_sync(lambda s: fastread.list_games(s, year=year, country=country, publisher=publisher, limit=limit, cursor=cursor, fields=projection)))
+        return paged(await crud_async.list_games(db, year=year, country=country, publisher=publisher, limit=limit, cursor=cursor))
+    return await response_cache.respond_async(request, response_cache.WRITES["games"], _adapter(projection, schemas.GAME_LIST), load)
+
+@router.get("/games/{game_id}", response_model=schemas.GameOut, tags=["games"])
+async def get_game_by_id(game_id: int, request: Request, fields: Optional[str] = FIELDS_QUERY, db: AsyncSession = Depends(get_async_db)):
+    projection = fastread.parse_fields("games", fields)
+    async def load():
+        if projection:
+            return found(await db.run_sync(lambda s: fastread.get_game(s, game_id, fields=projection)), "Game not found")
+        return found(await crud_async.get_game(db, game_id), "Game not found")
+    return await response_cache.respond_async(request, response_cache.WRITES["games"], _adapter(projection, schemas.GAME), load)
+
+def install(app: FastAPI) -> None:
+    """Swap the sync GET routes of `app` for the async ones defined above."""
+    replaced = {(r.path, m) for r in router.routes for m in r.methods}
+    app.router.routes = [
+        r for r in app.router.routes
+        if not (isinstance(r, APIRoute) and any((r.path, m) in replaced for m in r.methods))
+    ]
+    app.include_router(router)
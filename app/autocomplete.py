@@ -0,0 +1,104 @@
+"""Prefix index behind the ?prefix= type-ahead of /countries, /directors and /publishers.
+
+Per table, every (folded name, name, id) is kept in one list sorted by folded
+name, where folding drops accents and case ("Almodóvar" -> "almodovar"). A
+prefix query is one bisect to the first entry >= the folded prefix and a walk
+over the next `limit` entries, so it costs O(log n + limit) whatever the size
+of the table. Each table is loaded on its first query.
+
+Rows inserted through crud.lookup_id/lookup_ids are added when their session
+commits (see lookup_cache). Rows inserted by other processes are picked up by
+a query for ids above the highest one loaded, at most
+NAME_INDEX_MAX_STALENESS seconds after they commit.
+"""
+import os
+import threading
+import time
+import unicodedata
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional, Set, Tuple
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from . import models
+
+NAME_INDEX_MAX_STALENESS = float(os.getenv("NAME_INDEX_MAX_STALENESS", "1.0"))
+
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 100
+
+TABLES = {"countries": models.Country, "directors": models.Director, "publishers": models.Publisher}
+
+def fold(name: str) -> str:
+    """Case- and accent-insensitive form of a name, used for matching and ordering."""
+    decomposed = unicodedata.normalize("NFKD", name)
+    return "".join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+class _Table:
+    def __init__(self):
+        self.entries: List[Tuple[str, str, int]] = []
+        self.ids: Set[int] = set()
+        self.top = 0  # highest id read from the database
+        self.checked_at = 0.0
+
+    def add(self, name: str, id: int) -> None:
+        if id not in self.ids:
+            self.ids.add(id)
+            insort(self.entries, (fold(name), name, id))
+
+class PrefixIndex:
+    def __init__(self):
+        self._tables: Dict[str, _Table] = {}
+        self._lock = threading.Lock()
+
+    def _sync(self, db: Session, table: str) -> _Table:
+        """The table's entries, after reading rows newer than the last read when it may be stale."""
+        t = self._tables.get(table)
+        if t is not None and time.monotonic() - t.checked_at <= NAME_INDEX_MAX_STALENESS:
+            return t
+        with self._lock:
+            t = self._tables.get(table)
+            if t is None:
+                t = _Table()
+            model = TABLES[table]
+            rows = db.execute(select(model.id, model.name).where(model.id > t.top)).all()
+            if not t.entries:
+                t.entries = sorted((fold(name), name, id) for id, name in rows)
+                t.ids = {id for id, _ in rows}
+            else:
+                for id, name in rows:
+                    t.add(name, id)
+            t.top = max([t.top] + [id for id, _ in rows])
+            t.checked_at = time.monotonic()
+            self._tables[table] = t
+            return t
+
+    def search(self, db: Session, table: str, prefix: str, limit: int=DEFAULT_LIMIT) -> List[dict]:
+        """Up to `limit` {"id", "name"} whose folded name starts with the folded `prefix`, in folded order."""
+        t = self._sync(db, table)
+        key = fold(prefix.strip())
+        out = []
+        with self._lock:  # add() may be shifting entries
+            for pos in range(bisect_left(t.entries, (key,)), len(t.entries)):
+                folded, name, id = t.entries[pos]
+                if not folded.startswith(key) or len(out) == limit:
+                    break
+                out.append({"id": id, "name": name})
+        return out
+
+    def add(self, table: str, name: str, id: int) -> None:
+        """Record a committed insert; a table that is not loaded yet will read it with the rest."""
+        with self._lock:
+            t = self._tables.get(table)
+            if t is not None:
+                t.add(name, id)
+
+    def invalidate(self, table: Optional[str]=None) -> None:
+        with self._lock:
+            if table is None: self._tables.clear()
+            else: self._tables.pop(table, None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {table: len(t.entries) for table, t in self._tables.items()}
+
+index = PrefixIndex()
@@ -0,0 +1,121 @@
+"""Database setup on startup, and prebuilt SQLite snapshots for seeding new replicas.
+
+init_db() runs from the app's lifespan, not at import time: it restores the
+DB_SEED_SNAPSHOT file into an empty SQLite database, creates missing tables and
+upgrades older databases (changes.ensure, crud.ensure_name_keys, stats.ensure,
+and the catalog indexes added after their tables existed).
+
+    DATABASE_URL=sqlite:///./build.db python -m app.bootstrap snapshot ./seed/catalog.db --seed
+
+writes a snapshot of DATABASE_URL (here first seeded with app/seed.py):
+schema upgraded, FTS index merged, statistics gathered with ANALYZE, and the
+file compacted with VACUUM INTO. A replica started with
+DB_SEED_SNAPSHOT=./seed/catalog.db on an empty volume copies it with the SQLite
+backup API instead of replaying the seed, and serves /health once done.
+"""
+import argparse
+import logging
+import os
+import sqlite3
+import time
+from sqlalchemy import inspect
+from sqlalchemy.engine import make_url
+from . import changes, crud, models, stats
+from .database import DATABASE_URL, IS_SQLITE, IS_SQLITE_MEMORY, Base, SessionLocal, check_profile, engine
+
+logger = logging.getLogger(__name__)
+
+DB_SEED_SNAPSHOT = os.getenv("DB_SEED_SNAPSHOT", "")
+
+# What the last init_db() did; served by GET /system/db.
+report: dict = {}
+
+def _sqlite_path() -> str:
+    return make_url(DATABASE_URL).database
+
+def restore(source: str, target: str) -> None:
+    """Copy the SQLite database `source` into `target` with the backup API.
+
+    The copy is made next to `target` and renamed over it, so an interrupted
+    restore never leaves a half-written database behind.
+    """
+    partial = f"{target}.restoring"
+    if os.path.exists(partial):
+        os.remove(partial)
+    src = sqlite3.connect(f"file:{source}?mode=ro", uri=True)
+    dst = sqlite3.connect(partial)
+    try:
+        with dst:
+            src.backup(dst)
+    finally:
+        src.close(); dst.close()
+    os.replace(partial, target)
+
+def _restore_if_empty() -> bool:
+    if not (DB_SEED_SNAPSHOT and IS_SQLITE and not IS_SQLITE_MEMORY):
+        return False
+    target = _sqlite_path()
+    if os.path.exists(target) and os.path.getsize(target) > 0:
+        return False
+    restore(DB_SEED_SNAPSHOT, target)
+    engine.dispose()  # no pooled connection may still point at the file that was replaced
+    return True
+
+def create_missing_indexes() -> None:
+    """Create catalog indexes added to the models after the tables were (create_all() skips existing tables)."""
+    with engine.begin() as conn:
+        for model in (models.Movie, models.Series, models.Game):
+            for index in model.__table__.indexes:
+                index.create(conn, checkfirst=True)
+
+def init_db() -> dict:
+    """Make the database ready to serve: restore the seed snapshot if empty, create and upgrade the schema."""
+    started = time.perf_counter()
+    restored = _restore_if_empty()
+    Base.metadata.create_all(bind=engine)
+    report.update(check_profile())
+    with SessionLocal() as db:
+        changes.ensure(db)
+        crud.ensure_name_keys(db)
+        stats.ensure(db)
+    create_missing_indexes()  # after the upgrades above added the columns they index
+    report["startup"] = {"restored_from": DB_SEED_SNAPSHOT if restored else None,
+                         "seconds": round(time.perf_counter() - started, 3)}
+    logger.info("Database ready in %.3fs%s", report["startup"]["seconds"],
+                f" (restored from {DB_SEED_SNAPSHOT})" if restored else "")
+    return report
+
+def write_snapshot(output: str) -> int:
+    """Write a compacted, analyzed copy of the (SQLite) DATABASE_URL to `output`; returns its size in bytes."""
+    if not IS_SQLITE or IS_SQLITE_MEMORY:
+        raise ValueError("Snapshots need a file-backed SQLite DATABASE_URL")
+    init_db()
+    partial = f"{output}.partial"
+    if os.path.exists(partial):
+        os.remove(partial)
+    with engine.connect() as conn:
+        if "catalog_fts" in inspect(conn).get_table_names():
+            conn.exec_driver_sql("INSERT INTO catalog_fts(catalog_fts) VALUES ('optimize')")
+        conn.exec_driver_sql("ANALYZE")
+        conn.commit()
+        # VACUUM cannot run inside a transaction; the driver-level connection is in autocommit here.
+        conn.connection.driver_connection.execute("VACUUM INTO ?", (partial,))
+    os.replace(partial, output)
+    return os.path.getsize(output)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Database snapshots for fast replica startup")
+    commands = parser.add_subparsers(dest="command", required=True)
+    snap = commands.add_parser("snapshot", help="write a compacted, analyzed copy of DATABASE_URL")
+    snap.add_argument("output")
+    snap.add_argument("--seed", action="store_true", help="load app/seed.py's sample data first")
+    args = parser.parse_args()
+    if args.seed:
+        from .seed import seed
+        seed()
+    started = time.perf_counter()
+    size = write_snapshot(args.output)
+    print(f"Snapshot {args.output}: {size / 1e6:.1f} MB in {time.perf_counter() - started:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+import os
+from collections import Counter
+from typing import AsyncIterator, Dict, List, NamedTuple, Optional, Tuple, Type
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert, select, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from . import changes, crud, models, response_cache, schemas, stats
+
+BULK_CHUNK_SIZE = int(os.getenv("BULK_CHUNK_SIZE", "1000"))
+MAX_BULK_CHUNK_SIZE = 10000
+
+class BulkSpec(NamedTuple):
+    model: type
+    schema: Type[BaseModel]
+    # FK column -> (lookup model, name field on the payload)
+    lookups: Dict[str, Tuple[type, str]]
+
+SPECS = {
+    "movies": BulkSpec(models.Movie, schemas.MovieCreate, {
+        "country_id": (models.Country, "country_name"), "director_id": (models.Director, "director_name")}),
+    "series": BulkSpec(models.Series, schemas.SeriesCreate, {
+        "country_id": (models.Country, "country_name"), "director_id": (models.Director, "director_name")}),
+    "games": BulkSpec(models.Game, schemas.GameCreate, {
+        "country_id": (models.Country, "country_name"), "publisher_id": (models.Publisher, "publisher_name")}),
+}
+
+Record = Tuple[int, BaseModel]
+
+async def _iter_lines(stream: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    buf = b""
+    async for part in stream:
+        buf += part
+        *lines, buf = buf.split(b"\n")
+        for line in lines:
+            yield line
+    if buf:
+        yield buf
+
+def _describe(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(p) for p in e['loc'])}: {e['msg']}" if e["loc"] else e["msg"]
+        for e in exc.errors()
+    )
+
+def _check_series(record: schemas.SeriesCreate) -> Optional[str]:
+    numbers = [sc.number for sc in record.seasons]
+    if len(numbers) != len(set(numbers)):
+        return "duplicate season number"
+    for sc in record.seasons:
+        eps = [ec.number for ec in sc.episodes]
+        if len(eps) != len(set(eps)):
+            return f"duplicate episode number in season {sc.number}"
+    return None
+
+def _insert_series_tree(db: Session, rows: List[dict], records: List[Record], deltas: Counter, revision: int) -> None:
+    """Insert series rows and their seasons/episodes; children take revisions from `revision` on."""
+    returning = dict(sort_by_parameter_order=True)
+    series_ids = db.execute(
+        insert(models.Series.__table__).returning(models.Series.__table__.c.id, **returning), rows
+    ).scalars().all()
+    season_rows, season_episodes = [], []
+    for series_id, (_, r) in zip(series_ids, records):
+        stats.count_seasons(deltas, series_id, len(r.seasons), sum(len(sc.episodes) for sc in r.seasons))
+        for sc in r.seasons:
+            season_rows.append({"series_id": series_id, "number": sc.number, "year": sc.year, "revision": revision})
+            revision += 1
+            season_episodes.append(sc.episodes)
+    if not season_rows:
+        return
+    season_ids = db.execute(
+        insert(models.Season.__table__).returning(models.Season.__table__.c.id, **returning), season_rows
+    ).scalars().all()
+    episode_rows = [
+        {"season_id": season_id, "number": ec.number, "title": ec.title}
+        for season_id, episodes in zip(season_ids, season_episodes) for ec in episodes
+    ]
+    for i, row in enumerate(episode_rows, revision):
+        row["revision"] = i
+    if episode_rows:
+        db.execute(insert(models.Episode.__table__), episode_rows)
+
+def _write_chunk(db: Session, kind: str, records: List[Record], errors: List[schemas.BulkError]) -> int:
+    """Insert one chunk in a single transaction; (title, year) conflicts become per-line errors."""
+    spec = SPECS[kind]
+    model = spec.model
+    keys = {(r.title, r.year) for _, r in records}
+    existing = set(db.execute(
+        select(model.title, model.year).where(tuple_(model.title, model.year).in_(keys))
+    ).all())
+    fresh, seen = [], set()
+    for line, r in records:
+        key = (r.title, r.year)
+        if key in existing or key in seen:
+            errors.append(schemas.BulkError(line=line, error=f"duplicate (title, year): ({r.title!r}, {r.year})"))
+            continue
+        seen.add(key)
+        fresh.append((line, r))
+    if not fresh:
+        return 0
+    ids = {
+        col: crud.lookup_ids(db, ref, [getattr(r, field) for _, r in fresh])
+        for col, (ref, field) in spec.lookups.items()
+    }
+    rows = [
+        {"title": r.title, "year": r.year,
+         **{col: ids[col][getattr(r, field).strip()] for col, (_, field) in spec.lookups.items()}}
+        for _, r in fresh
+    ]
+    children = sum(changes.tree_size(r.seasons) for _, r in fresh) if model is models.Series else 0
+    revision = changes.allocate(db, len(rows) + children)
+    deltas = Counter()
+    for i, row in enumerate(rows):
+        row["revision"] = revision + i
+        stats.count_title(deltas, kind, row)
+    if model is models.Series:
+        _insert_series_tree(db, rows, fresh, deltas, revision + len(rows))
+    else:
+        db.execute(insert(model.__table__), rows)
+    stats.apply(db, deltas)
+    db.commit()
+    response_cache.invalidate(kind)
+    return len(fresh)
+
+def write_chunk(db: Session, kind: str, records: List[Record], errors: List[schemas.BulkError]) -> int:
+    # A concurrent writer may insert one of our keys after the conflict check, so a
+    # chunk gets a second attempt. Each attempt collects its own per-line errors and
+    # only the attempt that returns reports them.
+    for last in (False, True):
+        attempt: List[schemas.BulkError] = []
+        try:
+            inserted = _write_chunk(db, kind, records, attempt)
+        except IntegrityError as exc:
+            db.rollback()
+            if last:
+                errors.extend(schemas.BulkError(line=line, error=f"chunk rejected: {exc.orig}") for line, _ in records)
+                return 0
+            continue
+        errors.extend(attempt)
+        return inserted
+
+async def ingest(db: Session, kind: str, stream: AsyncIterator[bytes], chunk_size: int=BULK_CHUNK_SIZE) -> schemas.BulkResult:
+    """Validate an NDJSON body line by line and write it in chunk_size transactions."""
+    spec = SPECS[kind]
+    result = schemas.BulkResult()
+    chunk: List[Record] = []
+    line_no = 0
+    async for raw in _iter_lines(stream):
+        line_no += 1
+        if not raw.strip():
+            continue
+        result.received += 1
+        try:
+            record = spec.schema.model_validate_json(raw)
+        except ValidationError as exc:
+            result.errors.append(schemas.BulkError(line=line_no, error=_describe(exc)))
+            continue
+        problem = _check_series(record) if kind == "series" else None
+        if problem:
+            result.errors.append(schemas.BulkError(line=line_no, error=problem))
+            continue
+        chunk.append((line_no, record))
+        if len(chunk) >= chunk_size:
+            result.inserted += await run_in_threadpool(write_chunk, db, kind, chunk, result.errors)
+            chunk = []
+    if chunk:
+        result.inserted += await run_in_threadpool(write_chunk, db, kind, chunk, result.errors)
+    result.errors.sort(key=lambda e: e.line)
+    return result
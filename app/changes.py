@@ -0,0 +1,121 @@
+"""Revisions and tombstones behind GET /changes, the incremental sync feed.
+
+Every write takes fresh revisions from the single revision_counter row with
+allocate() and stamps them on the rows it inserts or updates; deletes record a
+tombstone per removed row instead. Each row gets its own revision, so a
+client's last seen revision is a complete cursor. The counter row stays locked
+until the writer commits, so revisions become visible in increasing order.
+
+read() returns the rows and tombstones with a revision above `since`: one
+range scan on each revision index, so its cost follows the number of changes,
+not the catalog size.
+"""
+import heapq
+from itertools import islice
+from operator import itemgetter
+from typing import Iterable, Iterator, List, Tuple
+from sqlalchemy import func, insert, inspect, literal, select, text, update
+from sqlalchemy.orm import Session
+from . import fastread, models, schemas
+
+DEFAULT_LIMIT = 500
+MAX_LIMIT = 5000
+
+counter = models.RevisionCounter.__table__
+tombstones = models.Tombstone.__table__
+
+# Backfill order of rows written before revisions existed: parents before children.
+TABLES = {"movies": models.Movie, "series": models.Series, "seasons": models.Season,
+          "episodes": models.Episode, "games": models.Game}
+TITLES = {"movies": (models.Movie, models.Director, "director"), "series": (models.Series, models.Director, "director"),
+          "games": (models.Game, models.Publisher, "publisher")}
+
+def allocate(db: Session, n: int=1) -> int:
+    """Reserve n consecutive revisions in the caller's transaction; returns the first."""
+    stmt = update(counter).where(counter.c.id == 1).values(value=counter.c.value + n)
+    if db.get_bind().dialect.update_returning:
+        last = db.execute(stmt.returning(counter.c.value)).scalar()
+    else:
+        db.execute(stmt)
+        last = db.execute(select(counter.c.value).where(counter.c.id == 1)).scalar()
+    return last - n + 1
+
+def tree_size(seasons: List[schemas.SeasonCreate]) -> int:
+    """Revisions needed by insert_seasons for `seasons`: one per season and per episode."""
+    return len(seasons) + sum(len(sc.episodes) for sc in seasons)
+
+def tombstone(db: Session, deleted: Iterable[Tuple[str, int]]) -> None:
+    """Record (entity, id) pairs as deleted, with one executemany."""
+    deleted = list(deleted)
+    first = allocate(db, len(deleted))
+    db.execute(insert(tombstones), [{"revision": first + i, "entity": entity, "entity_id": id}
+                                    for i, (entity, id) in enumerate(deleted)])
+
+def _add_missing_columns(db: Session) -> None:
+    # create_all() does not alter tables that already exist.
+    inspector = inspect(db.get_bind())
+    for model in TABLES.values():
+        table = model.__table__
+        if "revision" in {c["name"] for c in inspector.get_columns(table.name)}:
+            continue
+        db.execute(text(f"ALTER TABLE {table.name} ADD COLUMN revision INTEGER NOT NULL DEFAULT 0"))
+        for index in table.indexes:
+            if "revision" in index.columns:
+                index.create(db.connection())
+
+def backfill(db: Session) -> int:
+    """Give unique revisions to rows that have none (revision 0); returns how many were updated."""
+    updated = 0
+    for model in TABLES.values():
+        if db.execute(select(model.id).where(model.revision == 0).limit(1)).first() is None:
+            continue
+        top = db.execute(select(func.max(model.id))).scalar()
+        base = allocate(db, top) - 1
+        updated += db.execute(update(model).where(model.revision == 0).values(revision=model.id + base)).rowcount
+    db.commit()
+    return updated
+
+def ensure(db: Session) -> None:
+    """Upgrade a database created before revisions existed, and stamp rows written around the API."""
+    _add_missing_columns(db)
+    backfill(db)
+
+def _selects(since: int, upto: int, limit: int) -> list:
+    """(statement, to_data) per source; every statement has "revision", "id" and "entity" columns."""
+    def changed(stmt, revision):
+        return stmt.where(revision > since, revision <= upto).order_by(revision).limit(limit)
+    out = []
+    for entity, (model, person_model, person_key) in TITLES.items():
+        stmt = fastread._titles_select(model, person_model, person_key).add_columns(model.revision, literal(entity).label("entity"))
+        # A series without its seasons has MovieOut's shape.
+        out.append((changed(stmt, model.revision), fastread._game if entity == "games" else fastread._movie))
+    Season, Episode = models.Season, models.Episode
+    out.append((changed(select(Season.revision, Season.id, Season.series_id, Season.number, Season.year, literal("seasons").label("entity")), Season.revision),
+                lambda r: {"id": r.id, "series_id": r.series_id, "number": r.number, "year": r.year}))
+    out.append((changed(select(Episode.revision, Episode.id, Episode.season_id, Episode.number, Episode.title, literal("episodes").label("entity")), Episode.revision),
+                lambda r: {"id": r.id, "season_id": r.season_id, "number": r.number, "title": r.title}))
+    out.append((changed(select(tombstones.c.revision, tombstones.c.entity_id.label("id"), tombstones.c.entity), tombstones.c.revision), None))
+    return out
+
+def _stream(conn, stmt, to_data) -> Iterator[tuple]:
+    for r in conn.execute(stmt):
+        yield r.revision, r, to_data
+
+def read(db: Session, since: int=0, limit: int=DEFAULT_LIMIT) -> dict:
+    """ChangesOut-shaped dict: up to `limit` changes after `since`, oldest first.
+
+    Pass "next" back as `since` to continue; "more" says whether another page is waiting.
+    """
+    # Every revision up to the committed counter value is already visible to the
+    # queries below; newer ones are left for the next call, so none is skipped.
+    upto = db.execute(select(counter.c.value).where(counter.c.id == 1)).scalar() or 0
+    conn = db.connection()
+    # The sources are read lazily and merged by revision: only about `limit` rows
+    # are fetched and turned into dicts, whichever sources they come from.
+    streams = [_stream(conn, stmt, to_data) for stmt, to_data in _selects(since, upto, limit + 1)]
+    rows = list(islice(heapq.merge(*streams, key=itemgetter(0)), limit + 1))
+    more = len(rows) > limit
+    changes = [{"revision": rev, "entity": r.entity, "id": r.id, "deleted": to_data is None,
+                "data": to_data(r) if to_data else None} for rev, r, to_data in rows[:limit]]
+    return {"since": since, "next": changes[-1]["revision"] if more else max(upto, since),
+            "more": more, "changes": changes}
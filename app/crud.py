@@ -1,155 +1,378 @@
-from typing import List, Optional
-from sqlalchemy.orm import Session, joinedload
-from . import models, schemas
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import delete, insert, inspect, select, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session, joinedload, noload, selectinload
+from . import changes, fastread, lookup_cache, models, schemas, stats
+from .pagination import DEFAULT_PAGE_SIZE, Page, keyset_select, to_page
 
-def get_or_create_country(db: Session, name: str) -> models.Country:
+def _insert_ignore(db: Session, table):
+    """INSERT that silently skips rows violating a unique constraint, where the dialect allows it."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        return sqlite_insert(table).on_conflict_do_nothing()
+    if dialect == "postgresql":
+        return pg_insert(table).on_conflict_do_nothing()
+    return insert(table)
+
+def _insert_lookup(db: Session, model, name: str) -> Optional[int]:
+    """INSERT a lookup row, returning its id, or None if a concurrent writer got there first."""
+    stmt = _insert_ignore(db, model.__table__).values(name=name)
+    if db.get_bind().dialect.insert_returning:
+        return db.execute(stmt.returning(model.__table__.c.id)).scalar()
+    return db.execute(stmt).inserted_primary_key[0]
+
+def lookup(db: Session, model, name: str) -> Tuple[int, str]:
+    """(id, stored name) of the Country/Director/Publisher matching `name` up to case and spacing, creating the row if needed.
+
+    The insert joins the caller's transaction; its id reaches the shared cache only on commit.
+    """
     name = name.strip()
-    obj = db.query(models.Country).filter_by(name=name).first()
-    if not obj:
-        obj = models.Country(name=name)
-        db.add(obj); db.commit(); db.refresh(obj)
-    return obj
+    table = model.__tablename__
+    entry = lookup_cache.pending(db).get((table, models.name_key(name)))
+    if entry is None:
+        entry = lookup_cache.cache.entry(table, name)
+    if entry is not None:
+        return entry
+    row = db.execute(select(model.id, model.name).where(model.name_key == models.name_key(name))).first()
+    if row is None:
+        id = _insert_lookup(db, model, name)
+        if id is not None:
+            lookup_cache.stage(db, table, name, id)
+            return id, name
+        row = db.execute(select(model.id, model.name).where(model.name_key == models.name_key(name))).first()
+    lookup_cache.cache.put(table, row.name, row.id)
+    return row.id, row.name
+
+def lookup_id(db: Session, model, name: str) -> int:
+    return lookup(db, model, name)[0]
+
+def lookup_ids(db: Session, model, names: Iterable[str]) -> Dict[str, int]:
+    """Batch version of lookup_id: one SELECT for the uncached names, one multi-row INSERT for the new ones.
+
+    Returns an id for each stripped name; names differing only in case or spacing share it.
+    """
+    table = model.__tablename__
+    staged = lookup_cache.pending(db)
+    names = {n.strip() for n in names}
+    by_key: Dict[str, int] = {}
+    missing: Dict[str, str] = {}  # name key -> name to insert
+    for name in names:
+        key = models.name_key(name)
+        entry = staged.get((table, key)) or lookup_cache.cache.entry(table, name)
+        if entry is None: missing.setdefault(key, name)
+        else: by_key[key] = entry[0]
+    if missing:
+        found = db.execute(select(model.name_key, model.id, model.name).where(model.name_key.in_(missing))).all()
+        for key, id, name in found:
+            lookup_cache.cache.put(table, name, id)
+            by_key[key] = id
+            del missing[key]
+    if missing:
+        db.execute(_insert_ignore(db, model.__table__), [{"name": n} for n in missing.values()])
+        created = db.execute(select(model.name_key, model.id, model.name).where(model.name_key.in_(missing))).all()
+        for key, id, name in created:
+            lookup_cache.stage(db, table, name, id)
+            by_key[key] = id
+    return {name: by_key[models.name_key(name)] for name in names}
+
+def _named(db: Session, model, name: str) -> dict:
+    """{"id", "name"} for a lookup name, creating the row if needed; used to build write responses."""
+    id, name = lookup(db, model, name)
+    return {"id": id, "name": name}
+
+# Lookup table -> its foreign key column in the title tables.
+LOOKUP_FKS = {models.Country: "country_id", models.Director: "director_id", models.Publisher: "publisher_id"}
+
+def ensure_name_keys(db: Session) -> int:
+    """Add and fill name_key on a database created before it existed; returns how many rows were merged away.
+
+    Names that only differ in case or spacing would break its unique index, so their
+    titles are moved to the oldest of them (with new revisions) and the others deleted.
+    """
+    inspector = inspect(db.get_bind())
+    merged = 0
+    for model, fk in LOOKUP_FKS.items():
+        table = model.__table__
+        if "name_key" in {c["name"] for c in inspector.get_columns(table.name)}:
+            continue
+        # Nullable here: SQLite cannot add a NOT NULL column without a default.
+        db.execute(text(f"ALTER TABLE {table.name} ADD COLUMN name_key VARCHAR({table.c.name_key.type.length})"))
+        groups = defaultdict(list)
+        for id, name in db.execute(select(model.id, model.name).order_by(model.id)):
+            groups[models.name_key(name)].append(id)
+        for ids in groups.values():
+            keep, duplicates = ids[0], ids[1:]
+            if not duplicates:
+                continue
+            for title_model in (models.Movie, models.Series, models.Game):
+                column = getattr(title_model, fk, None)
+                moved = db.execute(select(title_model.id).where(column.in_(duplicates))).scalars().all() if column is not None else []
+                if moved:
+                    first = changes.allocate(db, len(moved))
+                    db.execute(update(title_model), [{"id": id, fk: keep, "revision": first + i} for i, id in enumerate(moved)])
+            db.execute(delete(model).where(model.id.in_(duplicates)))
+            merged += len(duplicates)
+        db.execute(update(model), [{"id": ids[0], "name_key": key} for key, ids in groups.items()])
+        for index in table.indexes:
+            if "name_key" in index.columns:
+                index.create(db.connection())
+    db.commit()
+    if merged:
+        stats.rebuild(db)
+    return merged
+
+def get_or_create_country(db: Session, name: str) -> models.Country:
+    return db.get(models.Country, lookup_id(db, models.Country, name))
 
 def get_or_create_director(db: Session, name: str) -> models.Director:
-    name = name.strip()
-    obj = db.query(models.Director).filter_by(name=name).first()
-    if not obj:
-        obj = models.Director(name=name)
-        db.add(obj); db.commit(); db.refresh(obj)
-    return obj
+    return db.get(models.Director, lookup_id(db, models.Director, name))
 
 def get_or_create_publisher(db: Session, name: str) -> models.Publisher:
-    name = name.strip()
-    obj = db.query(models.Publisher).filter_by(name=name).first()
-    if not obj:
-        obj = models.Publisher(name=name)
-        db.add(obj); db.commit(); db.refresh(obj)
-    return obj
-
-def list_movies(db: Session, year: Optional[int]=None, country: Optional[str]=None, director: Optional[str]=None) -> List[models.Movie]:
-    q = db.query(models.Movie).options(joinedload(models.Movie.country), joinedload(models.Movie.director))
-    if year: q = q.filter(models.Movie.year == year)
-    if country: q = q.join(models.Country).filter(models.Country.name == country)
-    if director: q = q.join(models.Director).filter(models.Director.name == director)
-    return q.order_by(models.Movie.year.desc(), models.Movie.title.asc()).all()
+    return db.get(models.Publisher, lookup_id(db, models.Publisher, name))
 
-def get_movie(db: Session, movie_id: int) -> Optional[models.Movie]:
-    return db.query(models.Movie)\
+def movies_select(year: Optional[int]=None, country: Optional[str]=None, director: Optional[str]=None):
+    stmt = select(models.Movie).options(joinedload(models.Movie.country), joinedload(models.Movie.director))
+    if year: stmt = stmt.where(models.Movie.year == year)
+    if country: stmt = stmt.join(models.Country).where(models.Country.name_key == models.name_key(country))
+    if director: stmt = stmt.join(models.Director).where(models.Director.name_key == models.name_key(director))
+    return stmt
+
+def list_movies(db: Session, year: Optional[int]=None, country: Optional[str]=None, director: Optional[str]=None, limit: int=DEFAULT_PAGE_SIZE, cursor: Optional[str]=None) -> Page:
+    stmt = keyset_select(movies_select(year, country, director), models.Movie, limit, cursor)
+    return to_page(db.execute(stmt).scalars().all(), limit)
+
+def movie_select(movie_id: int):
+    return select(models.Movie)\
         .options(joinedload(models.Movie.country), joinedload(models.Movie.director))\
-        .filter(models.Movie.id == movie_id).first()
+        .where(models.Movie.id == movie_id)
+
+def get_movie(db: Session, movie_id: int) -> Optional[models.Movie]:
+    return db.execute(movie_select(movie_id)).scalars().first()
 
-def create_movie(db: Session, data: schemas.MovieCreate) -> models.Movie:
-    country = get_or_create_country(db, data.country_name)
-    director = get_or_create_director(db, data.director_name)
-    m = models.Movie(title=data.title, year=data.year, country_id=country.id, director_id=director.id)
-    db.add(m); db.commit(); db.refresh(m)
-    return get_movie(db, m.id)
+# Writes run in one transaction and return MovieOut/SeriesOut/GameOut-shaped dicts
+# built from the request and the session before the commit, so nothing is re-read
+# after it (expire_on_commit would otherwise reload every attribute).
+
+def create_movie(db: Session, data: schemas.MovieCreate) -> dict:
+    country = _named(db, models.Country, data.country_name)
+    director = _named(db, models.Director, data.director_name)
+    m = models.Movie(title=data.title, year=data.year, country_id=country["id"], director_id=director["id"], revision=changes.allocate(db))
+    db.add(m); db.flush()
+    stats.apply(db, stats.count_title(Counter(), "movies", stats.snapshot("movies", m)))
+    out = {"id": m.id, "title": m.title, "year": m.year, "director": director, "country": country}
+    db.commit()
+    return out
 
-def update_movie(db: Session, m: models.Movie, data: schemas.MovieUpdate) -> models.Movie:
+def update_movie(db: Session, m: models.Movie, data: schemas.MovieUpdate) -> dict:
+    """`m` must come from get_movie, which loads country and director."""
+    before = stats.snapshot("movies", m)
+    country = {"id": m.country.id, "name": m.country.name}
+    director = {"id": m.director.id, "name": m.director.name}
     if data.title is not None: m.title = data.title
     if data.year is not None: m.year = data.year
     if data.country_name is not None:
-        c = get_or_create_country(db, data.country_name); m.country_id = c.id
+        country = _named(db, models.Country, data.country_name); m.country_id = country["id"]
     if data.director_name is not None:
-        d = get_or_create_director(db, data.director_name); m.director_id = d.id
-    db.add(m); db.commit(); db.refresh(m)
-    return get_movie(db, m.id)
+        director = _named(db, models.Director, data.director_name); m.director_id = director["id"]
+    m.revision = changes.allocate(db)
+    stats.apply(db, stats.count_change("movies", before, stats.snapshot("movies", m)))
+    out = {"id": m.id, "title": m.title, "year": m.year, "director": director, "country": country}
+    db.commit()
+    return out
 
 def delete_movie(db: Session, m: models.Movie) -> None:
+    stats.apply(db, stats.count_title(Counter(), "movies", stats.snapshot("movies", m), -1))
+    changes.tombstone(db, [("movies", m.id)])
     db.delete(m); db.commit()
 
-def list_series(db: Session, year: Optional[int]=None, country: Optional[str]=None, director: Optional[str]=None) -> List[models.Series]:
-    q = db.query(models.Series).options(
-        joinedload(models.Series.country),
-        joinedload(models.Series.director),
-        joinedload(models.Series.seasons).joinedload(models.Season.episodes)
-    )
-    if year: q = q.filter(models.Series.year == year)
-    if country: q = q.join(models.Country).filter(models.Country.name == country)
-    if director: q = q.join(models.Director).filter(models.Director.name == director)
-    return q.order_by(models.Series.year.desc(), models.Series.title.asc()).all()
-
-def get_series(db: Session, series_id: int) -> Optional[models.Series]:
-    return db.query(models.Series)\
-        .options(
-            joinedload(models.Series.country),
-            joinedload(models.Series.director),
-            joinedload(models.Series.seasons).joinedload(models.Season.episodes)
-        ).filter(models.Series.id == series_id).first()
-
-def create_series(db: Session, data: schemas.SeriesCreate) -> models.Series:
-    country = get_or_create_country(db, data.country_name)
-    director = get_or_create_director(db, data.director_name)
-    s = models.Series(title=data.title, year=data.year, country_id=country.id, director_id=director.id)
-    db.add(s); db.commit(); db.refresh(s)
-    for sc in data.seasons:
-        season = models.Season(series_id=s.id, number=sc.number, year=sc.year)
-        db.add(season); db.commit(); db.refresh(season)
-        for ec in sc.episodes:
-            ep = models.Episode(season_id=season.id, number=ec.number, title=ec.title)
-            db.add(ep)
-        db.commit()
-    return get_series(db, s.id)
-
-def update_series(db: Session, s: models.Series, data: schemas.SeriesUpdate) -> models.Series:
+SeriesDepth = schemas.SeriesDepth
+
+def _series_options(depth: SeriesDepth) -> list:
+    # Collections are loaded with selectin batches (one extra query per level)
+    # instead of joinedload, which would return one row per episode per series.
+    opts = [joinedload(models.Series.country), joinedload(models.Series.director)]
+    if depth == "series":
+        opts.append(noload(models.Series.seasons))
+    elif depth == "seasons":
+        opts.append(selectinload(models.Series.seasons).noload(models.Season.episodes))
+    else:
+        opts.append(selectinload(models.Series.seasons).selectinload(models.Season.episodes))
+    return opts
+
+def series_select(year: Optional[int]=None, country: Optional[str]=None, director: Optional[str]=None, depth: SeriesDepth="episodes"):
+    stmt = select(models.Series).options(*_series_options(depth))
+    if year: stmt = stmt.where(models.Series.year == year)
+    if country: stmt = stmt.join(models.Country).where(models.Country.name_key == models.name_key(country))
+    if director: stmt = stmt.join(models.Director).where(models.Director.name_key == models.name_key(director))
+    return stmt
+
+def list_series(db: Session, year: Optional[int]=None, country: Optional[str]=None, director: Optional[str]=None, limit: int=DEFAULT_PAGE_SIZE, cursor: Optional[str]=None, depth: SeriesDepth="episodes") -> Page:
+    stmt = keyset_select(series_select(year, country, director, depth), models.Series, limit, cursor)
+    return to_page(db.execute(stmt).scalars().all(), limit)
+
+def one_series_select(series_id: int, depth: SeriesDepth="episodes"):
+    return select(models.Series).options(*_series_options(depth)).where(models.Series.id == series_id)
+
+def get_series(db: Session, series_id: int, depth: SeriesDepth="episodes") -> Optional[models.Series]:
+    return db.execute(one_series_select(series_id, depth)).scalars().first()
+
+def insert_seasons(db: Session, series_id: int, seasons: List[schemas.SeasonCreate], revision: int) -> List[dict]:
+    """Insert seasons and their episodes with one executemany per level; returns SeasonOut-shaped dicts.
+
+    Rows take consecutive revisions from `revision` on (changes.tree_size of them), seasons first.
+
+    Generated ids are read back through the (series_id, number) and (season_id, number)
+    unique keys: RETURNING over an executemany runs row by row on SQLite.
+    """
+    if not seasons:
+        return []
+    db.execute(insert(models.Season.__table__), [{"series_id": series_id, "number": sc.number, "year": sc.year, "revision": revision + i}
+                                                 for i, sc in enumerate(seasons)])
+    season_ids = dict(db.execute(
+        select(models.Season.number, models.Season.id)
+        .where(models.Season.series_id == series_id, models.Season.number.in_([sc.number for sc in seasons]))
+    ).all())
+    episode_rows = [{"season_id": season_ids[sc.number], "number": ec.number, "title": ec.title} for sc in seasons for ec in sc.episodes]
+    for i, row in enumerate(episode_rows, revision + len(seasons)):
+        row["revision"] = i
+    episode_ids = {}
+    if episode_rows:
+        db.execute(insert(models.Episode.__table__), episode_rows)
+        episode_ids = {(season_id, number): id for id, season_id, number in db.execute(
+            select(models.Episode.id, models.Episode.season_id, models.Episode.number)
+            .where(models.Episode.season_id.in_(list(season_ids.values())))
+        )}
+    by_number = lambda item: item.number
+    return [
+        {"id": season_ids[sc.number], "number": sc.number, "year": sc.year, "episodes": [
+            {"id": episode_ids[(season_ids[sc.number], ec.number)], "number": ec.number, "title": ec.title}
+            for ec in sorted(sc.episodes, key=by_number)
+        ]}
+        for sc in sorted(seasons, key=by_number)
+    ]
+
+def create_series(db: Session, data: schemas.SeriesCreate) -> dict:
+    country = _named(db, models.Country, data.country_name)
+    director = _named(db, models.Director, data.director_name)
+    revision = changes.allocate(db, 1 + changes.tree_size(data.seasons))
+    s = models.Series(title=data.title, year=data.year, country_id=country["id"], director_id=director["id"], revision=revision)
+    db.add(s); db.flush()
+    out = {"id": s.id, "title": s.title, "year": s.year, "director": director, "country": country,
+           "seasons": insert_seasons(db, s.id, data.seasons, revision + 1)}
+    deltas = stats.count_title(Counter(), "series", stats.snapshot("series", s))
+    stats.apply(db, stats.count_seasons(deltas, s.id, len(data.seasons), sum(len(sc.episodes) for sc in data.seasons)))
+    db.commit()
+    return out
+
+def update_series(db: Session, s: models.Series, data: schemas.SeriesUpdate) -> dict:
+    """`s` must come from get_series, which loads the whole season/episode tree."""
+    before = stats.snapshot("series", s)
+    country = {"id": s.country.id, "name": s.country.name}
+    director = {"id": s.director.id, "name": s.director.name}
     if data.title is not None: s.title = data.title
     if data.year is not None: s.year = data.year
     if data.country_name is not None:
-        c = get_or_create_country(db, data.country_name); s.country_id = c.id
+        country = _named(db, models.Country, data.country_name); s.country_id = country["id"]
     if data.director_name is not None:
-        d = get_or_create_director(db, data.director_name); s.director_id = d.id
-    db.add(s); db.commit(); db.refresh(s)
-    return get_series(db, s.id)
+        director = _named(db, models.Director, data.director_name); s.director_id = director["id"]
+    s.revision = changes.allocate(db)
+    out = {"id": s.id, "title": s.title, "year": s.year, "director": director, "country": country,
+           "seasons": [{"id": season.id, "number": season.number, "year": season.year,
+                        "episodes": [{"id": e.id, "number": e.number, "title": e.title} for e in season.episodes]}
+                       for season in s.seasons]}
+    stats.apply(db, stats.count_change("series", before, stats.snapshot("series", s)))
+    db.commit()
+    return out
 
 def delete_series(db: Session, s: models.Series) -> None:
+    """`s` must come from get_series, which loads the whole season/episode tree."""
+    deltas = stats.count_title(Counter(), "series", stats.snapshot("series", s), -1)
+    stats.apply(db, stats.drop_series(db, deltas, s.id))
+    changes.tombstone(db, [("episodes", e.id) for season in s.seasons for e in season.episodes]
+                      + [("seasons", season.id) for season in s.seasons] + [("series", s.id)])
     db.delete(s); db.commit()
 
-def add_season(db: Session, series_id: int, season_data: schemas.SeasonCreate) -> models.Series:
-    season = models.Season(series_id=series_id, number=season_data.number, year=season_data.year)
-    db.add(season); db.commit(); db.refresh(season)
-    for ec in season_data.episodes:
-        ep = models.Episode(season_id=season.id, number=ec.number, title=ec.title)
-        db.add(ep)
+def add_season(db: Session, series_id: int, season_data: schemas.SeasonCreate) -> dict:
+    insert_seasons(db, series_id, [season_data], changes.allocate(db, changes.tree_size([season_data])))
+    stats.apply(db, stats.count_seasons(Counter(), series_id, 1, len(season_data.episodes)))
+    # The response is the whole series, so it is read back inside the same transaction.
+    out = fastread.get_series(db, series_id)
     db.commit()
-    return get_series(db, series_id)
+    return out
 
-def list_games(db: Session, year: Optional[int]=None, country: Optional[str]=None, publisher: Optional[str]=None) -> List[models.Game]:
-    q = db.query(models.Game).options(joinedload(models.Game.country), joinedload(models.Game.publisher))
-    if year: q = q.filter(models.Game.year == year)
-    if country: q = q.join(models.Country).filter(models.Country.name == country)
-    if publisher: q = q.join(models.Publisher).filter(models.Publisher.name == publisher)
-    return q.order_by(models.Game.year.desc(), models.Game.title.asc()).all()
+def add_episode(db: Session, series_id: int, number: int, data: schemas.EpisodeCreate) -> Optional[dict]:
+    """Append an episode to season `number`; None if the series has no such season.
 
-def get_game(db: Session, game_id: int) -> Optional[models.Game]:
-    return db.query(models.Game)\
+    A repeated episode number raises IntegrityError from the unique (season_id, number) constraint.
+    """
+    season_id = db.execute(select(models.Season.id).where(models.Season.series_id == series_id, models.Season.number == number)).scalar()
+    if season_id is None:
+        return None
+    ep = models.Episode(season_id=season_id, number=data.number, title=data.title, revision=changes.allocate(db))
+    db.add(ep); db.flush()
+    stats.apply(db, stats.count_seasons(Counter(), series_id, 0, 1))
+    out = {"id": ep.id, "number": ep.number, "title": ep.title}
+    db.commit()
+    return out
+
+def games_select(year: Optional[int]=None, country: Optional[str]=None, publisher: Optional[str]=None):
+    stmt = select(models.Game).options(joinedload(models.Game.country), joinedload(models.Game.publisher))
+    if year: stmt = stmt.where(models.Game.year == year)
+    if country: stmt = stmt.join(models.Country).where(models.Country.name_key == models.name_key(country))
+    if publisher: stmt = stmt.join(models.Publisher).where(models.Publisher.name_key == models.name_key(publisher))
+    return stmt
+
+def list_games(db: Session, year: Optional[int]=None, country: Optional[str]=None, publisher: Optional[str]=None, limit: int=DEFAULT_PAGE_SIZE, cursor: Optional[str]=None) -> Page:
+    stmt = keyset_select(games_select(year, country, publisher), models.Game, limit, cursor)
+    return to_page(db.execute(stmt).scalars().all(), limit)
+
+def game_select(game_id: int):
+    return select(models.Game)\
         .options(joinedload(models.Game.country), joinedload(models.Game.publisher))\
-        .filter(models.Game.id == game_id).first()
+        .where(models.Game.id == game_id)
 
-def create_game(db: Session, data: schemas.GameCreate) -> models.Game:
-    country = get_or_create_country(db, data.country_name)
-    publisher = get_or_create_publisher(db, data.publisher_name)
-    g = models.Game(title=data.title, year=data.year, country_id=country.id, publisher_id=publisher.id)
-    db.add(g); db.commit(); db.refresh(g)
-    return get_game(db, g.id)
+def get_game(db: Session, game_id: int) -> Optional[models.Game]:
+    return db.execute(game_select(game_id)).scalars().first()
 
-def update_game(db: Session, g: models.Game, data: schemas.GameUpdate) -> models.Game:
+def create_game(db: Session, data: schemas.GameCreate) -> dict:
+    country = _named(db, models.Country, data.country_name)
+    publisher = _named(db, models.Publisher, data.publisher_name)
+    g = models.Game(title=data.title, year=data.year, country_id=country["id"], publisher_id=publisher["id"], revision=changes.allocate(db))
+    db.add(g); db.flush()
+    stats.apply(db, stats.count_title(Counter(), "games", stats.snapshot("games", g)))
+    out = {"id": g.id, "title": g.title, "year": g.year, "country": country, "publisher": publisher}
+    db.commit()
+    return out
+
+def update_game(db: Session, g: models.Game, data: schemas.GameUpdate) -> dict:
+    """`g` must come from get_game, which loads country and publisher."""
+    before = stats.snapshot("games", g)
+    country = {"id": g.country.id, "name": g.country.name}
+    publisher = {"id": g.publisher.id, "name": g.publisher.name}
     if data.title is not None: g.title = data.title
     if data.year is not None: g.year = data.year
     if data.country_name is not None:
-        c = get_or_create_country(db, data.country_name); g.country_id = c.id
+        country = _named(db, models.Country, data.country_name); g.country_id = country["id"]
     if data.publisher_name is not None:
-        p = get_or_create_publisher(db, data.publisher_name); g.publisher_id = p.id
-    db.add(g); db.commit(); db.refresh(g)
-    return get_game(db, g.id)
+        publisher = _named(db, models.Publisher, data.publisher_name); g.publisher_id = publisher["id"]
+    g.revision = changes.allocate(db)
+    stats.apply(db, stats.count_change("games", before, stats.snapshot("games", g)))
+    out = {"id": g.id, "title": g.title, "year": g.year, "country": country, "publisher": publisher}
+    db.commit()
+    return out
 
 def delete_game(db: Session, g: models.Game) -> None:
+    stats.apply(db, stats.count_title(Counter(), "games", stats.snapshot("games", g), -1))
+    changes.tombstone(db, [("games", g.id)])
     db.delete(g); db.commit()
 
 def list_countries(db: Session) -> List[models.Country]:
-    return db.query(models.Country).order_by(models.Country.name.asc()).all()
+    return db.execute(select(models.Country).order_by(models.Country.name.asc())).scalars().all()
 
 def list_directors(db: Session) -> List[models.Director]:
-    return db.query(models.Director).order_by(models.Director.name.asc()).all()
+    return db.execute(select(models.Director).order_by(models.Director.name.asc())).scalars().all()
 
 def list_publishers(db: Session) -> List[models.Publisher]:
-    return db.query(models.Publisher).order_by(models.Publisher.name.asc()).all()
+    return db.execute(select(models.Publisher).order_by(models.Publisher.name.asc())).scalars().all()
@@ -0,0 +1,37 @@
+"""AsyncSession variants of the read functions in crud, sharing its select() builders."""
+from typing import List, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from . import models
+from .crud import SeriesDepth, game_select, games_select, movie_select, movies_select, one_series_select, series_select
+from .pagination import DEFAULT_PAGE_SIZE, Page, keyset_select, to_page
+
+async def list_movies(db: AsyncSession, year: Optional[int]=None, country: Optional[str]=None, director: Optional[str]=None, limit: int=DEFAULT_PAGE_SIZE, cursor: Optional[str]=None) -> Page:
+    stmt = keyset_select(movies_select(year, country, director), models.Movie, limit, cursor)
+    return to_page((await db.execute(stmt)).scalars().all(), limit)
+
+async def get_movie(db: AsyncSession, movie_id: int) -> Optional[models.Movie]:
+    return (await db.execute(movie_select(movie_id))).scalars().first()
+
+async def list_series(db: AsyncSession, year: Optional[int]=None, country: Optional[str]=None, director: Optional[str]=None, limit: int=DEFAULT_PAGE_SIZE, cursor: Optional[str]=None, depth: SeriesDepth="episodes") -> Page:
+    stmt = keyset_select(series_select(year, country, director, depth), models.Series, limit, cursor)
+    return to_page((await db.execute(stmt)).scalars().all(), limit)
+
+async def get_series(db: AsyncSession, series_id: int, depth: SeriesDepth="episodes") -> Optional[models.Series]:
+    return (await db.execute(one_series_select(series_id, depth))).scalars().first()
+
+async def list_games(db: AsyncSession, year: Optional[int]=None, country: Optional[str]=None, publisher: Optional[str]=None, limit: int=DEFAULT_PAGE_SIZE, cursor: Optional[str]=None) -> Page:
+    stmt = keyset_select(games_select(year, country, publisher), models.Game, limit, cursor)
+    return to_page((await db.execute(stmt)).scalars().all(), limit)
+
+async def get_game(db: AsyncSession, game_id: int) -> Optional[models.Game]:
+    return (await db.execute(game_select(game_id))).scalars().first()
+
+async def list_countries(db: AsyncSession) -> List[models.Country]:
+    return (await db.execute(select(models.Country).order_by(models.Country.name.asc()))).scalars().all()
+
+async def list_directors(db: AsyncSession) -> List[models.Director]:
+    return (await db.execute(select(models.Director).order_by(models.Director.name.asc()))).scalars().all()
+
+async def list_publishers(db: AsyncSession) -> List[models.Publisher]:
+    return (await db.execute(select(models.Publisher).order_by(models.Publisher.name.asc()))).scalars().all()
@@ -1,13 +1,123 @@
+import logging
 import os
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, declarative_base
+from .metrics import TimedQueuePool, instrument_engine
+
+logger = logging.getLogger(__name__)
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./app.db")
+# "sync" serves every route from the threadpool; "async" serves the read routes
+# from AsyncSession on the event loop (needs aiosqlite, or asyncpg for Postgres).
+DB_MODE = os.getenv("DB_MODE", "sync")
+# "default" keeps SQLite's stock settings; "production" switches to WAL and tuned PRAGMAs.
+DB_PROFILE = os.getenv("DB_PROFILE", "default")
+# With DB_READ_POOL=1 (SQLite only) GET routes use a separate read-only connection pool.
+DB_READ_POOL = os.getenv("DB_READ_POOL", "0") == "1"
+
+PROFILES = {
+    "default": {"pragmas": {}, "pool_size": 5, "max_overflow": 10},
+    "production": {
+        "pragmas": {
+            "journal_mode": "wal",
+            "synchronous": 1,          # NORMAL: safe with WAL, no fsync per commit
+            "mmap_size": 268435456,    # 256 MiB
+            "cache_size": -65536,      # 64 MiB (negative = KiB)
+            "busy_timeout": 5000,
+            "temp_store": 2,           # MEMORY
+        },
+        "pool_size": 20, "max_overflow": 10,
+    },
+}
+
+if DB_PROFILE not in PROFILES:
+    raise ValueError(f"Unknown DB_PROFILE {DB_PROFILE!r}, expected one of {sorted(PROFILES)}")
+profile = PROFILES[DB_PROFILE]
+POOL_SIZE = int(os.getenv("DB_POOL_SIZE", profile["pool_size"]))
+MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", profile["max_overflow"]))
+
+IS_SQLITE = DATABASE_URL.startswith("sqlite")
+IS_SQLITE_MEMORY = IS_SQLITE and (DATABASE_URL in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in DATABASE_URL)
+
+def _pool_args() -> dict:
+    # In-memory SQLite uses SingletonThreadPool, which has no overflow.
+    return {} if IS_SQLITE_MEMORY else {"pool_size": POOL_SIZE, "max_overflow": MAX_OVERFLOW}
+
+def _sync_pool_args() -> dict:
+    # TimedQueuePool feeds the db_pool_checkout_wait_seconds histogram on /metrics.
+    return {} if IS_SQLITE_MEMORY else {"poolclass": TimedQueuePool, **_pool_args()}
+
+def apply_pragmas(engine, pragmas: dict) -> None:
+    """Run `pragmas` on every new DBAPI connection of a SQLite engine."""
+    if not pragmas:
+        return
+    @event.listens_for(engine, "connect")
+    def _set_pragmas(dbapi_conn, _):
+        cur = dbapi_conn.cursor()
+        for name, value in pragmas.items():
+            cur.execute(f"PRAGMA {name}={value}")
+        cur.close()
 
-if DATABASE_URL.startswith("sqlite"):
-    engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+if IS_SQLITE:
+    engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False}, **_sync_pool_args())
+    apply_pragmas(engine, profile["pragmas"])
 else:
-    engine = create_engine(DATABASE_URL)
+    engine = create_engine(DATABASE_URL, **_sync_pool_args())
+instrument_engine(engine)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
+
+def _read_only_url(url: str) -> str:
+    path = url.split(":///", 1)[1]
+    return f"sqlite:///file:{path}?mode=ro&uri=true"
+
+read_engine = engine
+if DB_READ_POOL and IS_SQLITE and not IS_SQLITE_MEMORY:
+    read_engine = create_engine(_read_only_url(DATABASE_URL), connect_args={"check_same_thread": False}, **_sync_pool_args())
+    instrument_engine(read_engine)
+    # journal_mode is a property of the file and can only be changed by the writer.
+    apply_pragmas(read_engine, {k: v for k, v in profile["pragmas"].items() if k != "journal_mode"})
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+def check_profile() -> dict:
+    """Read the PRAGMAs back from a live connection and report any that did not take effect."""
+    report = {"profile": DB_PROFILE, "pool_size": POOL_SIZE, "max_overflow": MAX_OVERFLOW,
+              "read_pool": read_engine is not engine, "pragmas": {}, "mismatches": []}
+    if not IS_SQLITE:
+        return report
+    with engine.connect() as conn:
+        for name, expected in profile["pragmas"].items():
+            actual = conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+            report["pragmas"][name] = actual
+            if str(actual).lower() != str(expected).lower():
+                report["mismatches"].append(name)
+    logger.info("SQLite profile %s: %s", DB_PROFILE, report["pragmas"])
+    for name in report["mismatches"]:
+        logger.warning("SQLite PRAGMA %s is %r, profile %r expects %r",
+                       name, report["pragmas"][name], DB_PROFILE, profile["pragmas"][name])
+    return report
+
+ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg", "postgres": "postgresql+asyncpg"}
+
+def async_url(url: str) -> str:
+    """Map a sync DATABASE_URL onto the matching asyncio driver."""
+    scheme, rest = url.split("://", 1)
+    if "+" in scheme:
+        scheme = scheme.split("+", 1)[0]
+    if scheme not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {scheme!r}")
+    return f"{ASYNC_DRIVERS[scheme]}://{rest}"
+
+async_engine = None
+AsyncSessionLocal = None
+if DB_MODE == "async":
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from sqlalchemy.pool import AsyncAdaptedQueuePool
+    # aiosqlite defaults to NullPool; pool file databases like the sync engine does.
+    pool = {"poolclass": AsyncAdaptedQueuePool} if IS_SQLITE and not IS_SQLITE_MEMORY else {}
+    async_engine = create_async_engine(async_url(DATABASE_URL), **pool, **_pool_args())
+    if IS_SQLITE:
+        apply_pragmas(async_engine.sync_engine, profile["pragmas"])
+    instrument_engine(async_engine.sync_engine)
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
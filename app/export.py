@@ -0,0 +1,116 @@
+import csv
+import io
+import json
+import os
+from typing import Iterator, List, Literal
+from sqlalchemy import select
+from sqlalchemy.orm import aliased
+from .database import ReadSessionLocal
+from . import models
+
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+
+ExportEntity = Literal["movies", "series", "games"]
+ExportFormat = Literal["ndjson", "csv"]
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+CSV_HEADERS = {
+    "movies": ["id", "title", "year", "director_id", "director", "country_id", "country"],
+    "games": ["id", "title", "year", "publisher_id", "publisher", "country_id", "country"],
+    "series": ["id", "title", "year", "director_id", "director", "country_id", "country",
+               "season_id", "season_number", "season_year", "episode_id", "episode_number", "episode_title"],
+}
+
+# entity -> (model, director/publisher model, key of that relation in the output)
+SOURCES = {
+    "movies": (models.Movie, models.Director, "director"),
+    "series": (models.Series, models.Director, "director"),
+    "games": (models.Game, models.Publisher, "publisher"),
+}
+
+def _flat_select(entity: ExportEntity):
+    """Rows of (id, title, year, person_id, person_name, country_id, country_name) ordered by id."""
+    model, person_model, key = SOURCES[entity]
+    return select(
+        model.id, model.title, model.year,
+        person_model.id, person_model.name, models.Country.id, models.Country.name
+    ).join(person_model, person_model.id == getattr(model, f"{key}_id"))\
+     .join(models.Country, models.Country.id == model.country_id)\
+     .order_by(model.id)
+
+def _series_select():
+    season, episode = aliased(models.Season), aliased(models.Episode)
+    return _flat_select("series").add_columns(
+        season.id, season.number, season.year, episode.id, episode.number, episode.title
+    ).outerjoin(season, season.series_id == models.Series.id)\
+     .outerjoin(episode, episode.season_id == season.id)\
+     .order_by(season.number, episode.number)
+
+def _stream_rows(stmt) -> Iterator[tuple]:
+    """Iterate a SELECT through a server-side cursor, EXPORT_BATCH_SIZE rows at a time."""
+    db = ReadSessionLocal()
+    try:
+        result = db.execute(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+        for partition in result.partitions():
+            yield from partition
+    finally:
+        db.close()
+
+def _series_records(rows: Iterator[tuple]) -> Iterator[dict]:
+    # Rows arrive grouped by series and season, so only one series is held at a time.
+    current = None
+    for sid, title, year, did, dname, cid, cname, season_id, snum, syear, eid, enum, etitle in rows:
+        if current is None or current["id"] != sid:
+            if current is not None:
+                yield current
+            current = {"id": sid, "title": title, "year": year,
+                       "director": {"id": did, "name": dname}, "country": {"id": cid, "name": cname},
+                       "seasons": []}
+        if season_id is None:
+            continue
+        seasons = current["seasons"]
+        if not seasons or seasons[-1]["id"] != season_id:
+            seasons.append({"id": season_id, "number": snum, "year": syear, "episodes": []})
+        if eid is not None:
+            seasons[-1]["episodes"].append({"id": eid, "number": enum, "title": etitle})
+    if current is not None:
+        yield current
+
+def _records(entity: ExportEntity) -> Iterator[dict]:
+    if entity == "series":
+        yield from _series_records(_stream_rows(_series_select()))
+        return
+    key = SOURCES[entity][2]
+    for id, title, year, pid, pname, cid, cname in _stream_rows(_flat_select(entity)):
+        yield {"id": id, "title": title, "year": year,
+               key: {"id": pid, "name": pname}, "country": {"id": cid, "name": cname}}
+
+def _batched(lines: Iterator[str]) -> Iterator[bytes]:
+    buf: List[str] = []
+    for line in lines:
+        buf.append(line)
+        if len(buf) >= EXPORT_BATCH_SIZE:
+            yield "".join(buf).encode("utf-8")
+            buf.clear()
+    if buf:
+        yield "".join(buf).encode("utf-8")
+
+def _ndjson_lines(entity: ExportEntity) -> Iterator[str]:
+    for record in _records(entity):
+        yield json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+def _csv_lines(entity: ExportEntity) -> Iterator[str]:
+    out = io.StringIO()
+    writer = csv.writer(out)
+    def take() -> str:
+        line = out.getvalue(); out.seek(0); out.truncate()
+        return line
+    writer.writerow(CSV_HEADERS[entity]); yield take()
+    stmt = _series_select() if entity == "series" else _flat_select(entity)
+    for row in _stream_rows(stmt):
+        writer.writerow(row); yield take()
+
+def export(entity: ExportEntity, format: ExportFormat) -> Iterator[bytes]:
+    """Whole-table export with memory bounded by EXPORT_BATCH_SIZE, not by catalog size."""
+    return _batched(_ndjson_lines(entity) if format == "ndjson" else _csv_lines(entity))
@@ -0,0 +1,249 @@
+"""Read path for GET routes that skips the ORM and Pydantic output validation.
+
+Rows come straight from Core select() results and are turned into plain dicts
+with the exact key order of MovieOut / SeriesOut / GameOut, so that
+response_cache can encode them with orjson and produce byte-for-byte the same
+JSON as the validated path.
+
+With ?fields= the select only joins the relationships that were asked for and
+the dicts only carry those keys (still in schema order).
+"""
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import false, select
+from sqlalchemy.orm import Session
+from . import lookup_cache, models
+from .schemas import MAX_BATCH_IDS, SeriesDepth
+from .pagination import DEFAULT_PAGE_SIZE, Page, keyset_select, number_select, to_number_page, to_page
+
+# Same batch size SQLAlchemy uses for selectinload IN lists.
+IN_BATCH = 500
+
+def _chunks(ids: List[int]) -> Iterable[List[int]]:
+    for i in range(0, len(ids), IN_BATCH):
+        yield ids[i:i + IN_BATCH]
+
+# Top-level keys of MovieOut / SeriesOut / GameOut, in output order.
+FIELDS = {
+    "movies": ("id", "title", "year", "director", "country"),
+    "series": ("id", "title", "year", "director", "country", "seasons"),
+    "games": ("id", "title", "year", "country", "publisher"),
+}
+
+Fields = Optional[Tuple[str, ...]]
+
+class InvalidIds(ValueError):
+    """An ?ids= value that is not a comma-separated list of ids, or lists too many."""
+
+def parse_ids(raw: Optional[str]) -> Optional[List[int]]:
+    """Parse "3,1,3" into [3, 1] (first occurrence order); None when absent."""
+    if raw is None:
+        return None
+    try:
+        ids = list(dict.fromkeys(int(part) for part in raw.split(",") if part.strip()))
+    except ValueError:
+        raise InvalidIds(f"Invalid ids {raw!r}, expected comma-separated integers") from None
+    if not ids or len(ids) > MAX_BATCH_IDS:
+        raise InvalidIds(f"ids must list between 1 and {MAX_BATCH_IDS} ids")
+    return ids
+
+class InvalidFields(ValueError):
+    """A ?fields= value that names no field, or one the entity does not have."""
+
+def parse_fields(entity: str, raw: Optional[str]) -> Fields:
+    """Parse "title,id" into ("id", "title"); None (no projection) when absent or naming every field."""
+    if raw is None:
+        return None
+    requested = {f.strip() for f in raw.split(",") if f.strip()}
+    unknown = requested - set(FIELDS[entity])
+    if unknown or not requested:
+        raise InvalidFields(f"Invalid fields {sorted(unknown) or raw!r} for {entity}, expected a subset of {', '.join(FIELDS[entity])}")
+    if len(requested) == len(FIELDS[entity]):
+        return None
+    return tuple(f for f in FIELDS[entity] if f in requested)
+
+def _titles_select(model, person_model, person_key: str, fields: Fields=None):
+    # person is the director (movies, series) or the publisher (games).
+    # id, title and year are always selected: the keyset cursor is built from them.
+    with_person = fields is None or person_key in fields
+    with_country = fields is None or "country" in fields
+    cols = [model.id, model.title, model.year]
+    if with_person: cols += [person_model.id.label("person_id"), person_model.name.label("person_name")]
+    if with_country: cols += [models.Country.id.label("country_id"), models.Country.name.label("country_name")]
+    stmt = select(*cols)
+    if with_person: stmt = stmt.join(person_model, person_model.id == getattr(model, f"{person_key}_id"))
+    if with_country: stmt = stmt.join(models.Country, models.Country.id == model.country_id)
+    return stmt
+
+def resolve_id(db: Session, model, name: str) -> Optional[int]:
+    """Id of the Country/Director/Publisher matching `name` up to case and spacing, or None. Never inserts."""
+    table = model.__tablename__
+    entry = lookup_cache.cache.entry(table, name)
+    if entry is not None:
+        return entry[0]
+    row = db.execute(select(model.id, model.name).where(model.name_key == models.name_key(name))).first()
+    if row is None:
+        return None
+    lookup_cache.cache.put(table, row.name, row.id)
+    return row.id
+
+def _by_id(column, id: Optional[int]):
+    return column == id if id is not None else false()
+
+def _filtered(db: Session, stmt, model, person_model, person_key: str, year: Optional[int], country: Optional[str], person: Optional[str]):
+    # Names are resolved to ids first (lookup cache, else the unique name_key index), so the
+    # list query only compares FKs, whether or not the join was selected.
+    if year: stmt = stmt.where(model.year == year)
+    if country: stmt = stmt.where(_by_id(model.country_id, resolve_id(db, models.Country, country)))
+    if person: stmt = stmt.where(_by_id(getattr(model, f"{person_key}_id"), resolve_id(db, person_model, person)))
+    return stmt
+
+def _movie(r) -> dict:
+    return {"id": r.id, "title": r.title, "year": r.year,
+            "director": {"id": r.person_id, "name": r.person_name},
+            "country": {"id": r.country_id, "name": r.country_name}}
+
+def _game(r) -> dict:
+    return {"id": r.id, "title": r.title, "year": r.year,
+            "country": {"id": r.country_id, "name": r.country_name},
+            "publisher": {"id": r.person_id, "name": r.person_name}}
+
+def _series(r) -> dict:
+    return {"id": r.id, "title": r.title, "year": r.year,
+            "director": {"id": r.person_id, "name": r.person_name},
+            "country": {"id": r.country_id, "name": r.country_name},
+            "seasons": []}
+
+def _projected(fields: Tuple[str, ...], person_key: str):
+    def to_dict(r) -> dict:
+        out = {}
+        for f in fields:
+            if f == person_key: out[f] = {"id": r.person_id, "name": r.person_name}
+            elif f == "country": out[f] = {"id": r.country_id, "name": r.country_name}
+            elif f == "seasons": out[f] = []
+            else: out[f] = getattr(r, f)
+        return out
+    return to_dict
+
+def _page(db: Session, stmt, model, limit: int, cursor: Optional[str], to_dict) -> Page:
+    page = to_page(db.execute(keyset_select(stmt, model, limit, cursor)).all(), limit)
+    return Page([to_dict(r) for r in page.items], page.next_cursor)
+
+def attach_seasons(db: Session, series: List[dict], depth: SeriesDepth, ids: Optional[List[int]]=None) -> List[dict]:
+    """Fill in "seasons" (and their "episodes") with one IN query per level, like selectinload.
+
+    `ids` gives the series ids when the dicts were projected without "id".
+    """
+    if depth == "series" or not series:
+        return series
+    by_id = dict(zip(ids or [s["id"] for s in series], series))
+    seasons: Dict[int, dict] = {}
+    for ids in _chunks(list(by_id)):
+        rows = db.execute(
+            select(models.Season.id, models.Season.series_id, models.Season.number, models.Season.year)
+            .where(models.Season.series_id.in_(ids)).order_by(models.Season.series_id, models.Season.number)
+        ).all()
+        for id, series_id, number, year in rows:
+            season = {"id": id, "number": number, "year": year, "episodes": []}
+            seasons[id] = season
+            by_id[series_id]["seasons"].append(season)
+    if depth == "episodes":
+        for ids in _chunks(list(seasons)):
+            rows = db.execute(
+                select(models.Episode.id, models.Episode.season_id, models.Episode.number, models.Episode.title)
+                .where(models.Episode.season_id.in_(ids)).order_by(models.Episode.season_id, models.Episode.number)
+            ).all()
+            for id, season_id, number, title in rows:
+                seasons[season_id]["episodes"].append({"id": id, "number": number, "title": title})
+    return series
+
+def _by_ids(db: Session, stmt, model, ids: List[int], to_dict) -> Dict[int, dict]:
+    """Rows of `ids` as dicts keyed by id, in the order of `ids`; unknown ids are left out."""
+    rows = {}
+    for chunk in _chunks(ids):
+        rows.update((r.id, to_dict(r)) for r in db.execute(stmt.where(model.id.in_(chunk))))
+    return {id: rows[id] for id in ids if id in rows}
+
+def movies_by_ids(db: Session, ids: List[int], fields: Fields=None) -> Dict[int, dict]:
+    stmt = _titles_select(models.Movie, models.Director, "director", fields)
+    return _by_ids(db, stmt, models.Movie, ids, _movie if fields is None else _projected(fields, "director"))
+
+def series_by_ids(db: Session, ids: List[int], depth: SeriesDepth="episodes", fields: Fields=None) -> Dict[int, dict]:
+    stmt = _titles_select(models.Series, models.Director, "director", fields)
+    items = _by_ids(db, stmt, models.Series, ids, _series if fields is None else _projected(fields, "director"))
+    if fields is None or "seasons" in fields:
+        attach_seasons(db, list(items.values()), depth, list(items))
+    return items
+
+def games_by_ids(db: Session, ids: List[int], fields: Fields=None) -> Dict[int, dict]:
+    stmt = _titles_select(models.Game, models.Publisher, "publisher", fields)
+    return _by_ids(db, stmt, models.Game, ids, _game if fields is None else _projected(fields, "publisher"))
+
+def list_movies(db: Session, year: Optional[int]=None, country: Optional[str]=None, director: Optional[str]=None, limit: int=DEFAULT_PAGE_SIZE, cursor: Optional[str]=None, fields: Fields=None) -> Page:
+    stmt = _filtered(db, _titles_select(models.Movie, models.Director, "director", fields), models.Movie, models.Director, "director", year, country, director)
+    return _page(db, stmt, models.Movie, limit, cursor, _movie if fields is None else _projected(fields, "director"))
+
+def get_movie(db: Session, movie_id: int, fields: Fields=None) -> Optional[dict]:
+    row = db.execute(_titles_select(models.Movie, models.Director, "director", fields).where(models.Movie.id == movie_id)).first()
+    return (_movie if fields is None else _projected(fields, "director"))(row) if row else None
+
+def list_series(db: Session, year: Optional[int]=None, country: Optional[str]=None, director: Optional[str]=None, limit: int=DEFAULT_PAGE_SIZE, cursor: Optional[str]=None, depth: SeriesDepth="episodes", fields: Fields=None) -> Page:
+    stmt = _filtered(db, _titles_select(models.Series, models.Director, "director", fields), models.Series, models.Director, "director", year, country, director)
+    to_dict = _series if fields is None else _projected(fields, "director")
+    page = to_page(db.execute(keyset_select(stmt, models.Series, limit, cursor)).all(), limit)
+    items = [to_dict(r) for r in page.items]
+    if fields is None or "seasons" in fields:
+        attach_seasons(db, items, depth, [r.id for r in page.items])
+    return Page(items, page.next_cursor)
+
+def get_series(db: Session, series_id: int, depth: SeriesDepth="episodes", fields: Fields=None) -> Optional[dict]:
+    row = db.execute(_titles_select(models.Series, models.Director, "director", fields).where(models.Series.id == series_id)).first()
+    if not row:
+        return None
+    item = (_series if fields is None else _projected(fields, "director"))(row)
+    if fields is None or "seasons" in fields:
+        attach_seasons(db, [item], depth, [row.id])
+    return item
+
+def list_games(db: Session, year: Optional[int]=None, country: Optional[str]=None, publisher: Optional[str]=None, limit: int=DEFAULT_PAGE_SIZE, cursor: Optional[str]=None, fields: Fields=None) -> Page:
+    stmt = _filtered(db, _titles_select(models.Game, models.Publisher, "publisher", fields), models.Game, models.Publisher, "publisher", year, country, publisher)
+    return _page(db, stmt, models.Game, limit, cursor, _game if fields is None else _projected(fields, "publisher"))
+
+def get_game(db: Session, game_id: int, fields: Fields=None) -> Optional[dict]:
+    row = db.execute(_titles_select(models.Game, models.Publisher, "publisher", fields).where(models.Game.id == game_id)).first()
+    return (_game if fields is None else _projected(fields, "publisher"))(row) if row else None
+
+def list_seasons(db: Session, series_id: int) -> Optional[List[dict]]:
+    """Season headers of one series (no episodes); None if the series does not exist."""
+    rows = db.execute(
+        select(models.Season.id, models.Season.number, models.Season.year)
+        .select_from(models.Series).outerjoin(models.Season, models.Season.series_id == models.Series.id)
+        .where(models.Series.id == series_id).order_by(models.Season.number)
+    ).all()
+    if not rows:
+        return None
+    return [{"id": id, "number": number, "year": year} for id, number, year in rows if id is not None]
+
+def episodes_select(season_id: int, limit: int, cursor: Optional[str]=None):
+    # Range scan on the unique (season_id, number) index, whatever the length of the show.
+    stmt = select(models.Episode.id, models.Episode.number, models.Episode.title).where(models.Episode.season_id == season_id)
+    return number_select(stmt, models.Episode.number, limit, cursor)
+
+def list_episodes(db: Session, series_id: int, number: int, limit: int=DEFAULT_PAGE_SIZE, cursor: Optional[str]=None) -> Optional[Page]:
+    """One page of a season's episodes by number; None if the series has no such season."""
+    season_id = db.execute(select(models.Season.id).where(models.Season.series_id == series_id, models.Season.number == number)).scalar()
+    if season_id is None:
+        return None
+    page = to_number_page(db.execute(episodes_select(season_id, limit, cursor)).all(), limit)
+    return Page([{"id": id, "number": n, "title": title} for id, n, title in page.items], page.next_cursor)
+
+def _names(db: Session, model) -> List[dict]:
+    return [{"id": id, "name": name} for id, name in db.execute(select(model.id, model.name).order_by(model.name.asc()))]
+
+def list_countries(db: Session) -> List[dict]:
+    return _names(db, models.Country)
+
+def list_directors(db: Session) -> List[dict]:
+    return _names(db, models.Director)
+
+def list_publishers(db: Session) -> List[dict]:
+    return _names(db, models.Publisher)
@@ -0,0 +1,111 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from . import autocomplete
+from .models import name_key
+
+LOOKUP_CACHE_SIZE = int(os.getenv("LOOKUP_CACHE_SIZE", "4096"))
+
+_PENDING_KEY = "lookup_cache_pending"
+_DEFERRED_KEY = "lookup_cache_deferred"
+
+class LookupCache:
+    """Bounded LRU mapping (table, name key) -> (id, stored name) for countries, directors and publishers.
+
+    Ids of rows inserted by a session are only published once that session commits,
+    so a rolled back insert can never leave a dangling id behind.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Tuple[str, str], Tuple[int, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, table: str, name: str) -> Optional[int]:
+        entry = self.entry(table, name)
+        return entry[0] if entry else None
+
+    def entry(self, table: str, name: str) -> Optional[Tuple[int, str]]:
+        """(id, stored name) of the row whose name matches `name` up to case and spacing."""
+        key = (table, name_key(name))
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, table: str, name: str, id: int) -> None:
+        if self.maxsize <= 0:
+            return
+        key = (table, name_key(name))
+        with self._lock:
+            self._data[key] = (id, name)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, table: Optional[str]=None, name: Optional[str]=None) -> None:
+        with self._lock:
+            if table is None:
+                self._data.clear()
+            elif name is not None:
+                self._data.pop((table, name_key(name)), None)
+            else:
+                for key in [k for k in self._data if k[0] == table]:
+                    del self._data[key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data), "maxsize": self.maxsize,
+                "hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            }
+
+cache = LookupCache(LOOKUP_CACHE_SIZE)
+
+def pending(db: Session) -> Dict[Tuple[str, str], Tuple[int, str]]:
+    """(table, name key) -> (id, name) inserted in the session's current transaction, not yet visible to others."""
+    return db.info.setdefault(_PENDING_KEY, {})
+
+def stage(db: Session, table: str, name: str, id: int) -> None:
+    pending(db)[(table, name_key(name))] = (id, name)
+
+def defer(db: Session, into: list) -> None:
+    """Collect the session's committed (table, name, id) into `into` instead of publishing them.
+
+    For sessions whose commit only releases a savepoint (see writer.GroupWriter):
+    the caller publishes `into` once the enclosing transaction has committed.
+    """
+    db.info[_DEFERRED_KEY] = into
+
+def publish(entries) -> None:
+    for table, name, id in entries:
+        cache.put(table, name, id)
+        autocomplete.index.add(table, name, id)
+
+@event.listens_for(Session, "after_commit")
+def _publish_pending(session: Session) -> None:
+    entries = [(table, name, id) for (table, _), (id, name) in session.info.pop(_PENDING_KEY, {}).items()]
+    deferred = session.info.get(_DEFERRED_KEY)
+    if deferred is not None:
+        deferred.extend(entries)
+    else:
+        publish(entries)
+
+@event.listens_for(Session, "after_transaction_end")
+def _drop_pending(session: Session, transaction) -> None:
+    # Runs after after_commit on success; on rollback/close it discards the staged ids.
+    if transaction.parent is None:
+        session.info.pop(_PENDING_KEY, None)
@@ -1,23 +1,60 @@
-from fastapi import FastAPI, Depends, HTTPException, Query
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Depends, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+import orjson
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from typing import List, Optional
-from .database import Base, engine, SessionLocal
-from . import schemas, crud
+from .database import DB_MODE, SessionLocal, ReadSessionLocal
+from . import schemas, crud, admission, autocomplete, bootstrap, bulk, changes, export, fastread, lookup_cache, metrics, response_cache, search, snapshot, stats, writer
+from .pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidCursor
+from .response_cache import found, paged
 
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Schema creation, upgrades and the seed snapshot restore run before the first request, not on import.
+    bootstrap.init_db()
+    yield
 
 app = FastAPI(
     title="Catalog API",
     description="Movies, Series (with seasons/episodes) and Games catalog",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
+# Added first, so it runs inside CORS and metrics: its 503s get CORS headers and are counted.
+if admission.ADMISSION_ENABLED:
+    app.add_middleware(admission.AdmissionMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"], allow_credentials=True, allow_methods=["*"], allow_headers=["*"]
+    allow_origins=["*"], allow_credentials=True, allow_methods=["*"], allow_headers=["*"],
+    # Browsers on other origins can only read response headers listed here; paging needs the cursor.
+    expose_headers=["X-Next-Cursor", "ETag", "Server-Timing"],
 )
 
+if metrics.METRICS_ENABLED:
+    app.add_middleware(metrics.MetricsMiddleware)
+
+@app.exception_handler(InvalidCursor)
+@app.exception_handler(fastread.InvalidFields)
+@app.exception_handler(fastread.InvalidIds)
+def invalid_cursor(request: Request, exc: ValueError):
+    return JSONResponse(status_code=400, content={"detail": str(exc)})
+
+# Writes go through writer.run(db, fn): fn(db) directly, or batched with other
+# requests' writes into one commit when DB_WRITER=group.
+
+# READ_SNAPSHOT=1 serves the /movies, /series and /games lists from the in-memory snapshot.
+lists = snapshot if snapshot.SNAPSHOT_ENABLED else fastread
+
+# ?fields=id,title: only these top-level fields are selected, joined and returned.
+FIELDS_QUERY = Query(None, description="Comma-separated top-level fields to return, e.g. id,title")
+# ?ids=3,1,2 returns those items (in that order, unknown ids left out) instead of a page; other filters are ignored.
+IDS_QUERY = Query(None, description="Comma-separated ids to fetch in one query, e.g. 3,1,2")
+
 def get_db():
     db = SessionLocal()
     try:
@@ -25,102 +62,250 @@ def get_db():
     finally:
         db.close()
 
+def get_read_db():
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
 @app.get("/health", tags=["system"])
-def health():
+async def health():
     return {"status": "ok"}
 
+@app.get("/system/caches", tags=["system"])
+def cache_stats():
+    return {"lookup": lookup_cache.cache.stats(), "responses": response_cache.cache.stats(), "snapshot": snapshot.snapshot.stats(),
+            "names": autocomplete.index.stats()}
+
+@app.get("/system/admission", tags=["system"])
+def admission_stats():
+    return admission.stats()
+
+@app.get("/system/db", tags=["system"])
+def db_settings():
+    return bootstrap.report
+
+@app.get("/metrics", response_class=PlainTextResponse, tags=["system"])
+def prometheus_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+# ?prefix= answers type-ahead from the in-memory name index (limit applies only there).
 @app.get("/countries", response_model=List[schemas.CountryOut], tags=["meta"])
-def get_countries(db: Session = Depends(get_db)):
-    return crud.list_countries(db)
+def get_countries(request: Request, prefix: Optional[str] = None, limit: int = Query(autocomplete.DEFAULT_LIMIT, ge=1, le=autocomplete.MAX_LIMIT), db: Session = Depends(get_read_db)):
+    if prefix is not None:
+        return autocomplete.index.search(db, "countries", prefix, limit)
+    return response_cache.respond(request, ("countries",), response_cache.PLAIN, lambda: (fastread.list_countries(db), {}))
 
 @app.get("/directors", response_model=List[schemas.DirectorOut], tags=["meta"])
-def get_directors(db: Session = Depends(get_db)):
-    return crud.list_directors(db)
+def get_directors(request: Request, prefix: Optional[str] = None, limit: int = Query(autocomplete.DEFAULT_LIMIT, ge=1, le=autocomplete.MAX_LIMIT), db: Session = Depends(get_read_db)):
+    if prefix is not None:
+        return autocomplete.index.search(db, "directors", prefix, limit)
+    return response_cache.respond(request, ("directors",), response_cache.PLAIN, lambda: (fastread.list_directors(db), {}))
 
 @app.get("/publishers", response_model=List[schemas.PublisherOut], tags=["meta"])
-def get_publishers(db: Session = Depends(get_db)):
-    return crud.list_publishers(db)
+def get_publishers(request: Request, prefix: Optional[str] = None, limit: int = Query(autocomplete.DEFAULT_LIMIT, ge=1, le=autocomplete.MAX_LIMIT), db: Session = Depends(get_read_db)):
+    if prefix is not None:
+        return autocomplete.index.search(db, "publishers", prefix, limit)
+    return response_cache.respond(request, ("publishers",), response_cache.PLAIN, lambda: (fastread.list_publishers(db), {}))
 
 @app.get("/movies", response_model=List[schemas.MovieOut], tags=["movies"])
-def get_movies(year: Optional[int] = Query(None, ge=1888, le=2100), country: Optional[str] = None, director: Optional[str] = None, db: Session = Depends(get_db)):
-    return crud.list_movies(db, year=year, country=country, director=director)
+def get_movies(request: Request, year: Optional[int] = Query(None, ge=1888, le=2100), country: Optional[str] = None, director: Optional[str] = None, limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), cursor: Optional[str] = None, fields: Optional[str] = FIELDS_QUERY, ids: Optional[str] = IDS_QUERY, db: Session = Depends(get_read_db)):
+    projection = fastread.parse_fields("movies", fields)
+    wanted = fastread.parse_ids(ids)
+    if wanted is not None:
+        return response_cache.respond(request, response_cache.WRITES["movies"], response_cache.PLAIN,
+            lambda: (list(fastread.movies_by_ids(db, wanted, fields=projection).values()), {}))
+    return response_cache.respond(request, response_cache.WRITES["movies"], response_cache.PLAIN,
+        lambda: paged(lists.list_movies(db, year=year, country=country, director=director, limit=limit, cursor=cursor, fields=projection)))
 
 @app.get("/movies/{movie_id}", response_model=schemas.MovieOut, tags=["movies"])
-def get_movie_by_id(movie_id: int, db: Session = Depends(get_db)):
-    m = crud.get_movie(db, movie_id)
-    if not m: raise HTTPException(status_code=404, detail="Movie not found")
-    return m
+def get_movie_by_id(movie_id: int, request: Request, fields: Optional[str] = FIELDS_QUERY, db: Session = Depends(get_read_db)):
+    projection = fastread.parse_fields("movies", fields)
+    return response_cache.respond(request, response_cache.WRITES["movies"], response_cache.PLAIN,
+        lambda: found(fastread.get_movie(db, movie_id, fields=projection), "Movie not found"))
 
 @app.post("/movies", response_model=schemas.MovieOut, status_code=201, tags=["movies"])
 def create_movie(item: schemas.MovieCreate, db: Session = Depends(get_db)):
-    return crud.create_movie(db, item)
+    m = writer.run(db, lambda db: crud.create_movie(db, item))
+    response_cache.invalidate("movies"); return m
+
+@app.post("/movies:bulk", response_model=schemas.BulkResult, tags=["movies"])
+async def bulk_create_movies(request: Request, chunk_size: int = Query(bulk.BULK_CHUNK_SIZE, ge=1, le=bulk.MAX_BULK_CHUNK_SIZE), db: Session = Depends(get_db)):
+    return await bulk.ingest(db, "movies", request.stream(), chunk_size)
 
 @app.put("/movies/{movie_id}", response_model=schemas.MovieOut, tags=["movies"])
 def update_movie(movie_id: int, item: schemas.MovieUpdate, db: Session = Depends(get_db)):
-    m = crud.get_movie(db, movie_id)
-    if not m: raise HTTPException(status_code=404, detail="Movie not found")
-    return crud.update_movie(db, m, item)
+    def write(db: Session):
+        m = crud.get_movie(db, movie_id)
+        if not m: raise HTTPException(status_code=404, detail="Movie not found")
+        return crud.update_movie(db, m, item)
+    m = writer.run(db, write)
+    response_cache.invalidate("movies"); return m
 
 @app.delete("/movies/{movie_id}", status_code=204, tags=["movies"])
 def delete_movie(movie_id: int, db: Session = Depends(get_db)):
-    m = crud.get_movie(db, movie_id)
-    if not m: raise HTTPException(status_code=404, detail="Movie not found")
-    crud.delete_movie(db, m); return None
+    def write(db: Session):
+        m = crud.get_movie(db, movie_id)
+        if not m: raise HTTPException(status_code=404, detail="Movie not found")
+        crud.delete_movie(db, m)
+    writer.run(db, write)
+    response_cache.invalidate("movies"); return None
 
 @app.get("/series", response_model=List[schemas.SeriesOut], tags=["series"])
-def get_series_list(year: Optional[int] = Query(None, ge=1888, le=2100), country: Optional[str] = None, director: Optional[str] = None, db: Session = Depends(get_db)):
-    return crud.list_series(db, year=year, country=country, director=director)
+def get_series_list(request: Request, year: Optional[int] = Query(None, ge=1888, le=2100), country: Optional[str] = None, director: Optional[str] = None, limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), cursor: Optional[str] = None, depth: crud.SeriesDepth = "episodes", fields: Optional[str] = FIELDS_QUERY, ids: Optional[str] = IDS_QUERY, db: Session = Depends(get_read_db)):
+    projection = fastread.parse_fields("series", fields)
+    wanted = fastread.parse_ids(ids)
+    if wanted is not None:
+        return response_cache.respond(request, response_cache.WRITES["series"], response_cache.PLAIN,
+            lambda: (list(fastread.series_by_ids(db, wanted, depth=depth, fields=projection).values()), {}))
+    return response_cache.respond(request, response_cache.WRITES["series"], response_cache.PLAIN,
+        lambda: paged(lists.list_series(db, year=year, country=country, director=director, limit=limit, cursor=cursor, depth=depth, fields=projection)))
 
 @app.get("/series/{series_id}", response_model=schemas.SeriesOut, tags=["series"])
-def get_series_by_id(series_id: int, db: Session = Depends(get_db)):
-    s = crud.get_series(db, series_id)
-    if not s: raise HTTPException(status_code=404, detail="Series not found")
-    return s
+def get_series_by_id(series_id: int, request: Request, depth: crud.SeriesDepth = "episodes", fields: Optional[str] = FIELDS_QUERY, db: Session = Depends(get_read_db)):
+    projection = fastread.parse_fields("series", fields)
+    return response_cache.respond(request, response_cache.WRITES["series"], response_cache.PLAIN,
+        lambda: found(fastread.get_series(db, series_id, depth=depth, fields=projection), "Series not found"))
 
 @app.post("/series", response_model=schemas.SeriesOut, status_code=201, tags=["series"])
 def create_series(item: schemas.SeriesCreate, db: Session = Depends(get_db)):
-    return crud.create_series(db, item)
+    s = writer.run(db, lambda db: crud.create_series(db, item))
+    response_cache.invalidate("series"); return s
+
+@app.post("/series:bulk", response_model=schemas.BulkResult, tags=["series"])
+async def bulk_create_series(request: Request, chunk_size: int = Query(bulk.BULK_CHUNK_SIZE, ge=1, le=bulk.MAX_BULK_CHUNK_SIZE), db: Session = Depends(get_db)):
+    return await bulk.ingest(db, "series", request.stream(), chunk_size)
 
 @app.put("/series/{series_id}", response_model=schemas.SeriesOut, tags=["series"])
 def update_series(series_id: int, item: schemas.SeriesUpdate, db: Session = Depends(get_db)):
-    s = crud.get_series(db, series_id)
-    if not s: raise HTTPException(status_code=404, detail="Series not found")
-    return crud.update_series(db, s, item)
+    def write(db: Session):
+        s = crud.get_series(db, series_id)
+        if not s: raise HTTPException(status_code=404, detail="Series not found")
+        return crud.update_series(db, s, item)
+    s = writer.run(db, write)
+    response_cache.invalidate("series"); return s
 
 @app.delete("/series/{series_id}", status_code=204, tags=["series"])
 def delete_series(series_id: int, db: Session = Depends(get_db)):
-    s = crud.get_series(db, series_id)
-    if not s: raise HTTPException(status_code=404, detail="Series not found")
-    crud.delete_series(db, s); return None
+    def write(db: Session):
+        s = crud.get_series(db, series_id)
+        if not s: raise HTTPException(status_code=404, detail="Series not found")
+        crud.delete_series(db, s)
+    writer.run(db, write)
+    response_cache.invalidate("series"); return None
 
 @app.post("/series/{series_id}/seasons", response_model=schemas.SeriesOut, status_code=201, tags=["series"])
 def add_season(series_id: int, season: schemas.SeasonCreate, db: Session = Depends(get_db)):
-    if not crud.get_series(db, series_id):
-        raise HTTPException(status_code=404, detail="Series not found")
-    return crud.add_season(db, series_id, season)
+    def write(db: Session):
+        if not crud.get_series(db, series_id, depth="series"):
+            raise HTTPException(status_code=404, detail="Series not found")
+        return crud.add_season(db, series_id, season)
+    s = writer.run(db, write)
+    response_cache.invalidate("series"); return s
+
+@app.get("/series/{series_id}/seasons", response_model=List[schemas.SeasonSummary], tags=["series"])
+def get_seasons(series_id: int, request: Request, db: Session = Depends(get_read_db)):
+    return response_cache.respond(request, response_cache.WRITES["series"], response_cache.PLAIN,
+        lambda: found(fastread.list_seasons(db, series_id), "Series not found"))
+
+@app.get("/series/{series_id}/seasons/{number}/episodes", response_model=List[schemas.EpisodeOut], tags=["series"])
+def get_episodes(series_id: int, number: int, request: Request, limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), cursor: Optional[str] = None, db: Session = Depends(get_read_db)):
+    def load():
+        page = fastread.list_episodes(db, series_id, number, limit=limit, cursor=cursor)
+        if page is None: raise HTTPException(status_code=404, detail="Season not found")
+        return paged(page)
+    return response_cache.respond(request, response_cache.WRITES["series"], response_cache.PLAIN, load)
+
+@app.post("/series/{series_id}/seasons/{number}/episodes", response_model=schemas.EpisodeOut, status_code=201, tags=["series"])
+def add_episode(series_id: int, number: int, episode: schemas.EpisodeCreate, db: Session = Depends(get_db)):
+    try:
+        ep = writer.run(db, lambda db: crud.add_episode(db, series_id, number, episode))
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Episode number already exists in this season")
+    if ep is None: raise HTTPException(status_code=404, detail="Season not found")
+    response_cache.invalidate("series"); return ep
 
 @app.get("/games", response_model=List[schemas.GameOut], tags=["games"])
-def get_games(year: Optional[int] = Query(None, ge=1950, le=2100), country: Optional[str] = None, publisher: Optional[str] = None, db: Session = Depends(get_db)):
-    return crud.list_games(db, year=year, country=country, publisher=publisher)
+def get_games(request: Request, year: Optional[int] = Query(None, ge=1950, le=2100), country: Optional[str] = None, publisher: Optional[str] = None, limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE), cursor: Optional[str] = None, fields: Optional[str] = FIELDS_QUERY, ids: Optional[str] = IDS_QUERY, db: Session = Depends(get_read_db)):
+    projection = fastread.parse_fields("games", fields)
+    wanted = fastread.parse_ids(ids)
+    if wanted is not None:
+        return response_cache.respond(request, response_cache.WRITES["games"], response_cache.PLAIN,
+            lambda: (list(fastread.games_by_ids(db, wanted, fields=projection).values()), {}))
+    return response_cache.respond(request, response_cache.WRITES["games"], response_cache.PLAIN,
+        lambda: paged(lists.list_games(db, year=year, country=country, publisher=publisher, limit=limit, cursor=cursor, fields=projection)))
 
 @app.get("/games/{game_id}", response_model=schemas.GameOut, tags=["games"])
-def get_game_by_id(game_id: int, db: Session = Depends(get_db)):
-    g = crud.get_game(db, game_id)
-    if not g: raise HTTPException(status_code=404, detail="Game not found")
-    return g
+def get_game_by_id(game_id: int, request: Request, fields: Optional[str] = FIELDS_QUERY, db: Session = Depends(get_read_db)):
+    projection = fastread.parse_fields("games", fields)
+    return response_cache.respond(request, response_cache.WRITES["games"], response_cache.PLAIN,
+        lambda: found(fastread.get_game(db, game_id, fields=projection), "Game not found"))
 
 @app.post("/games", response_model=schemas.GameOut, status_code=201, tags=["games"])
 def create_game(item: schemas.GameCreate, db: Session = Depends(get_db)):
-    return crud.create_game(db, item)
+    g = writer.run(db, lambda db: crud.create_game(db, item))
+    response_cache.invalidate("games"); return g
+
+@app.post("/games:bulk", response_model=schemas.BulkResult, tags=["games"])
+async def bulk_create_games(request: Request, chunk_size: int = Query(bulk.BULK_CHUNK_SIZE, ge=1, le=bulk.MAX_BULK_CHUNK_SIZE), db: Session = Depends(get_db)):
+    return await bulk.ingest(db, "games", request.stream(), chunk_size)
 
 @app.put("/games/{game_id}", response_model=schemas.GameOut, tags=["games"])
 def update_game(game_id: int, item: schemas.GameUpdate, db: Session = Depends(get_db)):
-    g = crud.get_game(db, game_id)
-    if not g: raise HTTPException(status_code=404, detail="Game not found")
-    return crud.update_game(db, g, item)
+    def write(db: Session):
+        g = crud.get_game(db, game_id)
+        if not g: raise HTTPException(status_code=404, detail="Game not found")
+        return crud.update_game(db, g, item)
+    g = writer.run(db, write)
+    response_cache.invalidate("games"); return g
 
 @app.delete("/games/{game_id}", status_code=204, tags=["games"])
 def delete_game(game_id: int, db: Session = Depends(get_db)):
-    g = crud.get_game(db, game_id)
-    if not g: raise HTTPException(status_code=404, detail="Game not found")
-    crud.delete_game(db, g); return None
+    def write(db: Session):
+        g = crud.get_game(db, game_id)
+        if not g: raise HTTPException(status_code=404, detail="Game not found")
+        crud.delete_game(db, g)
+    writer.run(db, write)
+    response_cache.invalidate("games"); return None
+
+@app.get("/stats", response_model=schemas.StatsOut, tags=["stats"])
+def get_stats(request: Request, top: int = Query(stats.DEFAULT_TOP, ge=1, le=stats.MAX_TOP), db: Session = Depends(get_read_db)):
+    return response_cache.respond(request, ("movies", "series", "games"), response_cache.PLAIN, lambda: (stats.read(db, top), {}))
+
+@app.get("/stats/series/{series_id}", response_model=schemas.SeriesTotals, tags=["stats"])
+def get_series_stats(series_id: int, request: Request, db: Session = Depends(get_read_db)):
+    return response_cache.respond(request, ("series",), response_cache.PLAIN,
+        lambda: found(stats.read_series(db, series_id), "Series not found"))
+
+@app.post("/catalog:batch", response_model=schemas.CatalogBatchOut, tags=["meta"])
+def catalog_batch(batch: schemas.CatalogBatchIn, db: Session = Depends(get_read_db)):
+    # One IN query per entity type (plus seasons/episodes), whatever the number of ids.
+    content = {"movies": fastread.movies_by_ids(db, batch.movies) if batch.movies else {},
+               "series": fastread.series_by_ids(db, batch.series, depth=batch.depth) if batch.series else {},
+               "games": fastread.games_by_ids(db, batch.games) if batch.games else {}}
+    return Response(orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS), media_type="application/json")
+
+@app.get("/changes", response_model=schemas.ChangesOut, tags=["sync"])
+def get_changes(request: Request, since: int = Query(0, ge=0), limit: int = Query(changes.DEFAULT_LIMIT, ge=1, le=changes.MAX_LIMIT), db: Session = Depends(get_read_db)):
+    # Not cached: a client polling `since` must see writes from every process at once,
+    # and the revision range scans cost about `limit` rows anyway.
+    return Response(orjson.dumps(changes.read(db, since, limit)), media_type="application/json")
+
+@app.get("/search", response_model=List[schemas.SearchHit], tags=["search"])
+def search_titles(request: Request, q: str = Query(..., min_length=1, max_length=200), type: Optional[List[search.SearchKind]] = Query(None), limit: int = Query(20, ge=1, le=100), offset: int = Query(0, ge=0, le=10000), db: Session = Depends(get_read_db)):
+    kinds = tuple(dict.fromkeys(type)) if type else search.KINDS
+    return response_cache.respond(request, ("movies", "series", "games"), schemas.SEARCH_HITS,
+        lambda: (search.search(db, q, kinds, limit, offset), {}))
+
+@app.get("/export/{entity}", tags=["export"])
+def export_catalog(entity: export.ExportEntity, format: export.ExportFormat = "ndjson"):
+    return StreamingResponse(
+        export.export(entity, format), media_type=export.MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{entity}.{format}"'}
+    )
+
+if DB_MODE == "async":
+    from . import async_routes
+    async_routes.install(app)
@@ -0,0 +1,222 @@
+"""Per-request SQL accounting, Server-Timing headers and a Prometheus /metrics exposition.
+
+Query counts and DB time are collected by engine cursor events into a
+RequestStats object held in a contextvar. The middleware installs that object,
+and Starlette's threadpool copies the context into sync handlers.
+"""
+import os
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+BATCH_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+
+class RequestStats:
+    __slots__ = ("queries", "db_time", "serialize_time")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.serialize_time = 0.0
+
+current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: Sequence[str]=()):
+        self.name, self.help, self.labels = name, help, tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float=1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} counter"
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                yield f"{self.name}{_labels(self.labels, labels)} {value}"
+
+class Gauge:
+    def __init__(self, name: str, help: str, labels: Sequence[str]=()):
+        self.name, self.help, self.labels = name, help, tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def set(self, value: float, *labels: str) -> None:
+        with self._lock:
+            self._values[labels] = value
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} gauge"
+        with self._lock:
+            for labels, value in sorted(self._values.items()):
+                yield f"{self.name}{_labels(self.labels, labels)} {value}"
+
+class Histogram:
+    def __init__(self, name: str, help: str, labels: Sequence[str]=(), buckets: Sequence[float]=LATENCY_BUCKETS):
+        self.name, self.help, self.labels, self.buckets = name, help, tuple(labels), tuple(buckets)
+        # labels -> [bucket counts..., +Inf count, sum]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        with self._lock:
+            row = self._values.get(labels)
+            if row is None:
+                row = self._values[labels] = [0.0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    row[i] += 1
+                    break
+            else:
+                row[len(self.buckets)] += 1
+            row[-1] += value
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._values.items())
+        for labels, row in items:
+            cumulative = 0.0
+            for bound, count in zip(self.buckets + (float("inf"),), row):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                yield f"{self.name}_bucket{_labels(self.labels + ('le',), labels + (le,))} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labels, labels)} {row[-1]}"
+            yield f"{self.name}_count{_labels(self.labels, labels)} {cumulative}"
+
+def _labels(names: Tuple[str, ...], values: Tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join('%s="%s"' % (n, str(v).replace("\\", "\\\\").replace('"', '\\"')) for n, v in zip(names, values))
+    return "{" + pairs + "}"
+
+REQUESTS = Counter("http_requests_total", "HTTP requests by route and status.", ("method", "route", "status"))
+ERRORS = Counter("http_request_errors_total", "Requests that ended in a 5xx or an unhandled exception.", ("method", "route"))
+LATENCY = Histogram("http_request_duration_seconds", "Time until the response headers were sent.", ("method", "route"))
+DB_TIME = Histogram("db_time_per_request_seconds", "Total SQL execution time per request.", ("method", "route"))
+QUERIES = Histogram("db_queries_per_request", "SQL statements executed per request.", ("method", "route"), QUERY_BUCKETS)
+POOL_WAIT = Histogram("db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection.")
+WRITE_BATCH = Histogram("db_write_batch_size", "Writes committed together by the group writer (DB_WRITER=group).", (), BATCH_BUCKETS)
+ADMITTED = Gauge("admission_in_flight", "Requests running under each admission limit.", ("class",))
+QUEUED = Gauge("admission_queue_depth", "Requests waiting for an admission slot.", ("class",))
+REJECTED = Counter("admission_rejected_total", "Requests answered 503 by admission control.", ("class", "reason"))
+ADMISSION_WAIT = Histogram("admission_wait_seconds", "Time requests waited in the admission queue before running.", ("class",))
+
+_engines: List = []
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long each checkout waited for a free connection."""
+    def _do_get(self):
+        t0 = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            POOL_WAIT.observe(time.perf_counter() - t0)
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+def _finish(conn) -> None:
+    started = conn.info["query_start"].pop()
+    stats = current.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_time += time.perf_counter() - started
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    _finish(conn)
+
+def _handle_error(ctx) -> None:
+    # A statement that raised gets no after_cursor_execute: close its timing here, or the
+    # stack would grow on the pooled connection and later statements pop the wrong start.
+    if ctx.execution_context is not None and ctx.connection is not None and ctx.connection.info.get("query_start"):
+        _finish(ctx.connection)
+
+def instrument_engine(engine) -> None:
+    if not METRICS_ENABLED or engine in _engines:
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+    _engines.append(engine)
+
+def record_serialize(seconds: float) -> None:
+    stats = current.get()
+    if stats is not None:
+        stats.serialize_time += seconds
+
+def _route_label(scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+class MetricsMiddleware:
+    """Pure ASGI middleware: adds Server-Timing and feeds the per-route metrics."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        stats = RequestStats()
+        token = current.set(stats)
+        started = time.perf_counter()
+        method = scope["method"]
+        responded = False
+
+        async def send_wrapper(message):
+            nonlocal responded
+            if message["type"] == "http.response.start":
+                responded = True
+                status = message["status"]
+                total = time.perf_counter() - started
+                route = _route_label(scope)
+                REQUESTS.inc(method, route, str(status))
+                LATENCY.observe(total, method, route)
+                DB_TIME.observe(stats.db_time, method, route)
+                QUERIES.observe(stats.queries, method, route)
+                if status >= 500:
+                    ERRORS.inc(method, route)
+                timing = (f'db;dur={stats.db_time * 1000:.2f};desc="{stats.queries} queries", '
+                          f"serialize;dur={stats.serialize_time * 1000:.2f}, total;dur={total * 1000:.2f}")
+                message["headers"] = list(message.get("headers", [])) + [(b"server-timing", timing.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            if responded:
+                raise
+            route = _route_label(scope)
+            REQUESTS.inc(method, route, "500")
+            ERRORS.inc(method, route)
+            raise
+        finally:
+            current.reset(token)
+
+def _pool_gauges() -> Iterable[str]:
+    yield "# HELP db_pool_checked_out Connections currently checked out of each pool."
+    yield "# TYPE db_pool_checked_out gauge"
+    for engine in _engines:
+        pool = engine.pool
+        if hasattr(pool, "checkedout"):
+            yield f'db_pool_checked_out{{engine="{engine.url.render_as_string(hide_password=True)}"}} {pool.checkedout()}'
+
+def render() -> str:
+    lines: List[str] = []
+    for metric in (REQUESTS, ERRORS, LATENCY, DB_TIME, QUERIES, POOL_WAIT, WRITE_BATCH, ADMITTED, QUEUED, REJECTED, ADMISSION_WAIT):
+        lines.extend(metric.render())
+    lines.extend(_pool_gauges())
+    return "\n".join(lines) + "\n"
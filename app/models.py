@@ -1,21 +1,38 @@
-from sqlalchemy import Column, Integer, String, Text, ForeignKey, UniqueConstraint
+from sqlalchemy import DDL, Column, Integer, String, Text, ForeignKey, UniqueConstraint, Index, event
 from sqlalchemy.orm import relationship
 from .database import Base
+from .search import create_search_index
+
+def revision_column() -> Column:
+    # Revision of the last write to the row, from revision_counter (see app/changes.py).
+    return Column(Integer, nullable=False, default=0, server_default="0", index=True)
+
+def name_key(name: str) -> str:
+    """Case- and whitespace-insensitive form of a country/director/publisher name."""
+    return " ".join(name.split()).casefold()
+
+def name_key_column(length: int) -> Column:
+    # Filled from `name` by any INSERT that does not set it; name filters and lookups match on it.
+    return Column(String(length), unique=True, index=True, nullable=False,
+                  default=lambda context: name_key(context.get_current_parameters()["name"]))
 
 class Country(Base):
     __tablename__ = "countries"
     id = Column(Integer, primary_key=True)
     name = Column(String(80), unique=True, index=True, nullable=False)
+    name_key = name_key_column(80)
 
 class Director(Base):
     __tablename__ = "directors"
     id = Column(Integer, primary_key=True)
     name = Column(String(120), unique=True, index=True, nullable=False)
+    name_key = name_key_column(120)
 
 class Publisher(Base):
     __tablename__ = "publishers"
     id = Column(Integer, primary_key=True)
     name = Column(String(120), unique=True, index=True, nullable=False)
+    name_key = name_key_column(120)
 
 class Movie(Base):
     __tablename__ = "movies"
@@ -24,9 +41,16 @@ class Movie(Base):
     year = Column(Integer, nullable=False)
     director_id = Column(Integer, ForeignKey("directors.id"), nullable=False)
     country_id = Column(Integer, ForeignKey("countries.id"), nullable=False)
+    revision = revision_column()
     director = relationship("Director")
     country = relationship("Country")
-    __table_args__ = (UniqueConstraint("title", "year", name="uq_movies_title_year"),)
+    __table_args__ = (
+        UniqueConstraint("title", "year", name="uq_movies_title_year"),
+        Index("ix_movies_year_title_id", year.desc(), title, id),
+        # Name filters resolve to an id: one index range per filter, already in list order.
+        Index("ix_movies_country_year_title_id", country_id, year.desc(), title, id),
+        Index("ix_movies_director_year_title_id", director_id, year.desc(), title, id),
+    )
 
 class Series(Base):
     __tablename__ = "series"
@@ -35,10 +59,16 @@ class Series(Base):
     year = Column(Integer, nullable=False)
     director_id = Column(Integer, ForeignKey("directors.id"), nullable=False)
     country_id = Column(Integer, ForeignKey("countries.id"), nullable=False)
+    revision = revision_column()
     director = relationship("Director")
     country = relationship("Country")
-    seasons = relationship("Season", back_populates="series", cascade="all, delete-orphan")
-    __table_args__ = (UniqueConstraint("title", "year", name="uq_series_title_year"),)
+    seasons = relationship("Season", back_populates="series", cascade="all, delete-orphan", order_by="Season.number")
+    __table_args__ = (
+        UniqueConstraint("title", "year", name="uq_series_title_year"),
+        Index("ix_series_year_title_id", year.desc(), title, id),
+        Index("ix_series_country_year_title_id", country_id, year.desc(), title, id),
+        Index("ix_series_director_year_title_id", director_id, year.desc(), title, id),
+    )
 
 class Season(Base):
     __tablename__ = "seasons"
@@ -46,8 +76,9 @@ class Season(Base):
     series_id = Column(Integer, ForeignKey("series.id"), nullable=False)
     number = Column(Integer, nullable=False)
     year = Column(Integer, nullable=True)
+    revision = revision_column()
     series = relationship("Series", back_populates="seasons")
-    episodes = relationship("Episode", back_populates="season", cascade="all, delete-orphan")
+    episodes = relationship("Episode", back_populates="season", cascade="all, delete-orphan", order_by="Episode.number")
     __table_args__ = (UniqueConstraint("series_id", "number", name="uq_season_series_number"),)
 
 class Episode(Base):
@@ -56,6 +87,7 @@ class Episode(Base):
     season_id = Column(Integer, ForeignKey("seasons.id"), nullable=False)
     number = Column(Integer, nullable=False)
     title = Column(String(150), nullable=False)
+    revision = revision_column()
     season = relationship("Season", back_populates="episodes")
     __table_args__ = (UniqueConstraint("season_id", "number", name="uq_episode_season_number"),)
 
@@ -66,6 +98,37 @@ class Game(Base):
     year = Column(Integer, nullable=False)
     country_id = Column(Integer, ForeignKey("countries.id"), nullable=False)
     publisher_id = Column(Integer, ForeignKey("publishers.id"), nullable=False)
+    revision = revision_column()
     country = relationship("Country")
     publisher = relationship("Publisher")
-    __table_args__ = (UniqueConstraint("title", "year", name="uq_games_title_year"),)
+    __table_args__ = (
+        UniqueConstraint("title", "year", name="uq_games_title_year"),
+        Index("ix_games_year_title_id", year.desc(), title, id),
+        Index("ix_games_country_year_title_id", country_id, year.desc(), title, id),
+        Index("ix_games_publisher_year_title_id", publisher_id, year.desc(), title, id),
+    )
+
+class StatCount(Base):
+    """Summary row behind GET /stats: how many `entity` rows have `dimension` == `key` (see app/stats.py)."""
+    __tablename__ = "stat_counts"
+    entity = Column(String(16), primary_key=True)
+    dimension = Column(String(16), primary_key=True)
+    key = Column(Integer, primary_key=True)
+    count = Column(Integer, nullable=False)
+    __table_args__ = (Index("ix_stat_counts_top", entity, dimension, count.desc()),)
+
+class RevisionCounter(Base):
+    """Single row (id 1) holding the last revision handed out by app/changes.py."""
+    __tablename__ = "revision_counter"
+    id = Column(Integer, primary_key=True)
+    value = Column(Integer, nullable=False)
+
+class Tombstone(Base):
+    """A deleted movie/series/season/episode/game, reported by GET /changes."""
+    __tablename__ = "tombstones"
+    revision = Column(Integer, primary_key=True)
+    entity = Column(String(16), nullable=False)
+    entity_id = Column(Integer, nullable=False)
+
+event.listen(RevisionCounter.__table__, "after_create", DDL("INSERT INTO revision_counter (id, value) VALUES (1, 0)"))
+event.listen(Base.metadata, "after_create", create_search_index)
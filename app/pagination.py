@@ -0,0 +1,86 @@
+import base64
+import json
+from typing import Any, List, NamedTuple, Optional, Tuple
+from sqlalchemy import and_, or_
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+class InvalidCursor(ValueError):
+    pass
+
+class Page(NamedTuple):
+    items: List[Any]
+    next_cursor: Optional[str]
+
+def _encode(values: list) -> str:
+    raw = json.dumps(values, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+def _decode(cursor: str) -> Any:
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except Exception as exc:
+        raise InvalidCursor("Invalid cursor") from exc
+
+def encode_cursor(year: int, title: str, id: int) -> str:
+    return _encode([year, title, id])
+
+def decode_cursor(cursor: str) -> Tuple[int, str, int]:
+    """Inverse of encode_cursor. Raises InvalidCursor on anything malformed."""
+    values = _decode(cursor)
+    if not (isinstance(values, list) and len(values) == 3):
+        raise InvalidCursor("Invalid cursor")
+    year, title, id = values
+    if not isinstance(year, int) or not isinstance(title, str) or not isinstance(id, int):
+        raise InvalidCursor("Invalid cursor")
+    return year, title, id
+
+def decode_number_cursor(cursor: str) -> int:
+    """Inverse of the cursors made by to_number_page."""
+    values = _decode(cursor)
+    if not (isinstance(values, list) and len(values) == 1 and isinstance(values[0], int)):
+        raise InvalidCursor("Invalid cursor")
+    return values[0]
+
+def keyset_select(stmt, model, limit: int, cursor: Optional[str]=None):
+    """Apply the catalog ordering (year DESC, title ASC, id ASC) and seek past `cursor`.
+
+    Seeking on the ordering key instead of OFFSET keeps every page as cheap as the
+    first one, as long as the matching composite index exists on the table.
+    One extra row is fetched so to_page can tell whether another page exists.
+    """
+    if cursor:
+        year, title, id = decode_cursor(cursor)
+        # The leading `year <= y` gives the planner a range bound on the index's first
+        # column; the OR tree alone is answered by scanning from the start of the index.
+        stmt = stmt.where(model.year <= year, or_(
+            model.year < year,
+            and_(model.year == year, or_(
+                model.title > title,
+                and_(model.title == title, model.id > id)
+            ))
+        ))
+    return stmt.order_by(model.year.desc(), model.title.asc(), model.id.asc()).limit(limit + 1)
+
+def to_page(rows: List[Any], limit: int) -> Page:
+    if len(rows) <= limit:
+        return Page(list(rows), None)
+    rows = rows[:limit]
+    last = rows[-1]
+    return Page(rows, encode_cursor(last.year, last.title, last.id))
+
+def number_select(stmt, column, limit: int, cursor: Optional[str]=None):
+    """Keyset pagination on a position inside a parent (episode number within a season).
+
+    Paired with a unique (parent_id, number) index, every page is one index range scan.
+    """
+    if cursor:
+        stmt = stmt.where(column > decode_number_cursor(cursor))
+    return stmt.order_by(column.asc()).limit(limit + 1)
+
+def to_number_page(rows: List[Any], limit: int) -> Page:
+    if len(rows) <= limit:
+        return Page(list(rows), None)
+    rows = rows[:limit]
+    return Page(rows, _encode([rows[-1].number]))
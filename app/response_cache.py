@@ -0,0 +1,208 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, NamedTuple, Optional, Tuple
+import orjson
+from fastapi import HTTPException, Request, Response
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from . import metrics, models
+from .database import async_engine, engine
+from .pagination import Page
+
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "1024"))
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+RESPONSE_CACHE_MAX_STALENESS = float(os.getenv("RESPONSE_CACHE_MAX_STALENESS", "1.0"))
+
+# Tables whose version is bumped by a write to each entity: the entity itself plus
+# the lookup tables a write may add rows to.
+WRITES = {
+    "movies": ("movies", "countries", "directors"),
+    "series": ("series", "countries", "directors"),
+    "games": ("games", "countries", "publishers"),
+}
+
+# Pass as `adapter` when the loader already returns plain dicts/lists (see fastread);
+# the body is then encoded with orjson and Pydantic validation is skipped.
+PLAIN: Optional[TypeAdapter] = None
+
+class Entry(NamedTuple):
+    versions: Tuple[int, ...]
+    body: bytes
+    etag: str
+    headers: Dict[str, str]
+
+class ResponseCache:
+    """LRU of rendered GET responses, bounded by entry count and total body bytes.
+
+    Each entry remembers the version of every table it was built from; bumping a
+    table's version makes those entries unreachable without scanning the cache.
+    Table versions live in this process and are bumped by its own writes. Every
+    version also carries the shared revision_counter value (see app/changes.py),
+    read again at most RESPONSE_CACHE_MAX_STALENESS seconds after the last read:
+    a write by another process (a second worker, the seed, a script) drops every
+    entry at most that long after it commits.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._data: "OrderedDict[Tuple[str, str], Entry]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        self._revision = 0
+        self._checked_at = float("-inf")
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.evictions = 0
+
+    def versions(self, tables: Iterable[str]) -> Tuple[int, ...]:
+        with self._lock:
+            return tuple(self._versions.get(t, 0) for t in tables) + (self._revision,)
+
+    def stale(self) -> bool:
+        """Whether the shared revision should be read again before serving from the cache."""
+        return self.max_entries > 0 and time.monotonic() - self._checked_at > RESPONSE_CACHE_MAX_STALENESS
+
+    def sync(self, revision: int) -> None:
+        with self._lock:
+            self._revision = revision
+            self._checked_at = time.monotonic()
+
+    def bump(self, *tables: str) -> None:
+        with self._lock:
+            for t in tables:
+                self._versions[t] = self._versions.get(t, 0) + 1
+
+    def get(self, key: Tuple[str, str], versions: Tuple[int, ...]) -> Optional[Entry]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry.versions != versions:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key: Tuple[str, str], entry: Entry) -> None:
+        size = len(entry.body)
+        if self.max_entries <= 0 or size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old.body)
+            self._data[key] = entry
+            self._bytes += size
+            while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._data.popitem(last=False)
+                self._bytes -= len(evicted.body)
+                self.evictions += 1
+
+    def record_not_modified(self) -> None:
+        with self._lock:
+            self.not_modified += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._data), "max_entries": self.max_entries,
+                "bytes": self._bytes, "max_bytes": self.max_bytes,
+                "hits": self.hits, "misses": self.misses, "not_modified": self.not_modified,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            }
+
+cache = ResponseCache(RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_MAX_BYTES)
+
+# The committed revision_counter value: every write through crud, bulk or the
+# seed takes a revision from it, whichever process makes it.
+REVISION = select(models.RevisionCounter.value).where(models.RevisionCounter.id == 1)
+
+def _sync() -> None:
+    if cache.stale():
+        with engine.connect() as conn:
+            cache.sync(conn.execute(REVISION).scalar() or 0)
+
+async def _sync_async() -> None:
+    if cache.stale():
+        async with async_engine.connect() as conn:
+            cache.sync((await conn.execute(REVISION)).scalar() or 0)
+
+def invalidate(entity: str) -> None:
+    cache.bump(*WRITES[entity])
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    # If-None-Match uses the weak comparison: W/ prefixes are ignored.
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
+
+def paged(page: Page) -> Tuple[list, Dict[str, str]]:
+    """Loader result for a keyset page: the items, plus X-Next-Cursor when there is more."""
+    return page.items, ({"X-Next-Cursor": page.next_cursor} if page.next_cursor else {})
+
+def found(obj: Any, detail: str) -> Tuple[Any, Dict[str, str]]:
+    if obj is None: raise HTTPException(status_code=404, detail=detail)
+    return obj, {}
+
+def _key(request: Request) -> Tuple[str, str]:
+    return request.url.path, "&".join(sorted(request.url.query.split("&")))
+
+def _render(request: Request, entry: Entry) -> Response:
+    headers = {"ETag": entry.etag, **entry.headers}
+    if _etag_matches(request.headers.get("if-none-match"), entry.etag):
+        cache.record_not_modified()
+        return Response(status_code=304, headers=headers)
+    return Response(entry.body, media_type="application/json", headers=headers)
+
+def _dump(adapter: Optional[TypeAdapter], content: Any) -> bytes:
+    if adapter is PLAIN:
+        return orjson.dumps(content)
+    return adapter.dump_json(adapter.validate_python(content, from_attributes=True))
+
+def _store(key: Tuple[str, str], versions: Tuple[int, ...], adapter: Optional[TypeAdapter],
+           content: Any, headers: Dict[str, str]) -> Entry:
+    t0 = time.perf_counter()
+    body = _dump(adapter, content)
+    metrics.record_serialize(time.perf_counter() - t0)
+    etag = '"%s"' % hashlib.blake2b(body, digest_size=16).hexdigest()
+    entry = Entry(versions, body, etag, headers)
+    cache.put(key, entry)
+    return entry
+
+def respond(request: Request, tables: Tuple[str, ...], adapter: Optional[TypeAdapter],
+            load: Callable[[], Tuple[Any, Dict[str, str]]]) -> Response:
+    """Serve a GET from the cache, or build it with load() -> (content, extra headers)."""
+    _sync()
+    key = _key(request)
+    versions = cache.versions(tables)
+    entry = cache.get(key, versions)
+    if entry is None:
+        entry = _store(key, versions, adapter, *load())
+    return _render(request, entry)
+
+async def respond_async(request: Request, tables: Tuple[str, ...], adapter: Optional[TypeAdapter],
+                        load: Callable[[], Awaitable[Tuple[Any, Dict[str, str]]]]) -> Response:
+    """respond() for async routes: load is a coroutine function."""
+    await _sync_async()
+    key = _key(request)
+    versions = cache.versions(tables)
+    entry = cache.get(key, versions)
+    if entry is None:
+        entry = _store(key, versions, adapter, *await load())
+    return _render(request, entry)
@@ -1,5 +1,5 @@
-from typing import List, Optional
-from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Literal, Optional
+from pydantic import BaseModel, Field, TypeAdapter
 
 class CountryOut(BaseModel):
     id: int
@@ -64,6 +64,14 @@ class SeasonOut(BaseModel):
     episodes: List[EpisodeOut] = []
     class Config: from_attributes = True
 
+# How much of the season/episode tree a series response includes.
+SeriesDepth = Literal["series", "seasons", "episodes"]
+
+class SeasonSummary(BaseModel):
+    id: int
+    number: int
+    year: Optional[int]
+
 class SeriesBase(BaseModel):
     title: str
     year: int = Field(..., ge=1888, le=2100)
@@ -109,3 +117,96 @@ class GameOut(BaseModel):
     country: CountryOut
     publisher: PublisherOut
     class Config: from_attributes = True
+
+class BulkError(BaseModel):
+    line: int
+    error: str
+
+class BulkResult(BaseModel):
+    received: int = 0
+    inserted: int = 0
+    errors: List[BulkError] = []
+
+class SearchHit(BaseModel):
+    type: str
+    id: int
+    title: str
+    score: float
+    series_id: Optional[int] = None
+
+class YearCount(BaseModel):
+    year: int
+    count: int
+
+class NamedCount(BaseModel):
+    id: int
+    name: str
+    count: int
+
+class MovieStats(BaseModel):
+    total: int
+    by_year: List[YearCount]
+    by_country: List[NamedCount]
+    by_director: List[NamedCount]
+
+class SeriesStats(MovieStats):
+    seasons: int
+    episodes: int
+
+class GameStats(BaseModel):
+    total: int
+    by_year: List[YearCount]
+    by_country: List[NamedCount]
+    by_publisher: List[NamedCount]
+
+class StatsOut(BaseModel):
+    movies: MovieStats
+    series: SeriesStats
+    games: GameStats
+
+class SeriesTotals(BaseModel):
+    series_id: int
+    seasons: int
+    episodes: int
+
+class ChangeOut(BaseModel):
+    revision: int
+    entity: Literal["movies", "series", "seasons", "episodes", "games"]
+    id: int
+    deleted: bool
+    # MovieOut / GameOut, SeriesOut without seasons, or the season/episode row
+    # with its parent id; null for a deletion.
+    data: Optional[Dict[str, Any]]
+
+class ChangesOut(BaseModel):
+    since: int
+    next: int
+    more: bool
+    changes: List[ChangeOut]
+
+# Most ids per entity in ?ids= and POST /catalog:batch (one IN query each).
+MAX_BATCH_IDS = 500
+
+class CatalogBatchIn(BaseModel):
+    movies: List[int] = Field([], max_length=MAX_BATCH_IDS)
+    series: List[int] = Field([], max_length=MAX_BATCH_IDS)
+    games: List[int] = Field([], max_length=MAX_BATCH_IDS)
+    depth: SeriesDepth = "episodes"
+
+class CatalogBatchOut(BaseModel):
+    # Found items keyed by id; ids that do not exist are left out.
+    movies: Dict[int, MovieOut]
+    series: Dict[int, SeriesOut]
+    games: Dict[int, GameOut]
+
+# Serializers used by response_cache to render cached GET bodies.
+COUNTRY_LIST = TypeAdapter(List[CountryOut])
+DIRECTOR_LIST = TypeAdapter(List[DirectorOut])
+PUBLISHER_LIST = TypeAdapter(List[PublisherOut])
+MOVIE = TypeAdapter(MovieOut)
+MOVIE_LIST = TypeAdapter(List[MovieOut])
+SERIES = TypeAdapter(SeriesOut)
+SERIES_LIST = TypeAdapter(List[SeriesOut])
+GAME = TypeAdapter(GameOut)
+GAME_LIST = TypeAdapter(List[GameOut])
+SEARCH_HITS = TypeAdapter(List[SearchHit])
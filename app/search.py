@@ -0,0 +1,122 @@
+"""Full-text title search over movies, series, episodes and games.
+
+SQLite: one FTS5 table, catalog_fts(title), maintained by triggers on the source
+tables. Its rowid packs the source row as id * 4 + kind, so trigger updates and
+deletes are rowid lookups rather than scans.
+Postgres: expression GIN indexes on to_tsvector(title), which need no upkeep.
+"""
+import re
+from typing import List, Literal, Optional, Sequence
+from fastapi import HTTPException
+from sqlalchemy import bindparam, text
+from sqlalchemy.orm import Session
+
+SearchKind = Literal["movie", "series", "episode", "game"]
+KINDS = ("movie", "series", "episode", "game")
+TABLES = {"movie": "movies", "series": "series", "episode": "episodes", "game": "games"}
+
+def _sqlite_ddl(conn) -> None:
+    exists = conn.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name='catalog_fts'").first()
+    if exists:
+        return
+    conn.exec_driver_sql(
+        "CREATE VIRTUAL TABLE catalog_fts USING fts5(title, tokenize='unicode61 remove_diacritics 2')")
+    for code, kind in enumerate(KINDS):
+        table = TABLES[kind]
+        rowid = f"{{row}}.id * 4 + {code}"
+        conn.exec_driver_sql(
+            f"CREATE TRIGGER {table}_fts_ai AFTER INSERT ON {table} BEGIN "
+            f"INSERT INTO catalog_fts(rowid, title) VALUES ({rowid.format(row='new')}, new.title); END")
+        conn.exec_driver_sql(
+            f"CREATE TRIGGER {table}_fts_au AFTER UPDATE OF title ON {table} BEGIN "
+            f"UPDATE catalog_fts SET title = new.title WHERE rowid = {rowid.format(row='old')}; END")
+        conn.exec_driver_sql(
+            f"CREATE TRIGGER {table}_fts_ad AFTER DELETE ON {table} BEGIN "
+            f"DELETE FROM catalog_fts WHERE rowid = {rowid.format(row='old')}; END")
+        # Backfill rows that predate the index.
+        conn.exec_driver_sql(
+            f"INSERT INTO catalog_fts(rowid, title) SELECT id * 4 + {code}, title FROM {table}")
+
+def _postgres_ddl(conn) -> None:
+    for table in TABLES.values():
+        conn.exec_driver_sql(
+            f"CREATE INDEX IF NOT EXISTS ix_{table}_title_fts ON {table} "
+            f"USING gin (to_tsvector('simple', title))")
+
+def create_search_index(target, connection, **kw) -> None:
+    """MetaData after_create hook: build the search index for the connected dialect."""
+    if connection.dialect.name == "sqlite":
+        _sqlite_ddl(connection)
+    elif connection.dialect.name == "postgresql":
+        _postgres_ddl(connection)
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+def _fts5_query(q: str) -> Optional[str]:
+    # Quote every token so user input can never be parsed as FTS5 syntax;
+    # the last one is a prefix so partially typed words still match.
+    tokens = _TOKEN.findall(q)
+    if not tokens:
+        return None
+    quoted = [f'"{t}"' for t in tokens]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+def _tsquery(q: str) -> Optional[str]:
+    # The to_tsquery counterpart of _fts5_query: every token a quoted lexeme, all
+    # required, the last one a prefix, so both backends match the same titles.
+    tokens = _TOKEN.findall(q)
+    if not tokens:
+        return None
+    return " & ".join(f"'{t}'" for t in tokens) + ":*"
+
+def _search_sqlite(db: Session, q: str, kinds: Sequence[str], limit: int, offset: int) -> List[dict]:
+    match = _fts5_query(q)
+    if match is None:
+        return []
+    codes = ",".join(str(KINDS.index(k)) for k in kinds)
+    kind_filter = "" if len(kinds) == len(KINDS) else f" AND (rowid % 4) IN ({codes})"
+    rows = db.execute(text(
+        "SELECT rowid, title, bm25(catalog_fts) AS score FROM catalog_fts "
+        f"WHERE catalog_fts MATCH :match{kind_filter} ORDER BY score LIMIT :limit OFFSET :offset"
+    ), {"match": match, "limit": limit, "offset": offset}).all()
+    # bm25 is lower-is-better; flip it so higher scores rank first for clients.
+    return [{"type": KINDS[rowid % 4], "id": rowid // 4, "title": title, "score": round(-score, 4)}
+            for rowid, title, score in rows]
+
+def _search_postgres(db: Session, q: str, kinds: Sequence[str], limit: int, offset: int) -> List[dict]:
+    query = _tsquery(q)
+    if query is None:
+        return []
+    selects = " UNION ALL ".join(
+        f"SELECT '{kind}' AS type, id, title, ts_rank(to_tsvector('simple', title), query) AS score "
+        f"FROM {TABLES[kind]}, to_tsquery('simple', :q) AS query "
+        f"WHERE to_tsvector('simple', title) @@ query"
+        for kind in kinds)
+    rows = db.execute(text(f"{selects} ORDER BY score DESC, id LIMIT :limit OFFSET :offset"),
+                      {"q": query, "limit": limit, "offset": offset}).all()
+    return [{"type": t, "id": id, "title": title, "score": round(float(score), 4)} for t, id, title, score in rows]
+
+def _attach_series_ids(db: Session, hits: List[dict]) -> None:
+    episode_ids = [h["id"] for h in hits if h["type"] == "episode"]
+    if not episode_ids:
+        return
+    owners = dict(db.execute(text(
+        "SELECT e.id, s.series_id FROM episodes e JOIN seasons s ON s.id = e.season_id WHERE e.id IN :ids"
+    ).bindparams(bindparam("ids", expanding=True)), {"ids": episode_ids}).all())
+    for h in hits:
+        if h["type"] == "episode":
+            h["series_id"] = owners.get(h["id"])
+
+def search(db: Session, q: str, kinds: Sequence[str]=KINDS, limit: int=20, offset: int=0) -> List[dict]:
+    """Ranked title matches across entity types; episode hits carry their series_id."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        hits = _search_sqlite(db, q, kinds, limit, offset)
+    elif dialect == "postgresql":
+        hits = _search_postgres(db, q, kinds, limit, offset)
+    else:
+        raise HTTPException(status_code=501, detail=f"Title search is not available on {dialect}")
+    _attach_series_ids(db, hits)
+    return hits
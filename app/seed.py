@@ -1,10 +1,10 @@
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
-from .database import Base, engine, SessionLocal
-from . import models, crud, schemas
+from .database import SessionLocal
+from . import bootstrap, models, crud, schemas
 
 def seed():
-    Base.metadata.create_all(bind=engine)
+    bootstrap.init_db()
     db: Session = SessionLocal()
 
     usa = crud.get_or_create_country(db, "United States")
@@ -0,0 +1,289 @@
+"""In-memory columnar snapshot behind the /movies, /series and /games lists (READ_SNAPSHOT=1).
+
+Each entity is held as parallel array columns in catalog order (year DESC,
+title, id): int32 ids, int16 years, the country and director/publisher ids as
+int32 codes, and all titles in one UTF-8 blob with an offsets column. Per code,
+a posting list (array of positions) answers the country/person filters, and a
+year is a contiguous range of positions, so a filtered page is two bisects plus
+a scan of the matching positions; no query touches the database.
+
+Writes reach the snapshot through the /changes feed (app/changes.py). Changed
+rows go to a small overlay that is merged into every page, and an entity's
+columns are reloaded once more than READ_SNAPSHOT_COMPACT_ROWS of its rows have
+changed. Staleness bound: a write made through this process bumps response_cache
+versions and is applied before the next list read. A write made by another
+process changes the shared revision that response_cache reads at most
+RESPONSE_CACHE_MAX_STALENESS seconds later; cached pages are then dropped and
+the snapshot, whose versions include that revision, applies the write on the
+next read. Uncached pages see it at most READ_SNAPSHOT_MAX_STALENESS seconds
+after it commits, so the bound is the larger of the two.
+Series seasons/episodes are still attached from the database.
+"""
+import heapq
+import os
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from itertools import accumulate, islice
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from . import changes, fastread, models, response_cache
+from .pagination import DEFAULT_PAGE_SIZE, Page, decode_cursor, encode_cursor
+from .schemas import SeriesDepth
+
+SNAPSHOT_ENABLED = os.getenv("READ_SNAPSHOT", "0") == "1"
+SNAPSHOT_MAX_STALENESS = float(os.getenv("READ_SNAPSHOT_MAX_STALENESS", "1.0"))
+SNAPSHOT_COMPACT_ROWS = int(os.getenv("READ_SNAPSHOT_COMPACT_ROWS", "2000"))
+
+# entity -> (model, person key: director or publisher)
+ENTITIES = {"movies": (models.Movie, "director"), "series": (models.Series, "director"), "games": (models.Game, "publisher")}
+LOOKUPS = {"countries": models.Country, "directors": models.Director, "publishers": models.Publisher}
+# A write to any entity bumps these response_cache versions (see response_cache.WRITES).
+VERSIONS = ("movies", "series", "games")
+
+class Row(NamedTuple):
+    id: int
+    year: int
+    title: str
+    country_id: int
+    person_id: int
+
+def sort_key(r: Row) -> tuple:
+    return -r.year, r.title, r.id
+
+class Columns:
+    """One entity's rows in catalog order, as parallel arrays plus posting lists."""
+
+    def __init__(self, rows: List[tuple]):
+        """`rows` are (id, year, title, country_id, person_id) tuples sorted by sort_key."""
+        self.ids = array("i", (r[0] for r in rows))
+        self.years = array("h", (r[1] for r in rows))
+        self.countries = array("i", (r[3] for r in rows))
+        self.people = array("i", (r[4] for r in rows))
+        encoded = [r[2].encode("utf-8") for r in rows]
+        self.offsets = array("I", accumulate(map(len, encoded), initial=0))
+        self.titles = b"".join(encoded)
+        self.by_country = self._postings(self.countries)
+        self.by_person = self._postings(self.people)
+        self._positions = range(len(rows))
+
+    @staticmethod
+    def _postings(codes: array) -> Dict[int, array]:
+        positions = defaultdict(list)
+        for pos, code in enumerate(codes):
+            positions[code].append(pos)
+        return {code: array("i", p) for code, p in positions.items()}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def title(self, pos: int) -> str:
+        return self.titles[self.offsets[pos]:self.offsets[pos + 1]].decode("utf-8")
+
+    def row(self, pos: int) -> Row:
+        return Row(self.ids[pos], self.years[pos], self.title(pos), self.countries[pos], self.people[pos])
+
+    def after(self, key: tuple) -> int:
+        """First position whose sort key is greater than `key`."""
+        return bisect_right(self._positions, key, key=lambda pos: (-self.years[pos], self.title(pos), self.ids[pos]))
+
+    def year_range(self, year: int) -> Tuple[int, int]:
+        by_year = lambda pos: -self.years[pos]
+        return bisect_left(self._positions, -year, key=by_year), bisect_right(self._positions, -year, key=by_year)
+
+    def scan(self, start: int, end: int, country: Optional[int], person: Optional[int], skip: Set[int], limit: int) -> List[Row]:
+        """Up to `limit` rows in [start, end) matching the filters, leaving out ids in `skip`."""
+        postings = self.by_person.get(person) if person is not None else self.by_country.get(country) if country is not None else None
+        if postings is None and (person is not None or country is not None):
+            return []
+        if postings is None:
+            candidates = range(start, end)
+        else:
+            candidates = (postings[k] for k in range(bisect_left(postings, start), bisect_left(postings, end)))
+        out = []
+        for pos in candidates:
+            if country is not None and self.countries[pos] != country: continue
+            if skip and self.ids[pos] in skip: continue
+            out.append(self.row(pos))
+            if len(out) == limit: break
+        return out
+
+    def nbytes(self) -> int:
+        arrays = [self.ids, self.years, self.countries, self.people, self.offsets,
+                  *self.by_country.values(), *self.by_person.values()]
+        return (sum(a.buffer_info()[1] * a.itemsize for a in arrays) + len(self.titles)
+                + sys.getsizeof(self.by_country) + sys.getsizeof(self.by_person))
+
+class EntityState(NamedTuple):
+    columns: Columns
+    overlay: Dict[int, Row]  # rows written since the columns were loaded
+    skip: Set[int]           # base ids that are overlaid or deleted
+
+class State(NamedTuple):
+    entities: Dict[str, EntityState]
+    revision: int
+    versions: Tuple[int, ...]
+    checked_at: float
+
+class Snapshot:
+    def __init__(self):
+        self.state: Optional[State] = None
+        self.names: Dict[str, Dict[int, str]] = {table: {} for table in LOOKUPS}
+        self.codes: Dict[str, Dict[str, int]] = {table: {} for table in LOOKUPS}  # by models.name_key
+        self._lock = threading.Lock()
+
+    def current(self, db: Session) -> State:
+        """The state to read from, refreshed first when it may be stale."""
+        state = self.state
+        if state is None or state.versions != response_cache.cache.versions(VERSIONS) \
+                or time.monotonic() - state.checked_at > SNAPSHOT_MAX_STALENESS:
+            with self._lock:
+                state = self._refresh(db)
+        return state
+
+    def _name(self, table: str, id: int, name: str) -> None:
+        self.names[table][id] = name
+        self.codes[table][models.name_key(name)] = id
+
+    def _load(self, db: Session, entity: str) -> EntityState:
+        model, person_key = ENTITIES[entity]
+        rows = db.connection().execute(
+            select(model.id, model.year, model.title, model.country_id, getattr(model, f"{person_key}_id"))
+            .order_by(model.year.desc(), model.title, model.id)
+        ).all()
+        # Re-sorted in Python so the order never depends on the database collation;
+        # it is a single pass when the database already returned it in this order.
+        rows.sort(key=sort_key)
+        return EntityState(Columns(rows), {}, set())
+
+    def _load_names(self, db: Session) -> None:
+        # Called after columns are (re)loaded: every lookup row a loaded title points to
+        # was committed before this read, and lookup rows are never deleted.
+        for table, model in LOOKUPS.items():
+            known = max(self.names[table], default=0)
+            for id, name in db.execute(select(model.id, model.name).where(model.id > known)):
+                self._name(table, id, name)
+
+    def _refresh(self, db: Session) -> State:
+        versions = response_cache.cache.versions(VERSIONS)
+        state = self.state
+        if state is not None and state.versions == versions and time.monotonic() - state.checked_at <= SNAPSHOT_MAX_STALENESS:
+            return state  # another thread refreshed while this one waited for the lock
+        if state is None:
+            revision = db.execute(select(changes.counter.c.value)).scalar() or 0
+            entities = {entity: self._load(db, entity) for entity in ENTITIES}
+            self._load_names(db)
+        else:
+            revision, entities = self._apply(db, state)
+        self.state = State(entities, revision, versions, time.monotonic())
+        return self.state
+
+    def _apply(self, db: Session, state: State) -> Tuple[int, Dict[str, EntityState]]:
+        """Fold the /changes feed since state.revision into copies of the overlays."""
+        overlays = {entity: dict(s.overlay) for entity, s in state.entities.items()}
+        deleted: Dict[str, Set[int]] = {entity: set() for entity in ENTITIES}
+        revision = state.revision
+        while True:
+            feed = changes.read(db, revision, changes.MAX_LIMIT)
+            for c in feed["changes"]:
+                entity = c["entity"]
+                if entity not in ENTITIES:
+                    continue
+                if c["deleted"]:
+                    overlays[entity].pop(c["id"], None)
+                    deleted[entity].add(c["id"])
+                    continue
+                data, person_key = c["data"], ENTITIES[entity][1]
+                person_table = f"{person_key}s"
+                self._name("countries", data["country"]["id"], data["country"]["name"])
+                self._name(person_table, data[person_key]["id"], data[person_key]["name"])
+                overlays[entity][c["id"]] = Row(c["id"], data["year"], data["title"], data["country"]["id"], data[person_key]["id"])
+            revision = feed["next"]
+            if not feed["more"]:
+                break
+        entities = {}
+        for entity, s in state.entities.items():
+            skip = s.skip | overlays[entity].keys() | deleted[entity]
+            if len(skip) > SNAPSHOT_COMPACT_ROWS:
+                # May read rows committed after `revision`, which the feed has not named yet.
+                entities[entity] = self._load(db, entity)
+            else:
+                entities[entity] = EntityState(s.columns, overlays[entity], skip)
+        if any(entities[e].columns is not s.columns for e, s in state.entities.items()):
+            self._load_names(db)
+        return revision, entities
+
+    def page(self, db: Session, entity: str, year: Optional[int], country: Optional[str], person: Optional[str],
+             limit: int, cursor: Optional[str]) -> Tuple[List[Row], Optional[str]]:
+        s = self.current(db).entities[entity]
+        person_table = f"{ENTITIES[entity][1]}s"
+        country_id = self.codes["countries"].get(models.name_key(country), -1) if country else None
+        person_id = self.codes[person_table].get(models.name_key(person), -1) if person else None
+        cols = s.columns
+        start, end = 0, len(cols)
+        after = None
+        if cursor:
+            cursor_year, title, id = decode_cursor(cursor)
+            after = (-cursor_year, title, id)
+            start = cols.after(after)
+        if year:
+            lo, hi = cols.year_range(year)
+            start, end = max(start, lo), hi
+        base = cols.scan(start, end, country_id, person_id, s.skip, limit + 1) if start < end else []
+        extra = sorted((r for r in s.overlay.values()
+                        if (not year or r.year == year) and (country_id is None or r.country_id == country_id)
+                        and (person_id is None or r.person_id == person_id) and (after is None or sort_key(r) > after)),
+                       key=sort_key)
+        rows = list(islice(heapq.merge(base, extra, key=sort_key), limit + 1))
+        if len(rows) <= limit:
+            return rows, None
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1].year, rows[-1].title, rows[-1].id)
+
+    def stats(self) -> dict:
+        state = self.state
+        if state is None:
+            return {"loaded": False}
+        out = {"loaded": True, "revision": state.revision, "entities": {}}
+        for entity, s in state.entities.items():
+            rows, size = len(s.columns), s.columns.nbytes()
+            out["entities"][entity] = {"rows": rows, "bytes": size, "bytes_per_row": round(size / rows, 1) if rows else 0.0,
+                                       "overlay": len(s.overlay), "skipped": len(s.skip)}
+        return out
+
+snapshot = Snapshot()
+
+class _Out(NamedTuple):
+    # The attributes fastread's row-to-dict functions read.
+    id: int
+    title: str
+    year: int
+    person_id: int
+    person_name: str
+    country_id: int
+    country_name: str
+
+def _dicts(entity: str, rows: List[Row], to_dict) -> List[dict]:
+    names = snapshot.names
+    person = names[f"{ENTITIES[entity][1]}s"]
+    return [to_dict(_Out(r.id, r.title, r.year, r.person_id, person[r.person_id], r.country_id, names["countries"][r.country_id]))
+            for r in rows]
+
+def list_movies(db: Session, year: Optional[int]=None, country: Optional[str]=None, director: Optional[str]=None, limit: int=DEFAULT_PAGE_SIZE, cursor: Optional[str]=None, fields: fastread.Fields=None) -> Page:
+    rows, next_cursor = snapshot.page(db, "movies", year, country, director, limit, cursor)
+    return Page(_dicts("movies", rows, fastread._movie if fields is None else fastread._projected(fields, "director")), next_cursor)
+
+def list_series(db: Session, year: Optional[int]=None, country: Optional[str]=None, director: Optional[str]=None, limit: int=DEFAULT_PAGE_SIZE, cursor: Optional[str]=None, depth: SeriesDepth="episodes", fields: fastread.Fields=None) -> Page:
+    rows, next_cursor = snapshot.page(db, "series", year, country, director, limit, cursor)
+    items = _dicts("series", rows, fastread._series if fields is None else fastread._projected(fields, "director"))
+    if fields is None or "seasons" in fields:
+        fastread.attach_seasons(db, items, depth, [r.id for r in rows])
+    return Page(items, next_cursor)
+
+def list_games(db: Session, year: Optional[int]=None, country: Optional[str]=None, publisher: Optional[str]=None, limit: int=DEFAULT_PAGE_SIZE, cursor: Optional[str]=None, fields: fastread.Fields=None) -> Page:
+    rows, next_cursor = snapshot.page(db, "games", year, country, publisher, limit, cursor)
+    return Page(_dicts("games", rows, fastread._game if fields is None else fastread._projected(fields, "publisher")), next_cursor)
@@ -0,0 +1,154 @@
+"""Catalog statistics served by GET /stats from the stat_counts summary table.
+
+Each write collects its changes in a Counter keyed by (entity, dimension, key)
+and applies them with apply() before it commits, so the summary never drifts
+from the catalog and /stats reads a bounded number of summary rows instead of
+grouping the catalog tables. Rebuild from scratch with `python -m app.stats`.
+
+Rows kept per entity ("movies", "series", "games"):
+  ("total", 0), ("year", year), ("country", country_id) and
+  ("director" | "publisher", person id).
+Season and episode totals live under entity "seasons" / "episodes", both
+catalog-wide ("total", 0) and per series ("series", series_id).
+"""
+from collections import Counter
+from typing import Dict, List, Optional
+from sqlalchemy import delete, func, insert, literal, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from . import changes, models
+
+PERSON = {"movies": "director", "series": "director", "games": "publisher"}
+MODELS = {"movies": models.Movie, "series": models.Series, "games": models.Game}
+LOOKUPS = {"country": models.Country, "director": models.Director, "publisher": models.Publisher}
+DEFAULT_TOP = 50
+MAX_TOP = 1000
+
+table = models.StatCount.__table__
+
+def snapshot(entity: str, obj) -> dict:
+    """The columns of a movie/series/game that its statistics depend on."""
+    person = f"{PERSON[entity]}_id"
+    return {"year": obj.year, "country_id": obj.country_id, person: getattr(obj, person)}
+
+def count_title(deltas: Counter, entity: str, row: dict, n: int=1) -> Counter:
+    """Add n for a title row (a snapshot() or an insert row); n=-1 removes it."""
+    person = PERSON[entity]
+    for dimension, key in (("total", 0), ("year", row["year"]), ("country", row["country_id"]), (person, row[f"{person}_id"])):
+        deltas[(entity, dimension, key)] += n
+    return deltas
+
+def count_change(entity: str, before: dict, after: dict) -> Counter:
+    """Deltas for an updated title; all zero (and skipped by apply) when no counted column changed."""
+    return count_title(count_title(Counter(), entity, before, -1), entity, after)
+
+def count_seasons(deltas: Counter, series_id: int, seasons: int, episodes: int) -> Counter:
+    for entity, n in (("seasons", seasons), ("episodes", episodes)):
+        deltas[(entity, "total", 0)] += n
+        deltas[(entity, "series", series_id)] += n
+    return deltas
+
+def _upsert(db: Session):
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        stmt = sqlite_insert(table)
+    elif dialect == "postgresql":
+        stmt = pg_insert(table)
+    else:
+        return None
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.entity, table.c.dimension, table.c.key],
+        set_={"count": table.c.count + stmt.excluded["count"]},
+    )
+
+def apply(db: Session, deltas: Counter) -> None:
+    """Add `deltas` to stat_counts inside the caller's transaction, as one executemany."""
+    rows = [{"entity": e, "dimension": d, "key": k, "count": n} for (e, d, k), n in deltas.items() if n]
+    if not rows:
+        return
+    stmt = _upsert(db)
+    if stmt is not None:
+        db.execute(stmt, rows)
+        return
+    for row in rows:
+        where = (table.c.entity == row["entity"]) & (table.c.dimension == row["dimension"]) & (table.c.key == row["key"])
+        if not db.execute(update(table).where(where).values(count=table.c.count + row["count"])).rowcount:
+            db.execute(insert(table).values(**row))
+
+def drop_series(db: Session, deltas: Counter, series_id: int) -> Counter:
+    """Remove a deleted series' season/episode totals from the catalog-wide ones."""
+    rows = db.execute(select(table.c.entity, table.c.count).where(
+        table.c.dimension == "series", table.c.key == series_id)).all()
+    for entity, n in rows:
+        deltas[(entity, "total", 0)] -= n
+    db.execute(delete(table).where(table.c.dimension == "series", table.c.key == series_id))
+    return deltas
+
+def rebuild(db: Session) -> int:
+    """Recompute stat_counts from the catalog tables; returns the number of summary rows."""
+    db.execute(delete(table))
+    cols = ["entity", "dimension", "key", "count"]
+    def grouped(entity: str, dimension: str, key, source):
+        return insert(table).from_select(cols, select(literal(entity), literal(dimension), key, func.count())
+                                         .select_from(source).group_by(key))
+    for entity, model in MODELS.items():
+        db.execute(insert(table).from_select(cols, select(literal(entity), literal("total"), literal(0), func.count()).select_from(model)))
+        db.execute(grouped(entity, "year", model.year, model))
+        db.execute(grouped(entity, "country", model.country_id, model))
+        person = PERSON[entity]
+        db.execute(grouped(entity, person, getattr(model, f"{person}_id"), model))
+    db.execute(insert(table).from_select(cols, select(literal("seasons"), literal("total"), literal(0), func.count()).select_from(models.Season)))
+    db.execute(insert(table).from_select(cols, select(literal("episodes"), literal("total"), literal(0), func.count()).select_from(models.Episode)))
+    db.execute(grouped("seasons", "series", models.Season.series_id, models.Season))
+    db.execute(grouped("episodes", "series", models.Season.series_id, models.Season.__table__.join(models.Episode.__table__)))
+    changes.allocate(db)  # moves the revision, so response caches in every process drop their /stats pages
+    db.commit()
+    return db.execute(select(func.count()).select_from(table)).scalar()
+
+def ensure(db: Session) -> None:
+    """Build the summary on first start, e.g. for a database created before stat_counts existed."""
+    if db.execute(select(table.c.key).limit(1)).first() is None:
+        rebuild(db)
+
+def _top(db: Session, entity: str, dimension: str, top: int) -> List[dict]:
+    ref = LOOKUPS[dimension]
+    rows = db.execute(
+        select(ref.id, ref.name, table.c.count).join(ref, ref.id == table.c.key)
+        .where(table.c.entity == entity, table.c.dimension == dimension, table.c.count > 0)
+        .order_by(table.c.count.desc(), ref.id).limit(top)
+    )
+    return [{"id": id, "name": name, "count": count} for id, name, count in rows]
+
+def read(db: Session, top: int=DEFAULT_TOP) -> dict:
+    """StatsOut-shaped dict: totals, counts per year, and the `top` countries/directors/publishers."""
+    totals = dict(db.execute(select(table.c.entity, table.c.count).where(table.c.dimension == "total")).all())
+    by_year: Dict[str, List[dict]] = {entity: [] for entity in MODELS}
+    for entity, year, count in db.execute(
+        select(table.c.entity, table.c.key, table.c.count)
+        .where(table.c.dimension == "year", table.c.entity.in_(list(MODELS)), table.c.count > 0)
+        .order_by(table.c.entity, table.c.key.desc())
+    ):
+        by_year[entity].append({"year": year, "count": count})
+    out = {}
+    for entity in MODELS:
+        person = PERSON[entity]
+        out[entity] = {"total": totals.get(entity, 0), "by_year": by_year[entity],
+                       "by_country": _top(db, entity, "country", top), f"by_{person}": _top(db, entity, person, top)}
+    out["series"]["seasons"] = totals.get("seasons", 0)
+    out["series"]["episodes"] = totals.get("episodes", 0)
+    return out
+
+def read_series(db: Session, series_id: int) -> Optional[dict]:
+    if db.execute(select(models.Series.id).where(models.Series.id == series_id)).first() is None:
+        return None
+    counts = dict(db.execute(select(table.c.entity, table.c.count).where(
+        table.c.dimension == "series", table.c.key == series_id)).all())
+    return {"series_id": series_id, "seasons": counts.get("seasons", 0), "episodes": counts.get("episodes", 0)}
+
+if __name__ == "__main__":
+    from . import bootstrap
+    from .database import SessionLocal
+    bootstrap.init_db()  # schema and upgrades, as on app startup
+    with SessionLocal() as db:
+        print(f"stat_counts rebuilt: {rebuild(db)} rows")
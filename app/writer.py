@@ -0,0 +1,120 @@
+"""Group commit for write routes (DB_WRITER=group), aimed at SQLite deployments.
+
+Write routes pass a function of a Session to run(). In the default "direct" mode
+it is called with the request's own session, exactly as before. In "group" mode
+one writer thread takes every call that queued up while it was busy, plus those
+arriving within DB_WRITER_WINDOW_MS (default 0), at most DB_WRITER_MAX_BATCH.
+It runs each in its own SAVEPOINT of a single transaction and commits once:
+concurrent writers no longer queue on the SQLite lock, and the whole batch
+shares one fsync. A call that raises only rolls back its savepoint;
+its caller gets the exception (an IntegrityError, an HTTPException...) and the
+rest of the batch still commits.
+"""
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from contextvars import Context, copy_context
+from typing import Callable, List, NamedTuple, Tuple, TypeVar
+from sqlalchemy.orm import Session
+from . import lookup_cache, metrics
+from .database import IS_SQLITE, engine
+
+WRITER_MODE = os.getenv("DB_WRITER", "direct")
+WRITER_WINDOW_MS = float(os.getenv("DB_WRITER_WINDOW_MS", "0"))
+WRITER_MAX_BATCH = int(os.getenv("DB_WRITER_MAX_BATCH", "64"))
+
+if WRITER_MODE not in ("direct", "group"):
+    raise ValueError(f"Unknown DB_WRITER {WRITER_MODE!r}, expected 'direct' or 'group'")
+
+T = TypeVar("T")
+
+class _Job(NamedTuple):
+    fn: Callable[[Session], object]
+    context: Context  # the caller's, so its queries still count towards its Server-Timing
+    future: Future
+
+class GroupWriter:
+    """Single thread that runs queued write functions in batches, one commit per batch."""
+
+    def __init__(self, engine, window: float, max_batch: int):
+        self.engine = engine
+        self.window = window
+        self.max_batch = max_batch
+        self._queue: "queue.SimpleQueue[_Job]" = queue.SimpleQueue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def submit(self, fn: Callable[[Session], T]) -> "Future[T]":
+        job = _Job(fn, copy_context(), Future())
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._loop, name="db-writer", daemon=True)
+                    self._thread.start()
+        self._queue.put(job)
+        return job.future
+
+    def run(self, fn: Callable[[Session], T]) -> T:
+        return self.submit(fn).result()
+
+    def _loop(self) -> None:
+        while True:
+            self._commit(self._collect())
+
+    def _collect(self) -> List[_Job]:
+        """Block for one job, then take whatever else arrives within the window."""
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                # Past the deadline, still drain jobs that queued up during the last commit.
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _commit(self, batch: List[_Job]) -> None:
+        metrics.WRITE_BATCH.observe(len(batch))
+        outcomes: List[Tuple[bool, object]] = []
+        lookups: list = []  # lookup ids inserted by the batch, published only once it commits
+        try:
+            with self.engine.connect() as conn:
+                trans = conn.begin()
+                if IS_SQLITE:
+                    # pysqlite only sends BEGIN before the first DML, and RELEASE of a SAVEPOINT
+                    # opened outside a transaction commits it; take the write lock up front instead.
+                    conn.exec_driver_sql("BEGIN IMMEDIATE")
+                for job in batch:
+                    outcomes.append(self._run(conn, job, lookups))
+                trans.commit()
+        except Exception as exc:
+            for job in batch:
+                job.future.set_exception(exc)
+            return
+        lookup_cache.publish(lookups)
+        for job, (ok, value) in zip(batch, outcomes):
+            if ok: job.future.set_result(value)
+            else: job.future.set_exception(value)
+
+    def _run(self, conn, job: _Job, lookups: list) -> Tuple[bool, object]:
+        # db.commit() inside the crud functions releases this savepoint; db.rollback() undoes only it.
+        db = Session(bind=conn, join_transaction_mode="create_savepoint", autoflush=False)
+        lookup_cache.defer(db, lookups)
+        try:
+            return True, job.context.run(job.fn, db)
+        except Exception as exc:
+            db.rollback()
+            return False, exc
+        finally:
+            db.close()
+
+writer = GroupWriter(engine, WRITER_WINDOW_MS / 1000, WRITER_MAX_BATCH)
+
+def run(db: Session, fn: Callable[[Session], T]) -> T:
+    """Run a write with the request's session `db`, or on the group writer when DB_WRITER=group."""
+    if WRITER_MODE == "group":
+        return writer.run(fn)
+    return fn(db)
@@ -0,0 +1,84 @@
+"""Compare read latency of DB_MODE=sync and DB_MODE=async under many concurrent clients.
+
+    python -m bench.concurrency --clients 500 --duration 20
+
+Each mode gets its own uvicorn process on a copy of the same seeded SQLite file,
+with the response cache disabled so every request reaches the database, and
+admission control off so requests are queued rather than shed with 503.
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+import httpx
+
+from .common import start_server, summarize
+
+READ_PATHS = ["/movies", "/series", "/games", "/countries", "/movies?year=2010", "/series?depth=series"]
+
+async def hammer(base_url: str, paths: List[str], clients: int, duration: float) -> Dict[str, float]:
+    latencies: List[float] = []
+    errors = 0
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        stop = time.perf_counter() + duration
+
+        async def worker(i: int) -> None:
+            nonlocal errors
+            n = i
+            while time.perf_counter() < stop:
+                path = paths[n % len(paths)]; n += 1
+                t0 = time.perf_counter()
+                try:
+                    r = await client.get(path)
+                    if r.status_code >= 400:
+                        errors += 1  # a 503 shed or 4xx answers fast; keep it out of the latencies
+                        continue
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                latencies.append(time.perf_counter() - t0)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(i) for i in range(clients)))
+        return summarize(latencies, errors, time.perf_counter() - started)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=500)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--database", help="seeded SQLite file to copy (default: run app.seed on a fresh file)")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="catalogo-bench-")
+    source = os.path.join(workdir, "seed.db")
+    if args.database:
+        shutil.copy(args.database, source)
+    else:
+        subprocess.run([sys.executable, "-m", "app.seed"], check=True,
+                       env={**os.environ, "DATABASE_URL": f"sqlite:///{source}"})
+
+    report = {"clients": args.clients, "duration_s": args.duration, "modes": {}}
+    for offset, mode in enumerate(("sync", "async")):
+        db_file = os.path.join(workdir, f"{mode}.db")
+        shutil.copy(source, db_file)
+        port = args.port + offset
+        proc = start_server(port, {"DATABASE_URL": f"sqlite:///{db_file}", "DB_MODE": mode,
+                                   "RESPONSE_CACHE_MAX_ENTRIES": "0", "ADMISSION_CONTROL": "0"})
+        try:
+            report["modes"][mode] = asyncio.run(hammer(f"http://127.0.0.1:{port}", READ_PATHS, args.clients, args.duration))
+        finally:
+            proc.terminate(); proc.wait()
+    shutil.rmtree(workdir, ignore_errors=True)
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Fill DATABASE_URL with a synthetic catalog shaped like app/seed.py, at any size.
+
+    DATABASE_URL=sqlite:///./bench.db python -m bench.generate --movies 100000 --series 5000 --games 20000
+
+Countries, directors and publishers follow a Zipf-like distribution (a few very
+common, a long tail of rare ones); series get a skewed number of seasons with
+6-24 episodes each. The same --seed always produces the same catalog.
+"""
+import argparse
+import itertools
+import random
+import time
+from typing import Dict, Iterator, List, Sequence
+
+from sqlalchemy import insert, select
+
+from app import bootstrap, changes, models, stats
+from app.database import SessionLocal, engine
+
+COUNTRIES = [
+    "United States", "United Kingdom", "Japan", "France", "South Korea", "Germany", "India", "Canada",
+    "Spain", "Italy", "Mexico", "Brazil", "Poland", "Sweden", "Australia", "China", "Argentina",
+    "Colombia", "Denmark", "Norway", "Ireland", "New Zealand", "Chile", "Finland", "Belgium",
+    "Netherlands", "Turkey", "Iran", "Nigeria", "Egypt",
+]
+ADJECTIVES = ["Silent", "Last", "Hidden", "Broken", "Golden", "Dark", "Lost", "Crimson", "Eternal", "Wild",
+              "Frozen", "Burning", "Secret", "Distant", "Iron", "Hollow", "Bright", "Savage", "Quiet", "Final"]
+NOUNS = ["River", "Empire", "Garden", "Signal", "Horizon", "Kingdom", "Machine", "Harbor", "Shadow", "Crown",
+         "Voyage", "Frontier", "Mirror", "Storm", "Legacy", "Circuit", "Island", "Citadel", "Orbit", "Witness"]
+FIRST = ["Ana", "Kenji", "Lucia", "Omar", "Greta", "Ravi", "Sofia", "Tomasz", "Mei", "Jonas", "Ines", "Diego"]
+LAST = ["Moreno", "Tanaka", "Kowalski", "Haddad", "Lindqvist", "Iyer", "Okafor", "Rossi", "Chen", "Dubois"]
+STUDIOS = ["Interactive", "Games", "Studios", "Entertainment", "Works", "Digital", "Soft"]
+
+BATCH = 5000
+
+def zipf_picker(rng: random.Random, values: Sequence[int], s: float):
+    cum, total = [], 0.0
+    for rank in range(1, len(values) + 1):
+        total += 1 / rank ** s
+        cum.append(total)
+    return lambda: rng.choices(values, cum_weights=cum)[0]
+
+def batches(rows: Iterator[dict], size: int=BATCH) -> Iterator[List[dict]]:
+    while True:
+        chunk = list(itertools.islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+
+def insert_names(model, names: Sequence[str]) -> List[int]:
+    with engine.begin() as conn:
+        existing = dict(conn.execute(select(model.name, model.id)).all())
+        new = [{"name": n} for n in names if n not in existing]
+        if new:
+            conn.execute(insert(model.__table__), new)
+        ids = dict(conn.execute(select(model.name, model.id)).all())
+    return [ids[n] for n in names]
+
+def title(rng: random.Random, i: int) -> str:
+    return f"{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)} {i}"
+
+def release_year(rng: random.Random, low: int) -> int:
+    # Recent years are far more common than old ones.
+    return max(low, 2025 - int(rng.expovariate(1 / 15)))
+
+def generate(movies: int, series: int, games: int, seed: int=42) -> Dict[str, int]:
+    rng = random.Random(seed)
+    bootstrap.init_db()
+    n_directors = max(50, (movies + series) // 20)
+    n_publishers = max(20, games // 50)
+    country = zipf_picker(rng, insert_names(models.Country, COUNTRIES), 1.2)
+    director = zipf_picker(rng, insert_names(models.Director, [
+        f"{FIRST[i % len(FIRST)]} {LAST[(i // len(FIRST)) % len(LAST)]} {i}" for i in range(n_directors)]), 1.1)
+    publisher = zipf_picker(rng, insert_names(models.Publisher, [
+        f"{NOUNS[i % len(NOUNS)]} {STUDIOS[i % len(STUDIOS)]} {i}" for i in range(n_publishers)]), 1.1)
+    counts = {"movies": movies, "series": series, "games": games, "seasons": 0, "episodes": 0}
+
+    movie_rows = ({"title": title(rng, i), "year": release_year(rng, 1888), "country_id": country(),
+                   "director_id": director()} for i in range(movies))
+    for chunk in batches(movie_rows):
+        with engine.begin() as conn:
+            conn.execute(insert(models.Movie.__table__), chunk)
+
+    game_rows = ({"title": title(rng, i), "year": release_year(rng, 1950), "country_id": country(),
+                  "publisher_id": publisher()} for i in range(games))
+    for chunk in batches(game_rows):
+        with engine.begin() as conn:
+            conn.execute(insert(models.Game.__table__), chunk)
+
+    series_rows = ({"title": title(rng, i), "year": release_year(rng, 1950), "country_id": country(),
+                    "director_id": director()} for i in range(series))
+    for chunk in batches(series_rows, 500):
+        with engine.begin() as conn:
+            ids = conn.execute(insert(models.Series.__table__).returning(
+                models.Series.__table__.c.id, sort_by_parameter_order=True), chunk).scalars().all()
+            season_rows, episode_counts = [], []
+            for series_id, row in zip(ids, chunk):
+                for number in range(1, 2 + min(int(rng.expovariate(1 / 2.5)), 29)):
+                    season_rows.append({"series_id": series_id, "number": number,
+                                        "year": min(2100, row["year"] + number - 1)})
+                    episode_counts.append(rng.randint(6, 24))
+            season_ids = conn.execute(insert(models.Season.__table__).returning(
+                models.Season.__table__.c.id, sort_by_parameter_order=True), season_rows).scalars().all()
+            episode_rows = [{"season_id": season_id, "number": n, "title": f"Chapter {n}: {rng.choice(NOUNS)}"}
+                            for season_id, count in zip(season_ids, episode_counts) for n in range(1, count + 1)]
+            for part in batches(iter(episode_rows)):
+                conn.execute(insert(models.Episode.__table__), part)
+            counts["seasons"] += len(season_rows)
+            counts["episodes"] += len(episode_rows)
+    # The rows above bypass crud, so the /stats summary is recomputed in one pass
+    # and the rows get their /changes revisions afterwards.
+    with SessionLocal() as db:
+        stats.rebuild(db)
+        changes.backfill(db)
+    return counts
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--movies", type=int, default=10000)
+    parser.add_argument("--series", type=int, default=1000)
+    parser.add_argument("--games", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    started = time.perf_counter()
+    counts = generate(args.movies, args.series, args.games, args.seed)
+    print(f"Generated {counts} in {time.perf_counter() - started:.1f}s")
+
+if __name__ == "__main__":
+    main()
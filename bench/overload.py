@@ -0,0 +1,87 @@
+"""Traffic spike with and without admission control (ADMISSION_CONTROL=0/1).
+
+    python -m bench.overload --database ./bench.db --clients 200 --duration 15
+
+--clients concurrent clients request uncached filtered /movies pages
+(RESPONSE_CACHE_MAX_ENTRIES=0) while a probe calls /health every 100 ms, like
+the docker-compose health check. Reports served/shed requests, latency of
+served requests, and /health latency for each mode.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import time
+from typing import Dict, List
+
+import httpx
+
+from .common import percentile, start_server, summarize
+
+async def spike(base_url: str, clients: int, duration: float, paths: List[str]) -> Dict[str, dict]:
+    latencies: List[float] = []
+    health: List[float] = []
+    errors = shed = 0
+    counter = itertools.count()
+    limits = httpx.Limits(max_connections=clients + 1, max_keepalive_connections=clients + 1)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        stop = time.perf_counter() + duration
+
+        async def worker() -> None:
+            nonlocal errors, shed
+            while time.perf_counter() < stop:
+                t0 = time.perf_counter()
+                try:
+                    r = await client.get(paths[next(counter) % len(paths)])
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                if r.status_code == 503:
+                    shed += 1
+                    await asyncio.sleep(float(r.headers.get("Retry-After", "1")))
+                elif r.status_code >= 400:
+                    errors += 1
+                else:
+                    latencies.append(time.perf_counter() - t0)
+
+        async def probe() -> None:
+            while time.perf_counter() < stop:
+                t0 = time.perf_counter()
+                try:
+                    await client.get("/health", timeout=3)
+                    health.append(time.perf_counter() - t0)
+                except httpx.HTTPError:
+                    health.append(3.0)  # counted as a failed check
+                await asyncio.sleep(0.1)
+
+        started = time.perf_counter()
+        await asyncio.gather(probe(), *(worker() for _ in range(clients)))
+        elapsed = time.perf_counter() - started
+    return {"served": summarize(latencies, errors, elapsed), "shed_503": shed,
+            "health": {"checks": len(health), "p50_ms": round(percentile(health, 50) * 1000, 2),
+                       "p99_ms": round(percentile(health, 99) * 1000, 2), "max_ms": round(max(health, default=0) * 1000, 2)}}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database", required=True, help="SQLite file filled by bench.generate")
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=15.0)
+    parser.add_argument("--port", type=int, default=8400)
+    parser.add_argument("--profile", default="production")
+    args = parser.parse_args()
+
+    paths = [f"/movies?year={year}&limit=100" for year in range(1990, 2026)]
+    report = {"clients": args.clients, "duration_s": args.duration, "modes": {}}
+    for offset, enabled in enumerate(("0", "1")):
+        port = args.port + offset
+        proc = start_server(port, {"DATABASE_URL": f"sqlite:///{args.database}", "DB_PROFILE": args.profile,
+                                   "RESPONSE_CACHE_MAX_ENTRIES": "0", "ADMISSION_CONTROL": enabled}, timeout=120)
+        try:
+            report["modes"]["admission" if enabled == "1" else "unlimited"] = asyncio.run(
+                spike(f"http://127.0.0.1:{port}", args.clients, args.duration, paths))
+        finally:
+            proc.terminate(); proc.wait()
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
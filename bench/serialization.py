@@ -0,0 +1,69 @@
+"""Serialization share of GET time: ORM + Pydantic validation vs fastread + orjson.
+
+    DATABASE_URL=sqlite:///./bench.db python -m bench.serialization --iterations 50
+
+Runs in-process against DATABASE_URL (use bench.generate first) and splits each
+list route into query time and serialization time, for both read paths.
+"""
+import argparse
+import json
+import time
+from typing import Callable, Dict, List
+
+import orjson
+
+from app import crud, fastread, schemas
+from app.database import SessionLocal
+
+def timed(fn: Callable, iterations: int) -> List[float]:
+    samples = []
+    for _ in range(iterations):
+        t0 = time.perf_counter(); fn(); samples.append(time.perf_counter() - t0)
+    return samples
+
+def measure(query: Callable, serialize: Callable, iterations: int) -> Dict[str, float]:
+    db = SessionLocal()
+    try:
+        query_s, serialize_s = [], []
+        for _ in range(iterations):
+            db.expunge_all()
+            t0 = time.perf_counter(); content = query(db)
+            t1 = time.perf_counter(); serialize(content)
+            t2 = time.perf_counter()
+            query_s.append(t1 - t0); serialize_s.append(t2 - t1)
+    finally:
+        db.close()
+    q, s = sum(query_s) / iterations * 1000, sum(serialize_s) / iterations * 1000
+    return {"query_ms": round(q, 3), "serialize_ms": round(s, 3), "total_ms": round(q + s, 3),
+            "serialize_share": round(s / (q + s), 3) if q + s else 0.0}
+
+def validated(adapter):
+    return lambda content: adapter.dump_json(adapter.validate_python(content, from_attributes=True))
+
+ROUTES = {
+    "GET /movies?limit=500": (
+        lambda db: crud.list_movies(db, limit=500).items, validated(schemas.MOVIE_LIST),
+        lambda db: fastread.list_movies(db, limit=500).items),
+    "GET /series?limit=100": (
+        lambda db: crud.list_series(db, limit=100).items, validated(schemas.SERIES_LIST),
+        lambda db: fastread.list_series(db, limit=100).items),
+    "GET /games?limit=500": (
+        lambda db: crud.list_games(db, limit=500).items, validated(schemas.GAME_LIST),
+        lambda db: fastread.list_games(db, limit=500).items),
+    "GET /directors": (crud.list_directors, validated(schemas.DIRECTOR_LIST), fastread.list_directors),
+}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=50)
+    args = parser.parse_args()
+    report = {}
+    for route, (orm_query, orm_serialize, fast_query) in ROUTES.items():
+        report[route] = {
+            "before": measure(orm_query, orm_serialize, args.iterations),
+            "after": measure(fast_query, orjson.dumps, args.iterations),
+        }
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Measure startup-to-healthy time of a new replica: empty volume, seeding vs snapshot restore.
+
+    python -m bench.startup --movies 200000 --series 5000 --games 50000
+
+Builds a catalog with bench.generate (the fastest way to seed rows, well below
+replaying them through the API) and a snapshot of it with `app.bootstrap
+snapshot`. Then, on a fresh data directory each time, it times from process
+spawn to the first 200 on /health:
+  - "empty": no data, schema creation only;
+  - "seed_then_start": bench.generate into the volume, then start the API;
+  - "restore": start the API with DB_SEED_SNAPSHOT pointing at the snapshot.
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+import httpx
+
+from .common import start_server
+
+def run(args: List[str], env: Dict[str, str]) -> float:
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-m", *args], env={**os.environ, **env}, check=True, stdout=subprocess.DEVNULL)
+    return time.perf_counter() - started
+
+def healthy_after(port: int, env: Dict[str, str]) -> Dict[str, float]:
+    started = time.perf_counter()
+    proc = start_server(port, env, timeout=600)
+    try:
+        elapsed = time.perf_counter() - started
+        totals = httpx.get(f"http://127.0.0.1:{port}/stats", params={"top": 1}, timeout=60).json()
+        return {"seconds": round(elapsed, 3), "movies": totals["movies"]["total"]}
+    finally:
+        proc.terminate(); proc.wait()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--movies", type=int, default=200000)
+    parser.add_argument("--series", type=int, default=5000)
+    parser.add_argument("--games", type=int, default=50000)
+    parser.add_argument("--port", type=int, default=8300)
+    parser.add_argument("--profile", default="production", help="DB_PROFILE of the started servers")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="catalogo-startup-")
+    sizes = ["--movies", str(args.movies), "--series", str(args.series), "--games", str(args.games)]
+    source = f"sqlite:///{workdir}/source.db"
+    snapshot = os.path.join(workdir, "catalog.db")
+    report = {"movies": args.movies, "series": args.series, "games": args.games, "profile": args.profile}
+    report["generate_s"] = round(run(["bench.generate", *sizes], {"DATABASE_URL": source}), 3)
+    report["snapshot_s"] = round(run(["app.bootstrap", "snapshot", snapshot], {"DATABASE_URL": source}), 3)
+    report["snapshot_mb"] = round(os.path.getsize(snapshot) / 1e6, 1)
+
+    def volume(name: str) -> Dict[str, str]:
+        os.makedirs(os.path.join(workdir, name))
+        return {"DATABASE_URL": f"sqlite:///{workdir}/{name}/app.db", "DB_PROFILE": args.profile}
+
+    modes = {}
+    modes["empty"] = healthy_after(args.port, volume("empty"))
+    env = volume("seeded")
+    seeding = run(["bench.generate", *sizes], env)
+    started = healthy_after(args.port + 1, env)
+    modes["seed_then_start"] = {**started, "seconds": round(seeding + started["seconds"], 3)}
+    modes["restore"] = healthy_after(args.port + 2, {**volume("restored"), "DB_SEED_SNAPSHOT": snapshot})
+    report["modes"] = modes
+    shutil.rmtree(workdir, ignore_errors=True)
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+"""Benchmark every route of app/main.py against a generated catalog.
+
+    python -m bench.suite --movies 100000 --series 5000 --games 20000 --output bench-1.2.json
+    python -m bench.suite --database ./bench.db --compare bench-1.1.json
+
+Starts uvicorn on a scratch copy of the database, runs each route for --requests
+requests with --concurrency clients, and writes throughput and p50/p95/p99 per
+route as JSON. Reads run before writes, and deletes run last, on rows the suite created itself.
+The response cache is disabled unless --cache is given, and admission control
+unless --admission is given.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Awaitable, Callable, Dict, List, NamedTuple, Optional
+
+import httpx
+
+from .common import start_server, summarize
+
+class State:
+    """Ids and names sampled from the database, plus rows created during the run."""
+    def __init__(self, database_url: str, rng: random.Random):
+        from sqlalchemy import create_engine, text
+        eng = create_engine(database_url)
+        with eng.connect() as conn:
+            col = lambda sql: [r[0] for r in conn.execute(text(sql))]
+            self.movie_ids = col("SELECT id FROM movies ORDER BY random() LIMIT 1000")
+            self.series_ids = col("SELECT id FROM series ORDER BY random() LIMIT 1000")
+            self.game_ids = col("SELECT id FROM games ORDER BY random() LIMIT 1000")
+            self.countries = col("SELECT name FROM countries")
+            self.directors = col("SELECT name FROM directors ORDER BY random() LIMIT 200")
+            self.publishers = col("SELECT name FROM publishers ORDER BY random() LIMIT 200")
+            self.years = col("SELECT DISTINCT year FROM movies") or [2000]
+        eng.dispose()
+        self.rng = rng
+        self.created: Dict[str, List[int]] = {"movies": [], "series": [], "games": []}
+        self.tag = str(int(time.time()))
+
+    def pick(self, values: List):
+        return self.rng.choice(values)
+
+Run = Callable[[httpx.AsyncClient, int, State], Awaitable[httpx.Response]]
+
+class Scenario(NamedTuple):
+    route: str
+    run: Run
+    requests: Optional[int] = None  # overrides --requests for expensive routes
+
+def get(path_fn: Callable[[int, State], str]) -> Run:
+    return lambda client, n, st: client.get(path_fn(n, st))
+
+def movie_body(n: int, st: State) -> dict:
+    return {"title": f"Bench Movie {st.tag}-{n}", "year": st.pick(st.years),
+            "director_name": st.pick(st.directors), "country_name": st.pick(st.countries)}
+
+def series_body(n: int, st: State) -> dict:
+    return {"title": f"Bench Series {st.tag}-{n}", "year": 2020,
+            "director_name": st.pick(st.directors), "country_name": st.pick(st.countries),
+            "seasons": [{"number": s, "episodes": [{"number": e, "title": f"Episode {e}"} for e in range(1, 9)]}
+                        for s in range(1, 3)]}
+
+def game_body(n: int, st: State) -> dict:
+    return {"title": f"Bench Game {st.tag}-{n}", "year": 2020,
+            "publisher_name": st.pick(st.publishers), "country_name": st.pick(st.countries)}
+
+def create(kind: str, body: Callable[[int, State], dict]) -> Run:
+    async def run(client, n, st):
+        r = await client.post(f"/{kind}", json=body(n, st))
+        if r.status_code == 201:
+            st.created[kind].append(r.json()["id"])
+        return r
+    return run
+
+def bulk(kind: str, body: Callable[[int, State], dict], size: int=100) -> Run:
+    def run(client, n, st):
+        lines = [json.dumps(body(n * size + i + 10**7, st)) for i in range(size)]
+        return client.post(f"/{kind}:bulk", content="\n".join(lines))
+    return run
+
+def delete(kind: str) -> Run:
+    async def run(client, n, st):
+        return await client.delete(f"/{kind}/{st.created[kind].pop()}") if st.created[kind] else await client.get("/health")
+    return run
+
+def list_path(kind: str, person: str, people: str) -> Callable[[int, State], str]:
+    def path(n: int, st: State) -> str:
+        variant = n % 4
+        if variant == 1: return f"/{kind}?year={st.pick(st.years)}"
+        if variant == 2: return f"/{kind}?country={st.pick(st.countries)}"
+        if variant == 3: return f"/{kind}?{person}={st.pick(getattr(st, people))}"
+        return f"/{kind}"
+    return path
+
+SCENARIOS = [
+    Scenario("GET /health", get(lambda n, st: "/health")),
+    Scenario("GET /system/caches", get(lambda n, st: "/system/caches")),
+    Scenario("GET /system/db", get(lambda n, st: "/system/db")),
+    Scenario("GET /metrics", get(lambda n, st: "/metrics")),
+    Scenario("GET /countries", get(lambda n, st: "/countries")),
+    Scenario("GET /directors", get(lambda n, st: "/directors")),
+    Scenario("GET /publishers", get(lambda n, st: "/publishers")),
+    Scenario("GET /movies", get(list_path("movies", "director", "directors"))),
+    Scenario("GET /movies?fields=id,title", get(lambda n, st: "/movies?fields=id,title")),
+    Scenario("GET /movies/{movie_id}", get(lambda n, st: f"/movies/{st.pick(st.movie_ids)}")),
+    Scenario("GET /series", get(list_path("series", "director", "directors"))),
+    Scenario("GET /series/{series_id}", get(lambda n, st: f"/series/{st.pick(st.series_ids)}")),
+    Scenario("GET /series/{series_id}/seasons", get(lambda n, st: f"/series/{st.pick(st.series_ids)}/seasons")),
+    Scenario("GET /series/{series_id}/seasons/{number}/episodes", get(lambda n, st: f"/series/{st.pick(st.series_ids)}/seasons/1/episodes?limit=20")),
+    Scenario("GET /games", get(list_path("games", "publisher", "publishers"))),
+    Scenario("GET /games?fields=id,title", get(lambda n, st: "/games?fields=id,title")),
+    Scenario("GET /games/{game_id}", get(lambda n, st: f"/games/{st.pick(st.game_ids)}")),
+    Scenario("GET /stats", get(lambda n, st: "/stats")),
+    Scenario("GET /stats/series/{series_id}", get(lambda n, st: f"/stats/series/{st.pick(st.series_ids)}")),
+    Scenario("GET /changes", get(lambda n, st: f"/changes?since={n * 997}&limit=100")),
+    Scenario("GET /search", get(lambda n, st: f"/search?q={st.rng.choice(['river', 'empire', 'chapter sig', 'golden'])}")),
+    Scenario("GET /export/{entity}", get(lambda n, st: f"/export/{('movies', 'series', 'games')[n % 3]}"), requests=3),
+    Scenario("POST /movies", create("movies", movie_body)),
+    Scenario("POST /series", create("series", series_body)),
+    Scenario("POST /games", create("games", game_body)),
+    Scenario("POST /movies:bulk", bulk("movies", movie_body), requests=10),
+    Scenario("POST /series:bulk", bulk("series", series_body, 20), requests=10),
+    Scenario("POST /games:bulk", bulk("games", game_body), requests=10),
+    Scenario("PUT /movies/{movie_id}", lambda c, n, st: c.put(f"/movies/{st.pick(st.movie_ids)}", json={"country_name": st.pick(st.countries)})),
+    Scenario("PUT /series/{series_id}", lambda c, n, st: c.put(f"/series/{st.pick(st.series_ids)}", json={"country_name": st.pick(st.countries)})),
+    Scenario("PUT /games/{game_id}", lambda c, n, st: c.put(f"/games/{st.pick(st.game_ids)}", json={"country_name": st.pick(st.countries)})),
+    Scenario("POST /series/{series_id}/seasons", lambda c, n, st: c.post(
+        f"/series/{st.created['series'][n % len(st.created['series'])]}/seasons",
+        json={"number": 100 + n, "episodes": [{"number": 1, "title": "Bench"}]})),
+    Scenario("POST /series/{series_id}/seasons/{number}/episodes", lambda c, n, st: c.post(
+        f"/series/{st.created['series'][n % len(st.created['series'])]}/seasons/1/episodes",
+        json={"number": 100 + n, "title": "Bench"})),
+    Scenario("DELETE /movies/{movie_id}", delete("movies")),
+    Scenario("DELETE /series/{series_id}", delete("series")),
+    Scenario("DELETE /games/{game_id}", delete("games")),
+]
+
+def app_routes() -> List[str]:
+    from fastapi.routing import APIRoute
+    from app.main import app
+    return sorted(f"{m} {r.path}" for r in app.routes if isinstance(r, APIRoute) for m in r.methods)
+
+async def run_scenario(base_url: str, scenario: Scenario, st: State, requests: int, concurrency: int) -> Dict[str, float]:
+    latencies: List[float] = []
+    errors = 0
+    counter = itertools.count()
+    async with httpx.AsyncClient(base_url=base_url, timeout=120) as client:
+        async def worker() -> None:
+            nonlocal errors
+            while (n := next(counter)) < requests:
+                t0 = time.perf_counter()
+                try:
+                    r = await scenario.run(client, n, st)
+                    if r.status_code >= 400:
+                        errors += 1
+                        continue
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                latencies.append(time.perf_counter() - t0)
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return summarize(latencies, errors, time.perf_counter() - started)
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ""
+
+def compare(previous: dict, current: dict) -> None:
+    print(f"{'route':40} {'p50 ms':>16} {'p99 ms':>16} {'rps':>16}")
+    for route, now in current["routes"].items():
+        before = previous.get("routes", {}).get(route)
+        if not before:
+            continue
+        cells = []
+        for key in ("p50_ms", "p99_ms", "throughput_rps"):
+            delta = (now[key] - before[key]) / before[key] * 100 if before[key] else 0.0
+            cells.append(f"{now[key]:>8} {delta:+6.1f}%")
+        print(f"{route:40} {cells[0]:>16} {cells[1]:>16} {cells[2]:>16}")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database", help="existing SQLite file to copy instead of generating one")
+    parser.add_argument("--movies", type=int, default=10000)
+    parser.add_argument("--series", type=int, default=1000)
+    parser.add_argument("--games", type=int, default=5000)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--port", type=int, default=8200)
+    parser.add_argument("--cache", action="store_true", help="keep the response cache enabled")
+    parser.add_argument("--admission", action="store_true", help="keep admission control enabled (bench.overload measures it)")
+    parser.add_argument("--env", action="append", default=[], metavar="KEY=VALUE", help="extra server environment")
+    parser.add_argument("--output", help="write the JSON report here as well as to stdout")
+    parser.add_argument("--compare", help="previous JSON report to diff against")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="catalogo-suite-")
+    db_file = os.path.join(workdir, "suite.db")
+    url = f"sqlite:///{db_file}"
+    if args.database:
+        shutil.copy(args.database, db_file)
+    else:
+        subprocess.run([sys.executable, "-m", "bench.generate", "--movies", str(args.movies),
+                        "--series", str(args.series), "--games", str(args.games)],
+                       check=True, env={**os.environ, "DATABASE_URL": url})
+    os.environ["DATABASE_URL"] = url
+    st = State(url, random.Random(7))
+    env = {"DATABASE_URL": url, **dict(kv.split("=", 1) for kv in args.env)}
+    if not args.cache:
+        env["RESPONSE_CACHE_MAX_ENTRIES"] = "0"
+    if not args.admission:
+        env.setdefault("ADMISSION_CONTROL", "0")
+
+    report = {
+        "meta": {"commit": git_commit(), "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+                 "python": platform.python_version(), "requests": args.requests,
+                 "concurrency": args.concurrency, "cache": args.cache, "admission": args.admission, "env": env,
+                 "dataset": args.database or {"movies": args.movies, "series": args.series, "games": args.games}},
+        "routes": {},
+        "uncovered": sorted(set(app_routes()) - {s.route for s in SCENARIOS}),
+    }
+    proc = start_server(args.port, env)
+    try:
+        for scenario in SCENARIOS:
+            requests = scenario.requests or args.requests
+            report["routes"][scenario.route] = asyncio.run(run_scenario(
+                f"http://127.0.0.1:{args.port}", scenario, st, requests, min(args.concurrency, requests)))
+            print(f"{scenario.route:40} {report['routes'][scenario.route]}", file=sys.stderr)
+    finally:
+        proc.terminate(); proc.wait()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as fh:
+            fh.write(text + "\n")
+    if args.compare:
+        with open(args.compare) as fh:
+            compare(json.load(fh), report)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Compare write throughput and tail latency of DB_WRITER=direct and DB_WRITER=group.
+
+    python -m bench.writes --clients 64 --duration 10 --profile default
+
+Each mode gets its own uvicorn process on a fresh SQLite file, and --clients
+concurrent clients alternate POST /movies and POST /games with unique titles.
+Admission control is off in both, so no write is shed with a 503.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import shutil
+import tempfile
+import time
+from typing import Dict, List
+
+import httpx
+
+from .common import start_server, summarize
+
+def body(n: int) -> tuple:
+    if n % 2:
+        return "/games", {"title": f"Bench game {n}", "year": 2000 + n % 20,
+                          "publisher_name": f"Publisher {n % 50}", "country_name": f"Country {n % 10}"}
+    return "/movies", {"title": f"Bench movie {n}", "year": 2000 + n % 20,
+                       "director_name": f"Director {n % 50}", "country_name": f"Country {n % 10}"}
+
+async def hammer(base_url: str, clients: int, duration: float) -> Dict[str, float]:
+    latencies: List[float] = []
+    errors = 0
+    counter = itertools.count()
+    limits = httpx.Limits(max_connections=clients, max_keepalive_connections=clients)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        stop = time.perf_counter() + duration
+
+        async def worker() -> None:
+            nonlocal errors
+            while time.perf_counter() < stop:
+                path, payload = body(next(counter))
+                t0 = time.perf_counter()
+                try:
+                    r = await client.post(path, json=payload)
+                    if r.status_code >= 400:
+                        errors += 1
+                        continue
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                latencies.append(time.perf_counter() - t0)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(clients)))
+        return summarize(latencies, errors, time.perf_counter() - started)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--port", type=int, default=8200)
+    parser.add_argument("--profile", default="default", help="DB_PROFILE for both servers")
+    parser.add_argument("--window-ms", default=os.getenv("DB_WRITER_WINDOW_MS", "0"))
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix="catalogo-bench-")
+    report = {"clients": args.clients, "duration_s": args.duration, "profile": args.profile,
+              "window_ms": args.window_ms, "modes": {}}
+    for offset, mode in enumerate(("direct", "group")):
+        db_file = os.path.join(workdir, f"{mode}.db")
+        port = args.port + offset
+        proc = start_server(port, {"DATABASE_URL": f"sqlite:///{db_file}", "DB_PROFILE": args.profile,
+                                   "DB_WRITER": mode, "DB_WRITER_WINDOW_MS": args.window_ms,
+                                   "ADMISSION_CONTROL": "0"})
+        try:
+            report["modes"][mode] = asyncio.run(hammer(f"http://127.0.0.1:{port}", args.clients, args.duration))
+        finally:
+            proc.terminate(); proc.wait()
+    shutil.rmtree(workdir, ignore_errors=True)
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+# tests/conftest.py
+
+import os
+import tempfile
+from contextlib import contextmanager
+
+import pytest
+
+# Point the app at a throwaway database before any test imports app.main.
+_tmpdir = tempfile.mkdtemp(prefix="catalogo-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmpdir}/test.db"
+
+@pytest.fixture(scope="session", autouse=True)
+def database():
+    """Create the schema once, as the app's lifespan does (TestClient is used without it)."""
+    from app import bootstrap
+    bootstrap.init_db()
+
+@pytest.fixture
+def query_budget():
+    """`with query_budget(n) as statements:` fails if the block runs more than n SQL statements.
+
+    The response cache is cleared first so the request really reaches the database,
+    and its shared revision is read first and kept for the block, so the block never pays for it.
+    """
+    from sqlalchemy import event
+    from app import response_cache
+    from app.database import engine, read_engine
+
+    @contextmanager
+    def budget(limit: int):
+        statements = []
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+        engines = {engine, read_engine}
+        with engine.connect() as conn:
+            response_cache.cache.sync(conn.execute(response_cache.REVISION).scalar() or 0)
+        staleness = response_cache.RESPONSE_CACHE_MAX_STALENESS
+        response_cache.RESPONSE_CACHE_MAX_STALENESS = float("inf")
+        for e in engines:
+            event.listen(e, "before_cursor_execute", record)
+        response_cache.cache.clear()
+        try:
+            yield statements
+        finally:
+            for e in engines:
+                event.remove(e, "before_cursor_execute", record)
+            response_cache.RESPONSE_CACHE_MAX_STALENESS = staleness
+        assert len(statements) <= limit, f"{len(statements)} queries, budget {limit}:\n" + "\n".join(statements)
+    return budget
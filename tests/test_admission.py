@@ -0,0 +1,51 @@
+# tests/test_admission.py
+
+import asyncio
+from fastapi.testclient import TestClient
+from app import admission
+from app.main import app
+
+client = TestClient(app)
+
+def test_limiter_queues_then_sheds():
+    async def scenario():
+        limiter = admission.Limiter("read", limit=1, queue=1, timeout=0.2)
+        assert await limiter.acquire()
+        queued = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        assert limiter.stats()["queued"] == 1
+        assert not await limiter.acquire()  # queue full: shed at once
+        limiter.release()                   # the slot goes to the waiter
+        assert await queued and limiter.active == 1
+        return limiter
+    limiter = asyncio.run(scenario())
+    assert limiter.rejected == {"queue_full": 1, "timeout": 0} and limiter.admitted == 2
+
+def test_queued_request_times_out():
+    async def scenario():
+        limiter = admission.Limiter("write", limit=1, queue=5, timeout=0.01)
+        await limiter.acquire()
+        assert not await limiter.acquire()
+        limiter.release()
+        return limiter
+    limiter = asyncio.run(scenario())
+    assert limiter.rejected == {"queue_full": 0, "timeout": 1}
+    assert limiter.active == 0 and limiter.stats()["queued"] == 0
+
+def test_full_class_gets_503_but_health_and_writes_pass(monkeypatch):
+    monkeypatch.setitem(admission.limiters, "read", admission.Limiter("read", limit=0, queue=0, timeout=0.1))
+    r = client.get("/movies")
+    assert r.status_code == 503 and r.headers["Retry-After"] == str(admission.ADMISSION_RETRY_AFTER)
+    assert client.get("/health").status_code == 200
+    assert client.post("/movies", json={"title": "Admitted", "year": 2016, "director_name": "Gate Keeper", "country_name": "Gateland"}).status_code == 201
+    stats = client.get("/system/admission").json()
+    assert stats["read"]["rejected"]["queue_full"] == 1 and stats["write"]["in_flight"] == 0
+    exposition = client.get("/metrics").text
+    assert 'admission_rejected_total{class="read",reason="queue_full"}' in exposition
+    assert 'admission_in_flight{class="write"} 0' in exposition
+
+def test_batch_fetch_is_a_read(monkeypatch):
+    monkeypatch.setitem(admission.limiters, "write", admission.Limiter("write", limit=0, queue=0, timeout=0.1))
+    assert client.post("/catalog:batch", json={"movies": [1]}).status_code == 200
+    monkeypatch.setitem(admission.limiters, "read", admission.Limiter("read", limit=0, queue=0, timeout=0.1))
+    assert client.post("/catalog:batch", json={"movies": [1]}).status_code == 503
@@ -1,10 +1,32 @@
 # tests/test_api_endpoints.py
 
+import pytest
 from fastapi.testclient import TestClient
 from app.main import app
 
 client = TestClient(app)
 
+@pytest.fixture(scope="module")
+def catalog():
+    # A few hundred rows per table, so an N+1 shows up as hundreds of queries.
+    from bench.generate import generate
+    return generate(movies=300, series=60, games=300, seed=13)
+
+# Statements allowed per request, whatever the page size: lists and details must
+# load countries/directors/publishers (and seasons/episodes) in a fixed number of queries.
+QUERY_BUDGETS = {
+    "/countries": 1,
+    "/directors": 1,
+    "/publishers": 1,
+    "/movies": 1,
+    "/series": 3,
+    "/series?depth=seasons": 2,
+    "/series?depth=series": 1,
+    "/games": 1,
+    "/search?q=river": 2,
+    "/changes": 7,
+}
+
 def test_get_countries_list():
     response = client.get("/countries")
     assert response.status_code == 200
@@ -61,3 +83,71 @@ def test_health_check():
     json_data = response.json()
     assert "status" in json_data
     assert json_data["status"] == "ok"
+
+def test_series_depth_controls_nesting():
+    payload = {
+        "title": "Depth Show", "year": 2015, "director_name": "Depth Director", "country_name": "Depthland",
+        "seasons": [{"number": 1, "year": 2015, "episodes": [{"number": 1, "title": "One"}, {"number": 2, "title": "Two"}]}]
+    }
+    assert client.post("/series", json=payload).status_code == 201
+    params = {"director": "Depth Director"}
+    full = client.get("/series", params=params).json()[0]
+    assert [e["title"] for e in full["seasons"][0]["episodes"]] == ["One", "Two"]
+    seasons_only = client.get("/series", params={**params, "depth": "seasons"}).json()[0]
+    assert seasons_only["seasons"][0]["number"] == 1
+    assert seasons_only["seasons"][0]["episodes"] == []
+    headers_only = client.get("/series", params={**params, "depth": "series"}).json()[0]
+    assert headers_only["seasons"] == []
+    assert client.get("/series", params={"depth": "bogus"}).status_code == 422
+
+@pytest.mark.parametrize("path,budget", QUERY_BUDGETS.items())
+def test_list_query_budget(catalog, query_budget, path, budget):
+    counts = []
+    for limit in (5, 100):
+        sep = "&" if "?" in path else "?"
+        with query_budget(budget) as statements:
+            r = client.get(f"{path}{sep}limit={limit}")
+            assert r.status_code == 200
+        counts.append(len(statements))
+    assert counts[0] == counts[1], f"query count grows with page size: {counts}"
+
+@pytest.mark.parametrize("entity,budget", [("movies", 1), ("series", 3), ("games", 1)])
+def test_detail_query_budget(catalog, query_budget, entity, budget):
+    ids = [item["id"] for item in client.get(f"/{entity}", params={"limit": 20}).json()]
+    for item_id in ids:
+        with query_budget(budget):
+            assert client.get(f"/{entity}/{item_id}").status_code == 200
+
+@pytest.mark.parametrize("name,adapter,budget", [("movies", "MOVIE_LIST", 1), ("series", "SERIES_LIST", 3), ("games", "GAME_LIST", 1)])
+def test_orm_list_query_budget(catalog, query_budget, name, adapter, budget):
+    # The ORM path (async mode, writes) relies on the eager-loading options in crud.py.
+    from app import crud, schemas
+    from app.database import SessionLocal
+    with SessionLocal() as db, query_budget(budget):
+        page = getattr(crud, f"list_{name}")(db, limit=100)
+        getattr(schemas, adapter).validate_python(page.items, from_attributes=True)
+
+def _show(title: str, size: int) -> dict:
+    return {"title": title, "year": 2019, "director_name": "Budget Director", "country_name": "Budgetland",
+            "seasons": [{"number": s, "year": 2019, "episodes": [{"number": e, "title": f"Ep {e}"} for e in range(1, size + 1)]}
+                        for s in range(1, size + 1)]}
+
+def test_write_query_budget(query_budget):
+    client.post("/movies", json={"title": "Budget Warmup", "year": 2019, "director_name": "Budget Director", "country_name": "Budgetland"})
+    counts = []
+    for size in (1, 10):
+        with query_budget(7) as statements:
+            r = client.post("/series", json=_show(f"Budget Show {size}", size))
+            assert r.status_code == 201
+        counts.append(len(statements))
+        assert r.json() == client.get(f"/series/{r.json()['id']}").json()
+    assert counts[0] == counts[1], f"query count grows with the number of episodes: {counts}"
+    series_id = r.json()["id"]
+    with query_budget(7):
+        r = client.put(f"/series/{series_id}", json={"title": "Budget Show Renamed"})
+        assert r.status_code == 200
+    assert r.json() == client.get(f"/series/{series_id}").json()
+    movie_id = client.get("/movies", params={"director": "Budget Director"}).json()[0]["id"]
+    # Load, revision, UPDATE, stat_counts upsert.
+    with query_budget(4):
+        assert client.put(f"/movies/{movie_id}", json={"year": 2020}).status_code == 200
@@ -0,0 +1,35 @@
+# tests/test_autocomplete.py
+
+from fastapi.testclient import TestClient
+from sqlalchemy import insert
+from app import autocomplete, models
+from app.database import SessionLocal
+from app.main import app
+
+client = TestClient(app)
+
+def names(path: str, prefix: str, **params) -> list:
+    r = client.get(path, params={"prefix": prefix, **params})
+    assert r.status_code == 200
+    return [d["name"] for d in r.json()]
+
+def test_prefix_ignores_case_and_accents():
+    for i, director in enumerate(["Álvaro Prefijo", "alvaro prefijo II", "Alvarez Prefijo", "Albert Prefijo"]):
+        client.post("/movies", json={"title": f"Prefix {i}", "year": 2003, "director_name": director, "country_name": "Écuador Prefijo"})
+    assert names("/directors", "ALVAR") == ["Alvarez Prefijo", "Álvaro Prefijo", "alvaro prefijo II"]
+    assert names("/directors", "álvaro p", limit=1) == ["Álvaro Prefijo"]
+    assert names("/countries", "ecua") == ["Écuador Prefijo"]
+    assert names("/publishers", "alvar") == []
+    assert client.get("/directors", params={"prefix": "a", "limit": 0}).status_code == 422
+    client.post("/series", json={"title": "Prefix show", "year": 2003, "director_name": "Alvarado Prefijo", "country_name": "Écuador Prefijo"})
+    assert names("/directors", "alvara") == ["Alvarado Prefijo"]
+    # Without a prefix the whole sorted list is still returned.
+    assert "Albert Prefijo" in [d["name"] for d in client.get("/directors").json()]
+
+def test_rows_from_other_writers_appear_within_staleness(monkeypatch):
+    names("/publishers", "zz")  # loads the table
+    with SessionLocal() as db:
+        db.execute(insert(models.Publisher.__table__).values(name="Zzyzx Outside"))
+        db.commit()
+    monkeypatch.setattr(autocomplete, "NAME_INDEX_MAX_STALENESS", 0.0)
+    assert names("/publishers", "zzy") == ["Zzyzx Outside"]
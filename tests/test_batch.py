@@ -0,0 +1,37 @@
+# tests/test_batch.py
+
+from fastapi.testclient import TestClient
+from app.main import app
+
+client = TestClient(app)
+
+def create(path: str, title: str, **extra) -> dict:
+    person = "publisher_name" if path == "/games" else "director_name"
+    return client.post(path, json={"title": title, "year": 2014, person: "Batch Person", "country_name": "Batchland", **extra}).json()
+
+def test_ids_return_items_in_requested_order(query_budget):
+    movies = [create("/movies", f"Batch movie {i}") for i in range(3)]
+    ids = [movies[2]["id"], movies[0]["id"], 999999, movies[2]["id"]]
+    with query_budget(1):
+        r = client.get("/movies", params={"ids": ",".join(map(str, ids))})
+    assert r.status_code == 200 and "X-Next-Cursor" not in r.headers
+    assert r.json() == [client.get(f"/movies/{movies[i]['id']}").json() for i in (2, 0)]
+    assert client.get("/movies", params={"ids": f"{movies[1]['id']}", "fields": "title"}).json() == [{"title": "Batch movie 1"}]
+    show = create("/series", "Batch show", seasons=[{"number": 1, "episodes": [{"number": 1, "title": "Pilot"}]}])
+    with query_budget(3):
+        assert client.get("/series", params={"ids": show["id"]}).json() == [show]
+    for bad in ("1,x", "", ",".join(map(str, range(501)))):
+        assert client.get("/games", params={"ids": bad}).status_code == 400
+
+def test_catalog_batch_keyed_by_id(query_budget):
+    movie = create("/movies", "Batch keyed")
+    game = create("/games", "Batch game")
+    show = create("/series", "Batch keyed show", seasons=[{"number": 1, "episodes": [{"number": 1, "title": "Pilot"}]}])
+    # movies, series + seasons + episodes, games
+    with query_budget(5):
+        r = client.post("/catalog:batch", json={"movies": [movie["id"], 999999], "series": [show["id"]], "games": [game["id"]]})
+    assert r.status_code == 200
+    assert r.json() == {"movies": {str(movie["id"]): movie}, "series": {str(show["id"]): show}, "games": {str(game["id"]): game}}
+    headers = client.post("/catalog:batch", json={"series": [show["id"]], "depth": "series"}).json()
+    assert headers == {"movies": {}, "series": {str(show["id"]): {**show, "seasons": []}}, "games": {}}
+    assert client.post("/catalog:batch", json={"games": list(range(501))}).status_code == 422
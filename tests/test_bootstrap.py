@@ -0,0 +1,48 @@
+# tests/test_bootstrap.py
+
+import sqlite3
+from fastapi.testclient import TestClient
+from app import bootstrap
+from app.main import app
+
+client = TestClient(app)
+
+def counts(path: str) -> dict:
+    with sqlite3.connect(path) as conn:
+        return {t: conn.execute(f"SELECT count(*) FROM {t}").fetchone()[0]
+                for t in ("movies", "series", "episodes", "games", "stat_counts", "tombstones")}
+
+def test_snapshot_restores_into_empty_volume(tmp_path, monkeypatch):
+    client.post("/series", json={"title": "Snapshotted", "year": 2015, "director_name": "Snap Shot", "country_name": "Snapland",
+                                 "seasons": [{"number": 1, "episodes": [{"number": 1, "title": "Pilot"}]}]})
+    snapshot = str(tmp_path / "catalog.db")
+    assert bootstrap.write_snapshot(snapshot) > 0
+    with sqlite3.connect(snapshot) as conn:
+        assert conn.execute("PRAGMA integrity_check").fetchone()[0] == "ok"
+        assert conn.execute("SELECT count(*) FROM sqlite_stat1").fetchone()[0] > 0
+        assert conn.execute("SELECT count(*) FROM catalog_fts WHERE catalog_fts MATCH 'snapshotted'").fetchone()[0] == 1
+
+    target = tmp_path / "data" / "app.db"
+    target.parent.mkdir()
+    monkeypatch.setattr(bootstrap, "DB_SEED_SNAPSHOT", snapshot)
+    monkeypatch.setattr(bootstrap, "_sqlite_path", lambda: str(target))
+    assert bootstrap._restore_if_empty()
+    assert counts(str(target)) == counts(snapshot)
+    # A volume that already holds a database is never overwritten.
+    with sqlite3.connect(target) as conn:
+        conn.execute("DELETE FROM episodes")
+    assert not bootstrap._restore_if_empty()
+    assert counts(str(target))["episodes"] == 0
+
+def test_startup_report():
+    startup = client.get("/system/db").json()["startup"]
+    assert startup["restored_from"] is None and startup["seconds"] >= 0
+
+def test_upgrade_creates_missing_keyset_index():
+    from app.database import engine
+    with engine.begin() as conn:
+        conn.exec_driver_sql("DROP INDEX ix_movies_year_title_id")
+    bootstrap.init_db()
+    with engine.connect() as conn:
+        plan = " ".join(r[-1] for r in conn.exec_driver_sql("EXPLAIN QUERY PLAN SELECT id FROM movies ORDER BY year DESC, title, id LIMIT 20"))
+    assert "ix_movies_year_title_id" in plan and "TEMP B-TREE" not in plan
@@ -0,0 +1,69 @@
+# tests/test_bulk.py
+
+import json
+from fastapi.testclient import TestClient
+from app.main import app
+
+client = TestClient(app)
+
+def _ndjson(items):
+    return "\n".join(i if isinstance(i, str) else json.dumps(i) for i in items) + "\n"
+
+def test_bulk_movies_reports_conflicts_per_line():
+    base = {"director_name": "Bulk Director", "country_name": "Bulkland"}
+    body = _ndjson([
+        {**base, "title": "Bulk A", "year": 2000},
+        {**base, "title": "Bulk B", "year": 2001},
+        {**base, "title": "Bulk A", "year": 2000},
+        "{not json",
+        {**base, "title": "Bulk C", "year": 1700},
+        {**base, "title": "Bulk D", "year": 2002},
+    ])
+    r = client.post("/movies:bulk", params={"chunk_size": 2}, content=body,
+                    headers={"Content-Type": "application/x-ndjson"})
+    assert r.status_code == 200
+    result = r.json()
+    assert result["received"] == 6
+    assert result["inserted"] == 3
+    assert [e["line"] for e in result["errors"]] == [3, 4, 5]
+    titles = {m["title"] for m in client.get("/movies", params={"director": "Bulk Director"}).json()}
+    assert titles == {"Bulk A", "Bulk B", "Bulk D"}
+
+def test_bulk_series_writes_seasons_and_episodes():
+    body = _ndjson([{
+        "title": "Bulk Show", "year": 2020, "director_name": "Bulk Showrunner", "country_name": "Bulkland",
+        "seasons": [
+            {"number": 1, "episodes": [{"number": 1, "title": "E1"}, {"number": 2, "title": "E2"}]},
+            {"number": 2, "episodes": [{"number": 1, "title": "E3"}]},
+        ]
+    }, {
+        "title": "Broken Show", "year": 2020, "director_name": "Bulk Showrunner", "country_name": "Bulkland",
+        "seasons": [{"number": 1}, {"number": 1}]
+    }])
+    result = client.post("/series:bulk", content=body).json()
+    assert result["inserted"] == 1
+    assert result["errors"][0]["line"] == 2
+    show = client.get("/series", params={"director": "Bulk Showrunner"}).json()[0]
+    assert [len(s["episodes"]) for s in show["seasons"]] == [2, 1]
+
+def test_retried_chunk_reports_each_line_once(monkeypatch):
+    from sqlalchemy.exc import IntegrityError
+    from app import bulk, schemas
+    from app.database import SessionLocal
+    failures = []
+    def racing(db, kind, records, errors):
+        # Reports a duplicate line, then loses a race with a concurrent insert while failures remain.
+        errors.append(schemas.BulkError(line=1, error="duplicate"))
+        if failures:
+            failures.pop()
+            raise IntegrityError("INSERT", {}, Exception("UNIQUE constraint failed"))
+        return 1
+    monkeypatch.setattr(bulk, "_write_chunk", racing)
+    records = [(1, None), (2, None)]
+    with SessionLocal() as db:
+        errors, failures[:] = [], [1]
+        assert bulk.write_chunk(db, "movies", records, errors) == 1
+        assert [(e.line, e.error) for e in errors] == [(1, "duplicate")]
+        errors, failures[:] = [], [1, 1]
+        assert bulk.write_chunk(db, "movies", records, errors) == 0
+        assert [(e.line, e.error.split(":")[0]) for e in errors] == [(1, "chunk rejected"), (2, "chunk rejected")]
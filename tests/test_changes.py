@@ -0,0 +1,74 @@
+# tests/test_changes.py
+
+from fastapi.testclient import TestClient
+from sqlalchemy import insert, select
+from app import changes, crud, models, schemas, stats
+from app.database import SessionLocal
+from app.main import app
+
+client = TestClient(app)
+
+def sync(since: int, limit: int=changes.MAX_LIMIT):
+    """Follow the feed from `since` to the end; returns (changes, last revision)."""
+    seen = []
+    while True:
+        body = client.get("/changes", params={"since": since, "limit": limit}).json()
+        seen += body["changes"]
+        assert body["next"] >= since
+        since = body["next"]
+        if not body["more"]:
+            return seen, since
+
+def test_changes_since_revision():
+    _, start = sync(0)
+    movie = client.post("/movies", json={"title": "Synced", "year": 2004, "director_name": "Sync Director", "country_name": "Syncland"}).json()
+    show = client.post("/series", json={"title": "Synced Show", "year": 2005, "director_name": "Sync Director", "country_name": "Syncland",
+                                        "seasons": [{"number": 1, "episodes": [{"number": 1, "title": "One"}, {"number": 2, "title": "Two"}]}]}).json()
+    client.put(f"/movies/{movie['id']}", json={"year": 2006})
+    client.delete(f"/series/{show['id']}")
+
+    feed, end = sync(start)
+    assert [(c["entity"], c["deleted"]) for c in feed] == [
+        ("movies", False),
+        ("episodes", True), ("episodes", True), ("seasons", True), ("series", True),
+    ]
+    assert feed[0]["data"] == {**movie, "year": 2006}
+    assert feed[-1]["id"] == show["id"] and feed[-1]["data"] is None
+    revisions = [c["revision"] for c in feed]
+    assert revisions == sorted(set(revisions)) and revisions[0] > start
+    assert sync(start, limit=2) == (feed, end)
+    assert client.get("/changes", params={"since": end}).json() == {"since": end, "next": end, "more": False, "changes": []}
+
+def test_children_and_bulk_rows_get_revisions():
+    _, start = sync(0)
+    show = client.post("/series", json={"title": "Child Show", "year": 2007, "director_name": "Sync Director", "country_name": "Syncland"}).json()
+    client.post(f"/series/{show['id']}/seasons", json={"number": 1, "year": 2007})
+    client.post(f"/series/{show['id']}/seasons/1/episodes", json={"number": 1, "title": "Late"})
+    lines = "\n".join('{"title": "Bulk Sync %d", "year": 2008, "publisher_name": "Sync Publisher", "country_name": "Syncland"}' % i for i in range(3))
+    assert client.post("/games:bulk", content=lines).json()["inserted"] == 3
+    feed, _ = sync(start)
+    assert [c["entity"] for c in feed] == ["series", "seasons", "episodes", "games", "games", "games"]
+    season = feed[1]["data"]
+    assert season["series_id"] == show["id"] and feed[2]["data"]["season_id"] == season["id"]
+    assert [c["data"]["title"] for c in feed[3:]] == [f"Bulk Sync {i}" for i in range(3)]
+
+def test_backfill_stamps_rows_written_around_the_api():
+    _, start = sync(0)
+    with SessionLocal() as db:
+        country = crud.lookup_id(db, models.Country, "Syncland")
+        director = crud.lookup_id(db, models.Director, "Sync Director")
+        db.execute(insert(models.Movie.__table__).values(title="Raw Insert", year=2009, country_id=country, director_id=director))
+        db.commit()
+        assert changes.backfill(db) == 1
+        stats.rebuild(db)
+        revision = db.execute(select(models.Movie.revision).where(models.Movie.title == "Raw Insert")).scalar()
+    feed, end = sync(start)
+    assert [(c["revision"], c["data"]["title"]) for c in feed] == [(revision, "Raw Insert")]
+    assert end == revision + 1  # stats.rebuild takes one more revision, with no row behind it
+
+def test_feed_is_not_cached():
+    _, start = sync(0)
+    assert sync(start)[0] == []
+    with SessionLocal() as db:  # as another process would: no route, no response_cache.invalidate()
+        crud.create_movie(db, schemas.MovieCreate(title="Other Process", year=2010, director_name="Sync Director", country_name="Syncland"))
+    assert [c["data"]["title"] for c in sync(start)[0]] == ["Other Process"]
@@ -0,0 +1,41 @@
+# tests/test_episodes.py
+
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from app import fastread
+from app.database import engine
+from app.main import app
+
+client = TestClient(app)
+
+def test_seasons_and_paginated_episodes():
+    show = client.post("/series", json={"title": "Long Show", "year": 2003, "director_name": "Long Director", "country_name": "Longland",
+        "seasons": [{"number": 2, "year": 2004}, {"number": 1, "year": 2003, "episodes": [{"number": n, "title": f"E{n}"} for n in range(5, 0, -1)]}]}).json()
+    sid = show["id"]
+    assert client.get(f"/series/{sid}/seasons").json() == [{"id": s["id"], "number": s["number"], "year": s["year"]} for s in show["seasons"]]
+
+    seen, cursor = [], None
+    while True:
+        r = client.get(f"/series/{sid}/seasons/1/episodes", params={"limit": 2, **({"cursor": cursor} if cursor else {})})
+        assert r.status_code == 200 and len(r.json()) <= 2
+        seen += r.json()
+        cursor = r.headers.get("X-Next-Cursor")
+        if not cursor: break
+    assert [e["number"] for e in seen] == [1, 2, 3, 4, 5]
+    assert client.get(f"/series/{sid}/seasons/2/episodes").json() == []
+
+    r = client.post(f"/series/{sid}/seasons/2/episodes", json={"number": 1, "title": "New"})
+    assert r.status_code == 201
+    assert client.get(f"/series/{sid}/seasons/2/episodes").json() == [r.json()]
+    assert client.get(f"/stats/series/{sid}").json()["episodes"] == 6
+    assert client.post(f"/series/{sid}/seasons/2/episodes", json={"number": 1, "title": "Again"}).status_code == 409
+    assert client.post(f"/series/{sid}/seasons/9/episodes", json={"number": 1, "title": "Nowhere"}).status_code == 404
+    assert client.get(f"/series/{sid}/seasons/9/episodes").status_code == 404
+    assert client.get("/series/999999/seasons").status_code == 404
+    assert client.get(f"/series/{sid}/seasons/1/episodes", params={"cursor": "bad"}).status_code == 400
+
+def test_episode_pages_use_the_season_number_index():
+    stmt = fastread.episodes_select(1, 100, None).compile(engine, compile_kwargs={"literal_binds": True})
+    with engine.connect() as conn:
+        plan = " ".join(str(row[-1]) for row in conn.execute(text(f"EXPLAIN QUERY PLAN {stmt}")))
+    assert "USING INDEX" in plan and "season_id=?" in plan and "TEMP B-TREE" not in plan, plan
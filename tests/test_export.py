@@ -0,0 +1,37 @@
+# tests/test_export.py
+
+import csv
+import io
+import json
+from fastapi.testclient import TestClient
+from app.main import app
+
+client = TestClient(app)
+
+def test_export_series_ndjson_nests_seasons_and_episodes():
+    payload = {
+        "title": "Export Show", "year": 2012, "director_name": "Export Director", "country_name": "Exportland",
+        "seasons": [
+            {"number": 1, "episodes": [{"number": 1, "title": "A"}, {"number": 2, "title": "B"}]},
+            {"number": 2, "episodes": []},
+        ]
+    }
+    created = client.post("/series", json=payload).json()
+    r = client.get("/export/series")
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    records = [json.loads(line) for line in r.text.splitlines()]
+    assert [rec["id"] for rec in records] == sorted(rec["id"] for rec in records)
+    show = next(rec for rec in records if rec["id"] == created["id"])
+    assert show == created
+
+def test_export_movies_csv():
+    client.post("/movies", json={"title": "Export Movie", "year": 1999, "director_name": "Export Director", "country_name": "Exportland"})
+    r = client.get("/export/movies", params={"format": "csv"})
+    assert r.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(r.text)))
+    row = next(row for row in rows if row["title"] == "Export Movie")
+    assert row["director"] == "Export Director" and row["country"] == "Exportland"
+
+def test_export_unknown_entity():
+    assert client.get("/export/actors").status_code == 422
@@ -0,0 +1,34 @@
+# tests/test_fastread.py
+
+import orjson
+from fastapi.testclient import TestClient
+from app.main import app
+from app.database import SessionLocal
+from app import crud, fastread, schemas
+
+client = TestClient(app)
+
+def _validated(adapter, content):
+    return adapter.dump_json(adapter.validate_python(content, from_attributes=True))
+
+def test_fast_path_matches_validated_json_byte_for_byte():
+    client.post("/movies", json={"title": "Amélie \"le film\" 東京", "year": 2001, "director_name": "Jean-Pierre Jeunet", "country_name": "Francé"})
+    client.post("/games", json={"title": "Ōkami\\HD", "year": 2006, "publisher_name": "Capcom", "country_name": "日本"})
+    client.post("/series", json={
+        "title": "Fast Path Show", "year": 2010, "director_name": "Jean-Pierre Jeunet", "country_name": "Francé",
+        "seasons": [{"number": 2, "episodes": [{"number": 2, "title": "B"}, {"number": 1, "title": "A\n"}]},
+                    {"number": 1, "year": 2010, "episodes": []}]
+    })
+    db = SessionLocal()
+    try:
+        assert orjson.dumps(fastread.list_movies(db).items) == _validated(schemas.MOVIE_LIST, crud.list_movies(db).items)
+        assert orjson.dumps(fastread.list_games(db).items) == _validated(schemas.GAME_LIST, crud.list_games(db).items)
+        for depth in ("series", "seasons", "episodes"):
+            db.expunge_all()
+            fast = orjson.dumps(fastread.list_series(db, depth=depth).items)
+            assert fast == _validated(schemas.SERIES_LIST, crud.list_series(db, depth=depth).items)
+        assert orjson.dumps(fastread.list_countries(db)) == _validated(schemas.COUNTRY_LIST, crud.list_countries(db))
+        movie_id = fastread.list_movies(db).items[0]["id"]
+        assert orjson.dumps(fastread.get_movie(db, movie_id)) == _validated(schemas.MOVIE, crud.get_movie(db, movie_id))
+    finally:
+        db.close()
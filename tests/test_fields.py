@@ -0,0 +1,38 @@
+# tests/test_fields.py
+
+import pytest
+from fastapi.testclient import TestClient
+from app.main import app
+
+client = TestClient(app)
+
+@pytest.fixture(scope="module")
+def titles():
+    client.post("/movies", json={"title": "Fields Movie", "year": 1977, "director_name": "Fields Director", "country_name": "Fieldland"})
+    client.post("/series", json={"title": "Fields Show", "year": 1978, "director_name": "Fields Director", "country_name": "Fieldland",
+                                 "seasons": [{"number": 1, "episodes": [{"number": 1, "title": "F1"}]}]})
+
+def test_fields_are_a_subset_of_the_full_body(titles):
+    params = {"director": "Fields Director"}
+    full = client.get("/movies", params=params).json()
+    light = client.get("/movies", params={**params, "fields": "title,id"}).json()
+    assert light == [{"id": m["id"], "title": m["title"]} for m in full]
+    detail = client.get(f"/movies/{full[0]['id']}", params={"fields": "country"}).json()
+    assert detail == {"country": full[0]["country"]}
+    show = client.get("/series", params=params).json()[0]
+    assert client.get("/series", params={**params, "fields": "title,seasons"}).json() == [{"title": show["title"], "seasons": show["seasons"]}]
+    assert client.get(f"/series/{show['id']}", params={"fields": "year"}).json() == {"year": 1978}
+
+def test_fields_skip_unrequested_joins(titles, query_budget):
+    with query_budget(1) as statements:
+        assert client.get("/movies", params={"director": "Fields Director", "fields": "id,title"}).status_code == 200
+    assert "JOIN" not in statements[0]
+    with query_budget(1) as statements:
+        assert client.get("/series", params={"fields": "id,title"}).status_code == 200
+    assert "JOIN" not in statements[0] and "seasons" not in statements[0]
+
+def test_unknown_fields_are_rejected():
+    r = client.get("/games", params={"fields": "id,director"})
+    assert r.status_code == 400
+    assert "director" in r.json()["detail"]
+    assert client.get("/movies", params={"fields": ","}).status_code == 400
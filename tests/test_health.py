@@ -11,3 +11,10 @@ def test_health_endpoint():
     json_data = response.json()
     assert "status" in json_data
     assert json_data["status"] == "ok"
+
+def test_db_profile_report():
+    response = client.get("/system/db")
+    assert response.status_code == 200
+    report = response.json()
+    assert {"profile", "pool_size", "max_overflow", "pragmas", "mismatches"} <= report.keys()
+    assert report["mismatches"] == []
@@ -0,0 +1,40 @@
+# tests/test_lookup_cache.py
+
+from fastapi.testclient import TestClient
+from app.main import app
+from app.database import SessionLocal
+from app import crud, models
+from app.lookup_cache import cache
+
+client = TestClient(app)
+
+def test_repeated_writes_hit_the_cache():
+    body = {"year": 2005, "director_name": "Cached Director", "country_name": "Cacheland"}
+    assert client.post("/movies", json={**body, "title": "Cached 1"}).status_code == 201
+    before = cache.stats()["hits"]
+    assert client.post("/movies", json={**body, "title": "Cached 2"}).status_code == 201
+    assert cache.stats()["hits"] >= before + 2
+    stats = client.get("/system/caches").json()["lookup"]
+    assert {"hits", "misses", "evictions", "size", "maxsize"} <= stats.keys()
+
+def test_rolled_back_insert_is_not_cached():
+    db = SessionLocal()
+    try:
+        crud.lookup_id(db, models.Country, "Rollbackistan")
+        db.rollback()
+        assert cache.get("countries", "Rollbackistan") is None
+        assert db.query(models.Country).filter_by(name="Rollbackistan").first() is None
+        again = crud.lookup_id(db, models.Country, "Rollbackistan")
+        db.commit()
+        assert cache.get("countries", "Rollbackistan") == again
+        assert db.get(models.Country, again).name == "Rollbackistan"
+    finally:
+        db.close()
+
+def test_cache_is_bounded():
+    from app.lookup_cache import LookupCache
+    small = LookupCache(2)
+    for i in range(3):
+        small.put("directors", f"d{i}", i)
+    assert small.get("directors", "d0") is None
+    assert small.stats()["evictions"] == 1
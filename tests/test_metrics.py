@@ -0,0 +1,36 @@
+# tests/test_metrics.py
+
+import re
+from fastapi.testclient import TestClient
+from app.main import app
+
+client = TestClient(app)
+
+def test_server_timing_reports_db_and_serialize():
+    r = client.get("/games", params={"publisher": "Timing Publisher"})
+    assert r.status_code == 200
+    timing = r.headers["Server-Timing"]
+    m = re.match(r'db;dur=([\d.]+);desc="(\d+) queries", serialize;dur=([\d.]+), total;dur=([\d.]+)$', timing)
+    assert m, timing
+    db_ms, queries, _, total_ms = float(m[1]), int(m[2]), float(m[3]), float(m[4])
+    assert queries >= 1
+    assert db_ms <= total_ms
+
+def test_prometheus_exposition():
+    client.get("/movies/999999")
+    body = client.get("/metrics").text
+    assert '# TYPE http_request_duration_seconds histogram' in body
+    assert 'http_requests_total{method="GET",route="/movies/{movie_id}",status="404"}' in body
+    assert re.search(r'db_queries_per_request_count\{method="GET",route="/movies/\{movie_id\}"\} \d', body)
+    assert "db_pool_checkout_wait_seconds_count" in body
+
+def test_failed_statements_do_not_leak_timings():
+    import pytest
+    from sqlalchemy.exc import OperationalError
+    from app.database import engine
+    with engine.connect() as conn:
+        for _ in range(3):
+            with pytest.raises(OperationalError):
+                conn.exec_driver_sql("SELECT * FROM no_such_table")
+        conn.exec_driver_sql("SELECT 1")
+        assert conn.connection.info.get("query_start", []) == []
@@ -0,0 +1,59 @@
+# tests/test_name_keys.py
+
+from fastapi.testclient import TestClient
+from sqlalchemy import insert, select, text
+from app import crud, lookup_cache, models
+from app.database import SessionLocal, engine
+from app.main import app
+
+client = TestClient(app)
+
+def test_names_match_up_to_case_and_spacing(query_budget):
+    movie = client.post("/movies", json={"title": "Keyed", "year": 2001, "director_name": "Key Director", "country_name": "Keyland"}).json()
+    again = client.post("/movies", json={"title": "Keyed 2", "year": 2001, "director_name": " KEY  director ", "country_name": "keyland"}).json()
+    assert again["director"] == movie["director"] and again["country"] == movie["country"]
+    for params in ({"director": "key director"}, {"country": "KEYLAND "}, {"country": "Keyland", "director": "Key   Director"}):
+        assert [m["title"] for m in client.get("/movies", params=params).json()] == ["Keyed", "Keyed 2"], params
+    # Resolved names come from the lookup cache: the list itself is one query on the FK.
+    with query_budget(1):
+        assert len(client.get("/movies", params={"country": "KEYLAND", "limit": 1}).json()) == 1
+    assert client.get("/movies", params={"country": "Nokeyland"}).json() == []
+    lines = '{"title": "Keyed bulk", "year": 2002, "publisher_name": "KEY PUBLISHER", "country_name": "KeyLand"}\n' \
+            '{"title": "Keyed bulk 2", "year": 2002, "publisher_name": "key publisher", "country_name": "keyland"}'
+    assert client.post("/games:bulk", content=lines).json()["inserted"] == 2
+    games = client.get("/games", params={"publisher": "Key Publisher"}).json()
+    assert {g["country"]["id"] for g in games} == {movie["country"]["id"]} and len({g["publisher"]["id"] for g in games}) == 1
+
+def test_upgrade_merges_names_differing_in_case():
+    with engine.begin() as conn:
+        conn.exec_driver_sql("DROP INDEX ix_publishers_name_key")
+        conn.exec_driver_sql("ALTER TABLE publishers DROP COLUMN name_key")
+        keep = conn.execute(text("INSERT INTO publishers (name) VALUES ('Merge Games') RETURNING id")).scalar()
+        dup = conn.execute(text("INSERT INTO publishers (name) VALUES ('MERGE  games') RETURNING id")).scalar()
+        country = conn.execute(select(models.Country.id).limit(1)).scalar()
+        conn.execute(insert(models.Game.__table__), [{"title": "Merged", "year": 2003, "publisher_id": dup, "country_id": country}])
+    lookup_cache.cache.invalidate()
+    with SessionLocal() as db:
+        assert crud.ensure_name_keys(db) == 1
+        assert crud.ensure_name_keys(db) == 0
+        assert db.execute(select(models.Publisher.id).where(models.Publisher.name_key == "merge games")).scalars().all() == [keep]
+        assert db.execute(select(models.Game.publisher_id).where(models.Game.title == "Merged")).scalar() == keep
+    assert client.get("/stats").json()["games"]["total"] == len(client.get("/export/games").text.splitlines())
+    feed = client.get("/changes", params={"since": 0, "limit": 5000}).json()["changes"]
+    assert [c["data"]["publisher"]["id"] for c in feed if c["entity"] == "games" and c["data"]["title"] == "Merged"] == [keep]
+
+def test_name_filters_read_a_foreign_key_index():
+    from sqlalchemy import event
+    client.post("/games", json={"title": "Indexed", "year": 2003, "publisher_name": "Index Publisher", "country_name": "Indexland"})
+    seen = []
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if "FROM games" in statement: seen.append((statement, parameters))
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        client.get("/games", params={"publisher": "Index Publisher", "limit": 7})
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    statement, parameters = seen[-1]
+    with engine.connect() as conn:
+        plan = " ".join(r[-1] for r in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters))
+    assert "ix_games_publisher_year_title_id" in plan and "TEMP B-TREE" not in plan
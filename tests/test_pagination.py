@@ -0,0 +1,60 @@
+# tests/test_pagination.py
+
+from fastapi.testclient import TestClient
+from app.main import app
+
+client = TestClient(app)
+
+def _create_movies(prefix, years):
+    for i, year in enumerate(years):
+        r = client.post("/movies", json={
+            "title": f"{prefix} {i}", "year": year,
+            "director_name": "Pager Director", "country_name": "Pagerland"
+        })
+        assert r.status_code == 201
+
+def test_movies_keyset_pages_cover_everything_once():
+    _create_movies("Paged", [2001, 2001, 2003, 2002, 2003, 2001, 2002])
+    seen, cursor = [], None
+    while True:
+        params = {"director": "Pager Director", "limit": 3}
+        if cursor: params["cursor"] = cursor
+        r = client.get("/movies", params=params)
+        assert r.status_code == 200
+        page = r.json()
+        assert len(page) <= 3
+        seen.extend(page)
+        cursor = r.headers.get("X-Next-Cursor")
+        if not cursor: break
+    assert len(seen) == 7
+    assert len({m["id"] for m in seen}) == 7
+    keys = [(-m["year"], m["title"], m["id"]) for m in seen]
+    assert keys == sorted(keys)
+
+def test_invalid_cursor_is_rejected():
+    r = client.get("/games", params={"cursor": "not-a-cursor"})
+    assert r.status_code == 400
+
+def test_cursor_header_is_exposed_to_cross_origin_clients():
+    r = client.get("/movies", params={"limit": 1}, headers={"Origin": "https://elsewhere.example"})
+    exposed = {h.strip().lower() for h in r.headers["Access-Control-Expose-Headers"].split(",")}
+    assert {"x-next-cursor", "etag"} <= exposed
+
+def test_cursor_pages_seek_into_the_index():
+    from sqlalchemy import event
+    from app.database import engine
+    _create_movies("Seek", [2004, 2004, 2005])
+    cursor = client.get("/movies", params={"limit": 2}).headers["X-Next-Cursor"]
+    seen = []
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if "FROM movies" in statement: seen.append((statement, parameters))
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        client.get("/movies", params={"limit": 2, "cursor": cursor})
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    statement, parameters = seen[-1]
+    with engine.connect() as conn:
+        plan = " ".join(r[-1] for r in conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters))
+    # A range SEARCH starting at the cursor, not a SCAN from the start of the index.
+    assert "ix_movies_year_title_id (year<?)" in plan and "SCAN movies" not in plan
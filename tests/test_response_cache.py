@@ -0,0 +1,39 @@
+# tests/test_response_cache.py
+
+from fastapi.testclient import TestClient
+from app.main import app
+
+client = TestClient(app)
+
+def test_conditional_get_and_write_invalidation():
+    params = {"director": "Etag Director"}
+    first = client.get("/movies", params=params)
+    etag = first.headers["ETag"]
+    again = client.get("/movies", params=params, headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.headers["ETag"] == etag
+
+    r = client.post("/movies", json={"title": "Etag Movie", "year": 2011, "director_name": "Etag Director", "country_name": "Etagland"})
+    assert r.status_code == 201
+    after = client.get("/movies", params=params, headers={"If-None-Match": etag})
+    assert after.status_code == 200
+    assert after.headers["ETag"] != etag
+    assert [m["title"] for m in after.json()] == ["Etag Movie"]
+    assert "Etagland" in [c["name"] for c in client.get("/countries").json()]
+
+def test_cache_stats_are_exposed():
+    client.get("/publishers"); client.get("/publishers")
+    stats = client.get("/system/caches").json()["responses"]
+    assert stats["hits"] >= 1
+    assert {"entries", "bytes", "max_entries", "max_bytes", "hit_ratio"} <= stats.keys()
+
+def test_writes_from_other_processes_show_up_after_max_staleness(monkeypatch):
+    # crud without the route is what the seed or another worker does: no local invalidate().
+    from app import crud, response_cache, schemas
+    from app.database import SessionLocal
+    params = {"director": "Elsewhere Director"}
+    assert client.get("/movies", params=params).json() == []
+    with SessionLocal() as db:
+        crud.create_movie(db, schemas.MovieCreate(title="Elsewhere Movie", year=2012, director_name="Elsewhere Director", country_name="Elsewhereland"))
+    monkeypatch.setattr(response_cache, "RESPONSE_CACHE_MAX_STALENESS", 0)
+    assert [m["title"] for m in client.get("/movies", params=params).json()] == ["Elsewhere Movie"]
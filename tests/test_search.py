@@ -0,0 +1,47 @@
+# tests/test_search.py
+
+from fastapi.testclient import TestClient
+from app.main import app
+
+client = TestClient(app)
+
+def test_search_ranks_across_entity_types():
+    client.post("/movies", json={"title": "Zyzzyva Rising", "year": 2001, "director_name": "Search Director", "country_name": "Searchland"})
+    client.post("/games", json={"title": "Zyzzyva Tactics", "year": 2002, "publisher_name": "Search Games", "country_name": "Searchland"})
+    show = client.post("/series", json={
+        "title": "Quiet Harbour", "year": 2003, "director_name": "Search Director", "country_name": "Searchland",
+        "seasons": [{"number": 1, "episodes": [{"number": 1, "title": "The Zyzzyva Affair"}]}]
+    }).json()
+    hits = client.get("/search", params={"q": "zyzzyva"}).json()
+    assert {h["type"] for h in hits} == {"movie", "game", "episode"}
+    episode = next(h for h in hits if h["type"] == "episode")
+    assert episode["series_id"] == show["id"]
+    assert [h["type"] for h in client.get("/search", params={"q": "zyzz", "type": "game"}).json()] == ["game"]
+
+def test_search_follows_updates_and_deletes():
+    movie = client.post("/movies", json={"title": "Quokka Days", "year": 2004, "director_name": "Search Director", "country_name": "Searchland"}).json()
+    assert [h["id"] for h in client.get("/search", params={"q": "quokka"}).json()] == [movie["id"]]
+    client.put(f"/movies/{movie['id']}", json={"title": "Wombat Days"})
+    assert client.get("/search", params={"q": "quokka"}).json() == []
+    client.delete(f"/movies/{movie['id']}")
+    assert client.get("/search", params={"q": "wombat"}).json() == []
+
+def test_search_input_is_not_fts_syntax():
+    r = client.get("/search", params={"q": 'NEAR( "unbalanced'})
+    assert r.status_code == 200
+
+def test_search_on_unsupported_dialect_is_501(monkeypatch):
+    from sqlalchemy.dialects.sqlite.base import SQLiteDialect
+    monkeypatch.setattr(SQLiteDialect, "name", "mysql")
+    r = client.get("/search", params={"q": "anything"})
+    assert r.status_code == 501
+    assert "mysql" in r.json()["detail"]
+
+def test_both_backends_prefix_match_the_last_word():
+    from app import search
+    assert search._fts5_query("Star  wa") == '"Star" "wa"*'
+    assert search._tsquery("Star  wa") == "'Star' & 'wa':*"
+    assert search._tsquery("'); DROP --") == "'DROP':*"
+    assert search._fts5_query("?!") is None and search._tsquery("?!") is None
+    client.post("/movies", json={"title": "Prefixed Platypus", "year": 2003, "director_name": "Search Director", "country_name": "Searchland"})
+    assert [h["title"] for h in client.get("/search", params={"q": "prefixed platy"}).json()] == ["Prefixed Platypus"]
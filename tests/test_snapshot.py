@@ -0,0 +1,85 @@
+# tests/test_snapshot.py
+
+import pytest
+from fastapi.testclient import TestClient
+from app import fastread, snapshot
+from app.database import SessionLocal
+from app.main import app
+
+client = TestClient(app)
+
+FILTERS = [{}, {"year": 2012}, {"country": "Snapland"}, {"country": "Nowhere"}, {"year": 2013, "country": "Snapland"}]
+
+@pytest.fixture
+def fresh(monkeypatch):
+    monkeypatch.setattr(snapshot, "snapshot", snapshot.Snapshot())
+    return snapshot.snapshot
+
+def pages(lister, **filters):
+    """Every item of a listing, following cursors two at a time."""
+    items, cursor = [], None
+    with SessionLocal() as db:
+        while True:
+            page = lister(db, limit=2, cursor=cursor, **filters)
+            items += page.items
+            cursor = page.next_cursor
+            if cursor is None:
+                return items
+
+def same_as_database(person: str):
+    for filters in FILTERS + [{"director": person}, {"country": "Snapland", "director": person}]:
+        assert pages(snapshot.list_movies, **filters) == pages(fastread.list_movies, **filters), filters
+        assert pages(snapshot.list_series, **filters) == pages(fastread.list_series, **filters), filters
+        games = {"publisher" if k == "director" else k: v for k, v in filters.items()}
+        assert pages(snapshot.list_games, **games) == pages(fastread.list_games, **games), games
+
+def post(path: str, title: str, year: int, **extra) -> dict:
+    person = "publisher_name" if path == "/games" else "director_name"
+    return client.post(path, json={"title": title, "year": year, person: "Snap Person", "country_name": "Snapland", **extra}).json()
+
+def test_snapshot_pages_match_database(fresh):
+    for i in range(5):
+        post("/movies", f"Snap {i}", 2012 + i % 2)
+        post("/games", f"Snap game {i}", 2012)
+    post("/series", "Snap show", 2012, seasons=[{"number": 1, "episodes": [{"number": 1, "title": "One"}]}])
+    same_as_database("Snap Person")
+    assert fresh.stats()["entities"]["movies"]["overlay"] == 0
+
+def test_writes_reach_overlay_then_compact(fresh, monkeypatch):
+    same_as_database("Snap Person")
+    added = post("/movies", "Snap added", 2012)
+    moved = post("/movies", "Snap moved", 2013)
+    gone = post("/games", "Snap gone", 2012)
+    client.put(f"/movies/{moved['id']}", json={"year": 2012, "title": "Snap 1"})
+    client.delete(f"/games/{gone['id']}")
+    same_as_database("Snap Person")
+    entities = fresh.stats()["entities"]
+    assert entities["movies"]["overlay"] == 2 and entities["games"]["skipped"] == 1
+    assert added["id"] in fresh.state.entities["movies"].overlay
+
+    monkeypatch.setattr(snapshot, "SNAPSHOT_COMPACT_ROWS", 0)
+    post("/movies", "Snap compacted", 2013)
+    same_as_database("Snap Person")
+    assert all(e["overlay"] == 0 and e["skipped"] == 0 for e in fresh.stats()["entities"].values())
+
+def test_writes_from_other_processes_reach_cached_lists(fresh, monkeypatch):
+    from app import crud, main, response_cache, schemas
+    monkeypatch.setattr(main, "lists", snapshot)
+    params = {"director": "Remote Snap Person"}
+    assert client.get("/movies", params=params).json() == []
+    with SessionLocal() as db:  # no route, so no response_cache.invalidate()
+        crud.create_movie(db, schemas.MovieCreate(title="Remote Snap", year=2014, director_name="Remote Snap Person", country_name="Snapland"))
+    monkeypatch.setattr(response_cache, "RESPONSE_CACHE_MAX_STALENESS", 0)
+    assert [m["title"] for m in client.get("/movies", params=params).json()] == ["Remote Snap"]
+
+def test_rows_committed_during_a_load_have_names(fresh, monkeypatch):
+    from app import crud, schemas
+    load = fresh._load
+    def load_racing_a_writer(db, entity):
+        if entity == "movies":
+            with SessionLocal() as other:
+                crud.create_movie(other, schemas.MovieCreate(title="Mid Load", year=2016, director_name="Mid Load Director", country_name="Midland"))
+        return load(db, entity)
+    monkeypatch.setattr(fresh, "_load", load_racing_a_writer)
+    titles = [m["title"] for m in pages(snapshot.list_movies, year=2016)]
+    assert "Mid Load" in titles
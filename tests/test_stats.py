@@ -0,0 +1,48 @@
+# tests/test_stats.py
+
+from fastapi.testclient import TestClient
+from app import stats
+from app.database import SessionLocal
+from app.main import app
+
+client = TestClient(app)
+
+def _full_stats() -> dict:
+    with SessionLocal() as db:
+        return stats.read(db, top=stats.MAX_TOP)
+
+def _year_count(year: int) -> int:
+    return next((y["count"] for y in client.get("/stats").json()["movies"]["by_year"] if y["year"] == year), 0)
+
+def test_incremental_stats_match_rebuild():
+    before_1991 = _year_count(1991)
+    base = {"director_name": "Stats Director", "country_name": "Statsland"}
+    m = client.post("/movies", json={"title": "Stats Movie", "year": 1990, **base}).json()
+    client.post("/movies", json={"title": "Stats Movie 2", "year": 1990, **base})
+    client.put(f"/movies/{m['id']}", json={"year": 1991, "country_name": "Other Statsland"})
+    s = client.post("/series", json={"title": "Stats Show", "year": 2001, **base, "seasons": [
+        {"number": 1, "episodes": [{"number": 1, "title": "a"}, {"number": 2, "title": "b"}]}]}).json()
+    client.post(f"/series/{s['id']}/seasons", json={"number": 2, "episodes": [{"number": 1, "title": "c"}]})
+    gone = client.post("/series", json={"title": "Stats Gone", "year": 2002, **base, "seasons": [
+        {"number": 1, "episodes": [{"number": 1, "title": "x"}]}]}).json()
+    assert client.delete(f"/series/{gone['id']}").status_code == 204
+    g = client.post("/games", json={"title": "Stats Game", "year": 2010, "publisher_name": "Stats Pub", "country_name": "Statsland"}).json()
+    client.delete(f"/games/{g['id']}")
+    client.post("/games:bulk", content=b'{"title": "Stats Bulk Game", "year": 2011, "publisher_name": "Stats Pub", "country_name": "Statsland"}\n')
+
+    incremental = _full_stats()
+    with SessionLocal() as db:
+        stats.rebuild(db)
+    assert incremental == _full_stats()
+
+    r = client.get(f"/stats/series/{s['id']}")
+    assert r.json() == {"series_id": s["id"], "seasons": 2, "episodes": 3}
+    assert client.get(f"/stats/series/{gone['id']}").status_code == 404
+    assert _year_count(1991) == before_1991 + 1
+    movies = client.get("/stats").json()["movies"]
+    assert any(c["name"] == "Other Statsland" and c["count"] == 1 for c in movies["by_country"])
+
+def test_stats_query_budget(query_budget):
+    # A fixed number of summary reads, however big the catalog is.
+    with query_budget(8):
+        assert client.get("/stats", params={"top": 5}).status_code == 200
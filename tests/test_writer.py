@@ -0,0 +1,72 @@
+# tests/test_writer.py
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event, select
+from sqlalchemy.exc import IntegrityError
+from app import crud, models, schemas, writer
+from app.database import SessionLocal, engine
+from app.main import app
+
+client = TestClient(app)
+
+def movie(title: str) -> schemas.MovieCreate:
+    return schemas.MovieCreate(title=title, year=2001, director_name="Group Director", country_name="Groupland")
+
+def test_batch_commits_once_and_isolates_failures():
+    show = client.post("/series", json={"title": "Grouped", "year": 2001, "director_name": "Group Director", "country_name": "Groupland",
+                                        "seasons": [{"number": 1, "episodes": [{"number": 1, "title": "Pilot"}]}]}).json()
+    duplicate = schemas.EpisodeCreate(number=1, title="Pilot again")
+    statements = []
+    record = lambda conn, cursor, statement, *args: statements.append(statement)
+    group = writer.GroupWriter(engine, window=0.2, max_batch=10)
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        futures = [group.submit(lambda db: crud.create_movie(db, movie("Grouped A"))),
+                   group.submit(lambda db: crud.add_episode(db, show["id"], 1, duplicate)),
+                   group.submit(lambda db: crud.create_movie(db, movie("Grouped B")))]
+        created = [futures[0].result(), futures[2].result()]
+        with pytest.raises(IntegrityError):
+            futures[1].result()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    assert statements.count("BEGIN IMMEDIATE") == 1
+    assert sum(s.startswith("SAVEPOINT") for s in statements) == 3
+    with SessionLocal() as db:
+        titles = db.execute(select(models.Movie.title).where(models.Movie.id.in_([m["id"] for m in created]))).scalars().all()
+        episodes = db.execute(select(models.Episode.title).join(models.Season).where(models.Season.series_id == show["id"])).scalars().all()
+    assert sorted(titles) == ["Grouped A", "Grouped B"]
+    assert episodes == ["Pilot"]
+
+def test_routes_in_group_mode(monkeypatch):
+    monkeypatch.setattr(writer, "WRITER_MODE", "group")
+    r = client.post("/games", json={"title": "Queued", "year": 2010, "publisher_name": "Group Publisher", "country_name": "Groupland"})
+    assert r.status_code == 201
+    gid = r.json()["id"]
+    assert client.put(f"/games/{gid}", json={"year": 2011}).json()["year"] == 2011
+    assert client.get(f"/games/{gid}").json()["year"] == 2011
+    assert client.put("/games/999999", json={"year": 2011}).status_code == 404
+    assert client.delete(f"/games/{gid}").status_code == 204
+    assert client.get(f"/games/{gid}").status_code == 404
+
+def test_lookup_ids_are_published_only_after_the_batch_commits(monkeypatch):
+    from app import lookup_cache
+    group = writer.GroupWriter(engine, window=0, max_batch=10)
+    def create(title, director):
+        def fn(db):
+            m = crud.create_movie(db, schemas.MovieCreate(title=title, year=2002, director_name=director, country_name="Groupland"))
+            # The savepoint is released, but the batch has not committed yet.
+            assert lookup_cache.cache.get("directors", director) is None
+            return m
+        return fn
+    run = group._run
+    def then_fail(conn, job, lookups):
+        run(conn, job, lookups)
+        raise RuntimeError("batch failed after the savepoint was released")
+    monkeypatch.setattr(group, "_run", then_fail)
+    with pytest.raises(RuntimeError):
+        group.run(create("Lost Batch", "Rolled Back Director"))
+    assert lookup_cache.cache.get("directors", "Rolled Back Director") is None
+    monkeypatch.setattr(group, "_run", run)
+    created = group.run(create("Kept Batch", "Committed Director"))
+    assert lookup_cache.cache.get("directors", "Committed Director") == created["director"]["id"]